@@ -9,6 +9,14 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
     db.init_app(app)
 
+    from .database import configurar_sqlite
+    configurar_sqlite(app, db)
+
+    from .metrics import configurar_metricas
+    from .tracing import configurar_rastreamento
+    configurar_metricas(app)
+    configurar_rastreamento(app)
+
     with app.app_context():
         from . import routes
         # db.create_all() # Opcional: criar tabelas se não existirem ao iniciar
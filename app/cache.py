@@ -0,0 +1,148 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, inspect, insert, select, update
+from . import db
+from .models import (
+    VersaoDados, DadosVendas, RegraComissao, ProdutoEspecial, ComissaoPadrao,
+    Vendedor, AjusteFinanceiro, AjusteFaturamento
+)
+
+# Tabelas cujas alterações invalidam os relatórios já calculados
+MODELOS_VERSIONADOS = (
+    DadosVendas, RegraComissao, ProdutoEspecial, ComissaoPadrao,
+    Vendedor, AjusteFinanceiro, AjusteFaturamento
+)
+TABELAS_VERSIONADAS = {modelo.__tablename__ for modelo in MODELOS_VERSIONADOS}
+
+_CHAVE_ALTERADO = 'dados_relatorio_alterados'
+
+
+class CacheLRU:
+    """Cache em memória com tamanho máximo, descarte LRU e contadores de acerto/erro"""
+
+    def __init__(self, max_entradas):
+        self.max_entradas = max_entradas
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.erros = 0
+        self.descartes = 0
+
+    def get(self, chave):
+        with self._lock:
+            if chave in self._dados:
+                self._dados.move_to_end(chave)
+                self.acertos += 1
+                return self._dados[chave]
+            self.erros += 1
+            return None
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = valor
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+                self.descartes += 1
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.erros
+            return {
+                'entradas': len(self._dados),
+                'max_entradas': self.max_entradas,
+                'acertos': self.acertos,
+                'erros': self.erros,
+                'descartes': self.descartes,
+                'taxa_acerto': (self.acertos / consultas) if consultas else 0.0,
+            }
+
+
+_cache_lock = threading.Lock()
+
+
+def identificador_banco():
+    """Identifica o banco da aplicação (URL do engine, sem a senha) nas chaves de cache"""
+    return db.engine.url.render_as_string(hide_password=True)
+
+
+def obter_cache_relatorios():
+    """Retorna o cache de relatórios da aplicação, criando-o com o REPORT_CACHE_MAX_ENTRIES dela"""
+    app = current_app._get_current_object()
+    cache = app.extensions.get('cache_relatorios')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('cache_relatorios')
+            if cache is None:
+                cache = app.extensions['cache_relatorios'] = CacheLRU(app.config['REPORT_CACHE_MAX_ENTRIES'])
+    return cache
+
+
+def _versionamento_disponivel(connection):
+    """Verifica (uma vez por aplicação e banco) se a tabela de versão já foi criada"""
+    tabelas_versao = current_app.extensions.setdefault('tabela_versao_dados', {})
+    existe = tabelas_versao.get(connection.engine)
+    if existe is None:
+        existe = tabelas_versao[connection.engine] = inspect(connection).has_table(VersaoDados.__tablename__)
+        if not existe:
+            print("⚠️ Tabela versao_dados não encontrada: cache de relatórios desativado (execute update_database.py)")
+    return existe
+
+
+def obter_versao_dados():
+    """Retorna a versão atual dos dados de relatório, ou None se o versionamento não estiver disponível"""
+    if not _versionamento_disponivel(db.session.connection()):
+        return None
+    versao = db.session.execute(select(VersaoDados.versao).where(VersaoDados.id == 1)).scalar()
+    return versao or 0
+
+
+def _incrementar_versao(session):
+    """Incrementa a versão dos dados na mesma transação da alteração"""
+    connection = session.connection()
+    if not _versionamento_disponivel(connection):
+        return
+    tabela = VersaoDados.__table__
+    resultado = connection.execute(
+        update(tabela).where(tabela.c.id == 1).values(versao=tabela.c.versao + 1, data_atualizacao=datetime.utcnow())
+    )
+    if resultado.rowcount == 0:
+        connection.execute(insert(tabela).values(id=1, versao=1, data_atualizacao=datetime.utcnow()))
+
+
+def _tem_objetos_versionados(objetos):
+    return any(isinstance(obj, MODELOS_VERSIONADOS) for obj in objetos)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _marcar_alteracoes_flush(session, flush_context):
+    if _tem_objetos_versionados(session.new) or _tem_objetos_versionados(session.dirty) or _tem_objetos_versionados(session.deleted):
+        session.info[_CHAVE_ALTERADO] = True
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _marcar_alteracoes_em_lote(orm_execute_state):
+    # INSERT/UPDATE/DELETE em lote (Query.delete(), insert(tabela) com executemany...)
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        tabela = getattr(orm_execute_state.statement, 'table', None)
+        if tabela is not None and tabela.name in TABELAS_VERSIONADAS:
+            orm_execute_state.session.info[_CHAVE_ALTERADO] = True
+
+
+@event.listens_for(db.session, 'before_commit')
+def _incrementar_versao_antes_commit(session):
+    pendentes = session.new | session.dirty | session.deleted
+    if session.info.get(_CHAVE_ALTERADO) or _tem_objetos_versionados(pendentes):
+        _incrementar_versao(session)
+
+
+@event.listens_for(db.session, 'after_commit')
+@event.listens_for(db.session, 'after_rollback')
+def _limpar_marcacao(session):
+    session.info.pop(_CHAVE_ALTERADO, None)
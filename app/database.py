@@ -0,0 +1,158 @@
+from sqlalchemy import event
+
+# Perfil aplicado a cada nova conexão SQLite (banco principal e bind 'tarefas').
+#
+# Modelo de concorrência com journal_mode=WAL:
+# - leitores não bloqueiam o escritor nem são bloqueados por ele: cada leitura enxerga
+#   o último commit anterior ao seu início. Durante uma importação (DELETE + INSERT do
+#   mês em uma única transação) os relatórios continuam sendo servidos com os dados
+#   antigos, e a versão dos dados (VersaoDados) só muda no commit, junto com as vendas.
+#   O pysqlite só abre transação em DML: cada SELECT vê o último commit e nunca um
+#   mês gravado pela metade;
+# - há um único escritor por vez: outra gravação (ex.: salvar um ajuste durante a
+#   importação) espera até busy_timeout e então falha com "database is locked". Por
+#   isso as importações de intervalo gravam por um único escritor e as tarefas usam
+#   um banco separado;
+# - o WAL é incorporado ao banco nos checkpoints automáticos; leituras muito longas
+#   adiam o checkpoint e o arquivo -wal cresce (journal_size_limit o reduz depois).
+# O WAL exige que todos os processos estejam na mesma máquina (não use em disco de rede).
+
+# Pragma -> configuração, na ordem de aplicação; valores vazios são ignorados
+_PRAGMAS_CONFIG = (
+    ('journal_mode', 'SQLITE_JOURNAL_MODE'),
+    ('synchronous', 'SQLITE_SYNCHRONOUS'),
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS'),
+    ('cache_size', 'SQLITE_CACHE_SIZE_KB'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE'),
+    ('temp_store', 'SQLITE_TEMP_STORE'),
+    ('journal_size_limit', 'SQLITE_JOURNAL_SIZE_LIMIT'),
+)
+
+
+def obter_pragmas_sqlite(config):
+    """Lista de (pragma, valor) do perfil configurado"""
+    if not config['SQLITE_PRAGMAS_ENABLED']:
+        return []
+
+    pragmas = []
+    for pragma, chave in _PRAGMAS_CONFIG:
+        valor = config[chave]
+        if valor is None or valor == '':
+            continue
+        if pragma == 'cache_size':
+            # Valor negativo = tamanho em KiB (em vez de número de páginas)
+            valor = -abs(int(valor))
+        pragmas.append((pragma, valor))
+    return pragmas
+
+
+def _aplicar_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, valor in pragmas:
+            cursor.execute(f"PRAGMA {pragma} = {valor}")
+    finally:
+        cursor.close()
+
+
+def configurar_sqlite(app, db):
+    """
+    Registra o perfil de pragmas nos engines SQLite da aplicação, aplicado a cada
+    conexão aberta pelo pool. Engines de outros bancos não são alterados.
+    """
+    pragmas = obter_pragmas_sqlite(app.config)
+    if not pragmas:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name != 'sqlite' or getattr(engine, '_perfil_sqlite', False):
+                continue
+            event.listen(engine, 'connect', lambda dbapi_connection, _: _aplicar_pragmas(dbapi_connection, pragmas))
+            engine._perfil_sqlite = True
+
+
+def adicionar_dia_venda_ao_cache(engine):
+    """
+    Acrescenta a coluna dia_venda a um cache de vendas anterior a ela. As linhas já
+    importadas não têm o dia, então as marcas d'água são marcadas como vencidas: a
+    próxima importação incremental de cada período faz a reconciliação completa.
+    Retorna False se a coluna já existir.
+    """
+    from sqlalchemy import inspect
+    from .models import DadosVendas
+
+    with engine.begin() as conexao:
+        colunas = {coluna['name'] for coluna in inspect(conexao).get_columns(DadosVendas.__tablename__)}
+        if not colunas or 'dia_venda' in colunas:
+            return False
+
+        conexao.exec_driver_sql("BEGIN")
+        conexao.exec_driver_sql("ALTER TABLE dados_vendas ADD COLUMN dia_venda DATE")
+        conexao.exec_driver_sql("UPDATE controle_importacao SET ultima_importacao_completa = NULL")
+    return True
+
+
+def adicionar_marca_catalogo_produtos(engine):
+    """
+    Acrescenta a marca d'água (ultima_data_venda) ao controle da sincronização de
+    produtos. Sem marca, a próxima sincronização é completa e a registra.
+    Retorna False se a coluna já existir.
+    """
+    from sqlalchemy import inspect
+    from .models import ControleSincronizacaoProdutos
+
+    with engine.begin() as conexao:
+        tabela = ControleSincronizacaoProdutos.__tablename__
+        colunas = {coluna['name'] for coluna in inspect(conexao).get_columns(tabela)}
+        if not colunas or 'ultima_data_venda' in colunas:
+            return False
+
+        conexao.exec_driver_sql(f"ALTER TABLE {tabela} ADD COLUMN ultima_data_venda DATETIME")
+    return True
+
+
+def migrar_dados_vendas_para_dimensoes(engine):
+    """
+    Converte um cache de vendas no formato antigo (seller_name e product_desc repetidos
+    em cada linha de dados_vendas) para as dimensões DimensaoVendedor e DimensaoProduto.
+    Roda em uma única transação; retorna False se o banco já estiver no formato novo.
+    """
+    from sqlalchemy import inspect
+    from .models import DadosVendas, DimensaoVendedor, DimensaoProduto
+
+    with engine.begin() as conexao:
+        colunas = {coluna['name'] for coluna in inspect(conexao).get_columns(DadosVendas.__tablename__)}
+        if 'seller_name' not in colunas:
+            return False
+
+        # O pysqlite só abre a transação antes de DML: o BEGIN explícito inclui o DDL
+        conexao.exec_driver_sql("BEGIN")
+        conexao.exec_driver_sql("DROP INDEX IF EXISTS idx_mes_ano_vendedor_produto")
+        conexao.exec_driver_sql("ALTER TABLE dados_vendas RENAME TO dados_vendas_antiga")
+        for modelo in (DimensaoVendedor, DimensaoProduto, DadosVendas):
+            modelo.__table__.create(conexao, checkfirst=True)
+
+        conexao.exec_driver_sql(
+            "INSERT OR IGNORE INTO dimensao_vendedor (codigo, nome) "
+            "SELECT DISTINCT seller_code, seller_name FROM dados_vendas_antiga"
+        )
+        conexao.exec_driver_sql(
+            "INSERT OR IGNORE INTO dimensao_produto (codigo, descricao) "
+            "SELECT DISTINCT product_code, product_desc FROM dados_vendas_antiga"
+        )
+        conexao.exec_driver_sql(
+            "INSERT INTO dados_vendas (id, mes, ano, vendedor_id, produto_id, revenue, valor_ret_merc, "
+            "valor_titulo_aberto, valor_acresc_titulo_pago_mes_ant, data_importacao) "
+            "SELECT a.id, a.mes, a.ano, v.id, p.id, a.revenue, a.valor_ret_merc, "
+            "a.valor_titulo_aberto, a.valor_acresc_titulo_pago_mes_ant, a.data_importacao "
+            "FROM dados_vendas_antiga a "
+            "JOIN dimensao_vendedor v ON v.codigo = a.seller_code AND v.nome = a.seller_name "
+            "JOIN dimensao_produto p ON p.codigo = a.product_code AND p.descricao = a.product_desc"
+        )
+        conexao.exec_driver_sql("DROP TABLE dados_vendas_antiga")
+
+    # Devolve ao sistema de arquivos o espaço liberado pelos textos repetidos
+    with engine.connect() as conexao:
+        conexao.exec_driver_sql("VACUUM")
+    return True
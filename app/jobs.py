@@ -0,0 +1,313 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .metrics import METRICA_TAREFAS, coletar_fases, observar, registrar_evento, resumir_fases
+from .models import TarefaSegundoPlano
+from .services import import_month_data, import_month_range, sincronizar_produtos_oracle, meses_do_intervalo
+
+# Tarefas em segundo plano: o estado fica na tabela TarefaSegundoPlano (bind 'tarefas',
+# arquivo SQLite próprio) e a execução em um pool de threads do processo. Todas as
+# gravações de estado usam conexões curtas do engine 'tarefas', fora de db.session,
+# para não se misturar com a transação da tarefa no banco principal.
+
+STATUS_ATIVOS = ('pendente', 'executando')
+
+# Intervalo mínimo entre gravações de progresso (segundos)
+INTERVALO_PROGRESSO = 0.5
+
+_tabela = TarefaSegundoPlano.__table__
+
+_executor = None
+_executor_lock = threading.Lock()
+_tarefas_ativas = {}  # id -> app das tarefas pendentes/em execução neste processo (recebem sinal de vida)
+_tarefas_ativas_lock = threading.Lock()
+
+
+class TarefaDuplicadaError(Exception):
+    """Já existe uma tarefa ativa com a mesma chave"""
+
+    def __init__(self, tarefa):
+        super().__init__(f"Já existe uma tarefa em andamento para '{tarefa['chave']}'")
+        self.tarefa = tarefa
+
+
+def _tarefa_importacao(mes, ano, modo=None, incremental=False, progresso=None):
+    return import_month_data(mes, ano, modo, incremental, progresso=progresso)
+
+
+def _tarefa_importacao_intervalo(mes_ini, ano_ini, mes_fim, ano_fim, modo=None, progresso=None):
+    return import_month_range(mes_ini, ano_ini, mes_fim, ano_fim, modo, progresso=progresso)
+
+
+def _tarefa_sincronizacao_produtos(completa=False, progresso=None):
+    return sincronizar_produtos_oracle(progresso=progresso, completa=completa)
+
+
+# Tipo de tarefa -> função que retorna (sucesso, mensagem) ou (sucesso, mensagem, resultado)
+TIPOS_TAREFA = {
+    'importacao': _tarefa_importacao,
+    'importacao_intervalo': _tarefa_importacao_intervalo,
+    'sincronizacao_produtos': _tarefa_sincronizacao_produtos,
+}
+
+
+def _engine_tarefas():
+    return db.engines['tarefas']
+
+
+def _serializar(row):
+    """Converte uma linha da tabela de tarefas em dicionário para a API"""
+    if row is None:
+        return None
+    tarefa = dict(row._mapping)
+    tarefa['parametros'] = json.loads(tarefa['parametros']) if tarefa['parametros'] else {}
+    tarefa['resultado'] = json.loads(tarefa['resultado']) if tarefa['resultado'] else None
+    for campo in ('data_criacao', 'data_inicio', 'data_fim', 'data_atualizacao'):
+        if tarefa[campo] is not None:
+            tarefa[campo] = tarefa[campo].isoformat()
+    return tarefa
+
+
+def _atualizar_tarefa(tarefa_id, **valores):
+    """Grava o estado da tarefa em uma transação curta, registrando o sinal de vida"""
+    valores.setdefault('data_atualizacao', datetime.utcnow())
+    with _engine_tarefas().begin() as connection:
+        connection.execute(update(_tabela).where(_tabela.c.id == tarefa_id).values(**valores))
+
+
+def obter_tarefa(tarefa_id):
+    """Retorna o estado de uma tarefa (ou None se não existir)"""
+    with _engine_tarefas().connect() as connection:
+        row = connection.execute(select(_tabela).where(_tabela.c.id == tarefa_id)).first()
+    return _serializar(row)
+
+
+def listar_tarefas(limite=20):
+    """Retorna as tarefas mais recentes"""
+    with _engine_tarefas().connect() as connection:
+        rows = connection.execute(
+            select(_tabela).order_by(_tabela.c.data_criacao.desc(), _tabela.c.id.desc()).limit(limite)
+        ).all()
+    return [_serializar(row) for row in rows]
+
+
+def _liberar_tarefas_abandonadas(connection, chave):
+    """
+    Marca como erro as tarefas ativas da chave sem sinal de vida há mais de
+    JOBS_STALE_SECONDS (ex.: o processo foi encerrado durante a execução)
+    """
+    agora = datetime.utcnow()
+    limite = agora - timedelta(seconds=current_app.config['JOBS_STALE_SECONDS'])
+    connection.execute(
+        update(_tabela)
+        .where(_tabela.c.chave == chave, _tabela.c.status.in_(STATUS_ATIVOS), _tabela.c.data_atualizacao < limite)
+        .values(status='erro', sucesso=False, mensagem='Tarefa abandonada: sem sinal de vida do processo', data_fim=agora)
+    )
+
+
+def _meses_importados(tipo, parametros):
+    """Meses (mes, ano) gravados por uma tarefa de importação (vazio para os outros tipos)"""
+    if tipo == 'importacao':
+        return {(parametros['mes'], parametros['ano'])}
+    if tipo == 'importacao_intervalo':
+        return set(meses_do_intervalo(
+            parametros['mes_ini'], parametros['ano_ini'], parametros['mes_fim'], parametros['ano_fim']
+        ))
+    return set()
+
+
+def _importacao_sobreposta(connection, meses):
+    """
+    Tarefa de importação ativa (com sinal de vida) que grava algum dos meses, ou None.
+    As chaves não bastam: um intervalo e um mês dele, ou dois intervalos que se
+    sobrepõem, têm chaves diferentes e gravariam o mesmo mês ao mesmo tempo.
+    """
+    limite = datetime.utcnow() - timedelta(seconds=current_app.config['JOBS_STALE_SECONDS'])
+    ativas = connection.execute(
+        select(_tabela).where(
+            _tabela.c.tipo.in_(('importacao', 'importacao_intervalo')),
+            _tabela.c.status.in_(STATUS_ATIVOS),
+            _tabela.c.data_atualizacao >= limite
+        )
+    ).all()
+    for row in ativas:
+        if _meses_importados(row.tipo, json.loads(row.parametros or '{}')) & meses:
+            return row
+    return None
+
+
+def enfileirar_tarefa(tipo, chave, **parametros):
+    """
+    Registra a tarefa e a envia para o pool de threads. Lança TarefaDuplicadaError
+    se já houver uma tarefa ativa com a mesma chave (em qualquer processo) ou, nas
+    importações, uma importação ativa de algum dos mesmos meses.
+    """
+    if tipo not in TIPOS_TAREFA:
+        raise ValueError(f"Tipo de tarefa inválido: {tipo}")
+
+    meses = _meses_importados(tipo, parametros)
+    engine = _engine_tarefas()
+    for _ in range(2):
+        try:
+            with engine.begin() as connection:
+                if meses:
+                    # Trava de escrita desde a verificação: dois processos não registram
+                    # importações sobrepostas ao mesmo tempo
+                    connection.exec_driver_sql("BEGIN IMMEDIATE")
+                    sobreposta = _importacao_sobreposta(connection, meses)
+                    if sobreposta is not None:
+                        raise TarefaDuplicadaError(_serializar(sobreposta))
+                _liberar_tarefas_abandonadas(connection, chave)
+                agora = datetime.utcnow()
+                tarefa_id = connection.execute(insert(_tabela).values(
+                    tipo=tipo, chave=chave, parametros=json.dumps(parametros), status='pendente',
+                    progresso=0.0, mensagem='Aguardando execução...',
+                    data_criacao=agora, data_atualizacao=agora
+                )).inserted_primary_key[0]
+            break
+        except IntegrityError:
+            with engine.connect() as connection:
+                existente = connection.execute(
+                    select(_tabela).where(_tabela.c.chave == chave, _tabela.c.status.in_(STATUS_ATIVOS))
+                ).first()
+            # Se a tarefa ativa terminou nesse intervalo, tenta inserir de novo
+            if existente is not None:
+                raise TarefaDuplicadaError(_serializar(existente))
+    else:
+        raise RuntimeError(f"Não foi possível registrar a tarefa '{chave}'")
+
+    app = current_app._get_current_object()
+    with _tarefas_ativas_lock:
+        _tarefas_ativas[tarefa_id] = app
+    _obter_executor(app).submit(_executar_tarefa, app, tarefa_id, tipo, parametros)
+    print(f"🗂️ Tarefa {tarefa_id} ({chave}) enfileirada")
+    return obter_tarefa(tarefa_id)
+
+
+def enfileirar_importacao(mes, ano, modo=None, incremental=False):
+    """Importação de um mês em segundo plano (sem outra importação ativa do mesmo mês)"""
+    return enfileirar_tarefa(
+        'importacao', f"importacao:{ano}-{mes:02d}",
+        mes=mes, ano=ano, modo=modo, incremental=incremental
+    )
+
+
+def enfileirar_importacao_intervalo(mes_ini, ano_ini, mes_fim, ano_fim, modo=None):
+    """Importação de um intervalo de meses em segundo plano (sem outra importação ativa dos mesmos meses)"""
+    return enfileirar_tarefa(
+        'importacao_intervalo', f"importacao:{ano_ini}-{mes_ini:02d}:{ano_fim}-{mes_fim:02d}",
+        mes_ini=mes_ini, ano_ini=ano_ini, mes_fim=mes_fim, ano_fim=ano_fim, modo=modo
+    )
+
+
+def enfileirar_sincronizacao_produtos(completa=False):
+    """Sincronização do catálogo de produtos em segundo plano (uma por vez)"""
+    return enfileirar_tarefa('sincronizacao_produtos', 'sincronizacao_produtos', completa=completa)
+
+
+def _executar_tarefa(app, tarefa_id, tipo, parametros):
+    """Executa a tarefa em uma thread do pool, registrando início, progresso e resultado"""
+    with app.app_context():
+        try:
+            _atualizar_tarefa(tarefa_id, status='executando', data_inicio=datetime.utcnow(), mensagem='Iniciando...')
+
+            ultimo = {'instante': 0.0, 'percentual': None}
+
+            def progresso(percentual=None, mensagem=None):
+                # Limita a frequência das gravações, exceto quando o percentual muda
+                agora = time.monotonic()
+                mesmo_percentual = percentual is None or percentual == ultimo['percentual']
+                if mesmo_percentual and agora - ultimo['instante'] < INTERVALO_PROGRESSO:
+                    return
+                ultimo['instante'] = agora
+                valores = {}
+                if percentual is not None:
+                    ultimo['percentual'] = percentual
+                    valores['progresso'] = min(max(float(percentual), 0.0), 100.0)
+                if mensagem:
+                    valores['mensagem'] = mensagem
+                _atualizar_tarefa(tarefa_id, **valores)
+
+            resultado = None
+            inicio = time.monotonic()
+            with coletar_fases() as fases:
+                try:
+                    retorno = TIPOS_TAREFA[tipo](progresso=progresso, **parametros)
+                    sucesso, mensagem = retorno[:2]
+                    if len(retorno) > 2:
+                        resultado = retorno[2]
+                except Exception as e:
+                    sucesso, mensagem = False, f"Erro inesperado: {e}"
+                finally:
+                    # Conexão da thread com o banco principal
+                    db.session.remove()
+            duracao = time.monotonic() - inicio
+            if app.config['METRICS_ENABLED']:
+                observar(METRICA_TAREFAS, duracao, tipo=tipo, sucesso=bool(sucesso))
+                registrar_evento(
+                    'tarefa', tarefa_id=tarefa_id, tipo=tipo, sucesso=bool(sucesso),
+                    duracao_ms=round(duracao * 1000, 3), fases=resumir_fases(fases)
+                )
+
+            valores = {
+                'status': 'concluida' if sucesso else 'erro',
+                'sucesso': bool(sucesso),
+                'mensagem': mensagem,
+                'resultado': json.dumps(resultado) if resultado is not None else None,
+                'data_fim': datetime.utcnow(),
+            }
+            if sucesso:
+                valores['progresso'] = 100.0
+            _atualizar_tarefa(tarefa_id, **valores)
+            print(f"{'✅' if sucesso else '❌'} Tarefa {tarefa_id} finalizada: {mensagem}")
+        except Exception as e:
+            print(f"❌ Erro ao registrar o estado da tarefa {tarefa_id}: {e}")
+        finally:
+            with _tarefas_ativas_lock:
+                _tarefas_ativas.pop(tarefa_id, None)
+
+
+def _enviar_sinal_de_vida(intervalo):
+    """Atualiza periodicamente data_atualizacao das tarefas ativas deste processo"""
+    while True:
+        time.sleep(intervalo)
+        with _tarefas_ativas_lock:
+            ativas = list(_tarefas_ativas.items())
+
+        por_app = {}
+        for tarefa_id, app in ativas:
+            por_app.setdefault(app, []).append(tarefa_id)
+
+        for app, ids in por_app.items():
+            try:
+                with app.app_context():
+                    with _engine_tarefas().begin() as connection:
+                        connection.execute(
+                            update(_tabela)
+                            .where(_tabela.c.id.in_(ids), _tabela.c.status.in_(STATUS_ATIVOS))
+                            .values(data_atualizacao=datetime.utcnow())
+                        )
+            except Exception as e:
+                print(f"⚠️ Erro ao registrar sinal de vida das tarefas: {e}")
+
+
+def _obter_executor(app):
+    """Cria (uma vez por processo) o pool de threads e a thread de sinal de vida"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                threading.Thread(
+                    target=_enviar_sinal_de_vida, args=(app.config['JOBS_HEARTBEAT_SECONDS'],),
+                    name='tarefas-sinal-de-vida', daemon=True
+                ).start()
+                _executor = ThreadPoolExecutor(
+                    max_workers=app.config['JOBS_MAX_WORKERS'], thread_name_prefix='tarefa'
+                )
+    return _executor
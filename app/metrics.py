@@ -0,0 +1,253 @@
+import bisect
+import contextvars
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from flask import current_app, g, has_app_context, request
+from flask.signals import before_render_template, template_rendered
+
+# Métricas do processo em memória (histogramas de duração), exportadas em /metrics no
+# formato texto do Prometheus e registradas como logs JSON no logger 'comissoes.metricas'.
+# Cada processo (worker) tem as suas: o Prometheus deve coletar todos os workers.
+
+logger = logging.getLogger('comissoes.metricas')
+
+# Limites (segundos) dos buckets dos histogramas
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+METRICA_FASES = 'comissoes_fase_duracao_segundos'
+METRICA_REQUISICOES = 'comissoes_requisicao_duracao_segundos'
+METRICA_TAREFAS = 'comissoes_tarefa_duracao_segundos'
+
+# nome -> (descrição, buckets); métricas de outros módulos são declaradas com definir_metrica
+_definicoes = {
+    METRICA_FASES: ('Duração de cada fase da importação, dos relatórios e dos PDFs', BUCKETS_DURACAO),
+    METRICA_REQUISICOES: ('Latência das requisições HTTP por rota', BUCKETS_DURACAO),
+    METRICA_TAREFAS: ('Duração das tarefas em segundo plano', BUCKETS_DURACAO),
+}
+
+# Fases medidas na requisição/tarefa corrente, para o log de resumo
+_fases_atuais = contextvars.ContextVar('fases_metricas', default=None)
+
+
+class Histograma:
+    """Contagem por bucket, soma e total de observações"""
+
+    def __init__(self, buckets=BUCKETS_DURACAO):
+        self.buckets = buckets
+        self.contagens = [0] * len(buckets)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        posicao = bisect.bisect_left(self.buckets, valor)
+        if posicao < len(self.contagens):
+            self.contagens[posicao] += 1
+        self.soma += valor
+        self.total += 1
+
+
+_histogramas = {}  # nome -> {rótulos (tupla de pares): Histograma}
+_histogramas_lock = threading.Lock()
+
+
+def definir_metrica(nome, descricao, buckets=BUCKETS_DURACAO):
+    """Declara a descrição e os buckets de um histograma"""
+    _definicoes[nome] = (descricao, tuple(buckets))
+
+
+def _metricas_ativas():
+    return not has_app_context() or current_app.config['METRICS_ENABLED']
+
+
+def observar(nome, valor, **rotulos):
+    """Registra uma observação no histograma 'nome' com os rótulos informados"""
+    chave = tuple(sorted((rotulo, str(valor_rotulo)) for rotulo, valor_rotulo in rotulos.items()))
+    with _histogramas_lock:
+        serie = _histogramas.setdefault(nome, {})
+        histograma = serie.get(chave)
+        if histograma is None:
+            buckets = _definicoes.get(nome, (nome, BUCKETS_DURACAO))[1]
+            histograma = serie[chave] = Histograma(buckets)
+        histograma.observar(valor)
+
+
+def registrar_evento(evento, nivel=logging.INFO, **campos):
+    """Log estruturado: uma linha JSON por evento"""
+    if not logger.isEnabledFor(nivel):
+        return
+    registro = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'evento': evento, **campos}
+    logger.log(nivel, json.dumps(registro, ensure_ascii=False, default=str))
+
+
+def registrar_fase(operacao, fase, duracao, **campos):
+    """Registra a duração (segundos) de uma fase já medida"""
+    if not _metricas_ativas():
+        return
+    observar(METRICA_FASES, duracao, operacao=operacao, fase=fase)
+    fases = _fases_atuais.get()
+    if fases is not None:
+        fases.append((operacao, fase, duracao))
+    registrar_evento('fase', logging.DEBUG, operacao=operacao, fase=fase,
+                     duracao_ms=round(duracao * 1000, 3), **campos)
+
+
+@contextmanager
+def medir_fase(operacao, fase, **campos):
+    """Mede o bloco como uma fase da operação"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_fase(operacao, fase, time.perf_counter() - inicio, **campos)
+
+
+class Cronometro:
+    """
+    Mede fases consecutivas de uma função sem reestruturar o código:
+    cada marcar(fase) registra o tempo decorrido desde a marcação anterior.
+    """
+
+    def __init__(self, operacao):
+        self.operacao = operacao
+        self._ultimo = time.perf_counter()
+
+    def marcar(self, fase, **campos):
+        agora = time.perf_counter()
+        registrar_fase(self.operacao, fase, agora - self._ultimo, **campos)
+        self._ultimo = agora
+
+    def reiniciar(self):
+        """Descarta o tempo desde a última marcação (ex.: trecho que não é de nenhuma fase)"""
+        self._ultimo = time.perf_counter()
+
+
+@contextmanager
+def coletar_fases():
+    """Acumula as fases medidas no bloco (ex.: uma tarefa em segundo plano)"""
+    fases = []
+    token = _fases_atuais.set(fases)
+    try:
+        yield fases
+    finally:
+        _fases_atuais.reset(token)
+
+
+def resumir_fases(fases):
+    """{'operacao.fase': milissegundos somados} para o log de resumo"""
+    resumo = {}
+    for operacao, fase, duracao in fases:
+        chave = f"{operacao}.{fase}"
+        resumo[chave] = resumo.get(chave, 0.0) + duracao * 1000
+    return {chave: round(ms, 3) for chave, ms in resumo.items()}
+
+
+def _antes_da_requisicao():
+    g._metricas_inicio = time.perf_counter()
+    _fases_atuais.set([])
+
+
+def _depois_da_requisicao(response):
+    inicio = g.pop('_metricas_inicio', None)
+    if inicio is None or not current_app.config['METRICS_ENABLED']:
+        return response
+    duracao = time.perf_counter() - inicio
+    # A regra da rota (ex.: '/api/tarefas/<int:tarefa_id>') mantém a cardinalidade baixa
+    rota = request.url_rule.rule if request.url_rule is not None else 'sem_rota'
+    observar(METRICA_REQUISICOES, duracao, metodo=request.method, rota=rota, status=response.status_code)
+    registrar_evento(
+        'requisicao', metodo=request.method, rota=rota, caminho=request.path,
+        status=response.status_code, duracao_ms=round(duracao * 1000, 3),
+        fases=resumir_fases(_fases_atuais.get() or [])
+    )
+    return response
+
+
+def _fim_da_requisicao(exc):
+    _fases_atuais.set(None)
+
+
+def _antes_do_template(sender, template, context, **extra):
+    g.setdefault('_metricas_templates', []).append(time.perf_counter())
+
+
+def _template_renderizado(sender, template, context, **extra):
+    inicios = g.get('_metricas_templates')
+    if inicios:
+        registrar_fase('template', template.name or 'sem_nome', time.perf_counter() - inicios.pop())
+
+
+def configurar_metricas(app):
+    """Registra a medição das requisições e dos templates e o handler do log estruturado"""
+    if 'metricas' in app.extensions:
+        return
+    app.extensions['metricas'] = True
+
+    app.before_request(_antes_da_requisicao)
+    app.after_request(_depois_da_requisicao)
+    app.teardown_request(_fim_da_requisicao)
+    before_render_template.connect(_antes_do_template, app)
+    template_rendered.connect(_template_renderizado, app)
+
+    # Sem configuração de logging própria da implantação, escreve as linhas JSON no stderr
+    if app.config['METRICS_STRUCTURED_LOG'] and not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(app.config['METRICS_LOG_LEVEL'])
+        logger.propagate = False
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ''
+    partes = []
+    for nome, valor in rotulos:
+        valor = valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{nome}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _formatar_numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def gerar_metricas_prometheus():
+    """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+    linhas = []
+    with _histogramas_lock:
+        for nome in sorted(_histogramas):
+            linhas.append(f"# HELP {nome} {_definicoes.get(nome, (nome,))[0]}")
+            linhas.append(f"# TYPE {nome} histogram")
+            for rotulos, histograma in sorted(_histogramas[nome].items()):
+                acumulado = 0
+                for limite, contagem in zip(histograma.buckets, histograma.contagens):
+                    acumulado += contagem
+                    linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos + (('le', repr(limite)),))} {acumulado}")
+                linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos + (('le', '+Inf'),))} {histograma.total}")
+                linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {_formatar_numero(histograma.soma)}")
+                linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {histograma.total}")
+
+    # Contadores do cache de relatórios (já mantidos por CacheLRU)
+    from .cache import obter_cache_relatorios
+    estatisticas = obter_cache_relatorios().estatisticas()
+    for nome, tipo, descricao, valor in (
+        ('comissoes_cache_relatorios_acertos_total', 'counter', 'Relatórios servidos do cache', estatisticas['acertos']),
+        ('comissoes_cache_relatorios_erros_total', 'counter', 'Relatórios calculados (ausentes do cache)', estatisticas['erros']),
+        ('comissoes_cache_relatorios_entradas', 'gauge', 'Relatórios mantidos no cache', estatisticas['entradas']),
+    ):
+        linhas.append(f"# HELP {nome} {descricao}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        linhas.append(f"{nome} {valor}")
+
+    return '\n'.join(linhas) + '\n'
+
+
+def limpar_metricas():
+    """Zera os histogramas do processo (usado nos testes)"""
+    with _histogramas_lock:
+        _histogramas.clear()
@@ -51,7 +51,7 @@ class ProdutoOracleCache(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     codigo_produto = db.Column(db.String(50), nullable=False, unique=True)
     nome_produto = db.Column(db.String(255), nullable=False)
-    data_sincronizacao = db.Column(db.DateTime, default=datetime.utcnow)
+    data_sincronizacao = db.Column(db.DateTime, default=datetime.utcnow)  # Última inclusão/alteração vinda do Oracle
     
     # Índice para busca rápida
     __table_args__ = (
@@ -59,24 +59,82 @@ class ProdutoOracleCache(db.Model):
         db.Index('idx_nome_produto', 'nome_produto'),
     )
 
+class DimensaoVendedor(db.Model):
+    """
+    Dimensão de vendedores do cache de vendas: cada par (código, nome) vindo do Oracle
+    é gravado uma única vez e referenciado pelo id em DadosVendas. Só recebe inserções
+    (os ids nunca mudam), preservando o nome usado em cada mês importado.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    codigo = db.Column(db.Integer, nullable=False)
+    nome = db.Column(db.String(150), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('codigo', 'nome', name='uq_dimensao_vendedor_codigo_nome'),
+    )
+
+class DimensaoProduto(db.Model):
+    """Dimensão de produtos do cache de vendas: cada par (código, descrição) uma única vez"""
+    id = db.Column(db.Integer, primary_key=True)
+    codigo = db.Column(db.String(50), nullable=False)
+    descricao = db.Column(db.String(255), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('codigo', 'descricao', name='uq_dimensao_produto_codigo_descricao'),
+    )
+
 class DadosVendas(db.Model):
-    """Modelo para armazenar dados de vendas em cache local"""
+    """
+    Modelo para armazenar dados de vendas em cache local. Vendedor e produto são
+    guardados como ids das dimensões; códigos e nomes são obtidos delas na leitura.
+    """
     id = db.Column(db.Integer, primary_key=True)
     mes = db.Column(db.Integer, nullable=False)
     ano = db.Column(db.Integer, nullable=False)
-    seller_code = db.Column(db.Integer, nullable=False)
-    seller_name = db.Column(db.String(150), nullable=False)
-    product_code = db.Column(db.String(50), nullable=False)
-    product_desc = db.Column(db.String(255), nullable=False)
+    vendedor_id = db.Column(db.Integer, db.ForeignKey('dimensao_vendedor.id'), nullable=False)
+    produto_id = db.Column(db.Integer, db.ForeignKey('dimensao_produto.id'), nullable=False)
     revenue = db.Column(db.Float, default=0.0)
     valor_ret_merc = db.Column(db.Float, default=0.0)
     valor_titulo_aberto = db.Column(db.Float, default=0.0)
     valor_acresc_titulo_pago_mes_ant = db.Column(db.Float, default=0.0)
+    dia_venda = db.Column(db.Date, nullable=True)  # Dia de todas as vendas da linha (nulo se somar vários dias)
     data_importacao = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relacionamentos (os relatórios leem o cache em lote, sem carregar objetos)
+    vendedor = db.relationship('DimensaoVendedor')
+    produto = db.relationship('DimensaoProduto')
+
+    __table_args__ = (
+        db.Index('idx_mes_ano_vendedor_produto', 'mes', 'ano', 'vendedor_id', 'produto_id'),
+    )
+
+class ControleImportacao(db.Model):
+    """Modelo para controlar a marca d'água (high-water mark) da importação de cada período"""
+    id = db.Column(db.Integer, primary_key=True)
+    mes = db.Column(db.Integer, nullable=False)
+    ano = db.Column(db.Integer, nullable=False)
+    modo = db.Column(db.String(20), nullable=False)  # Modo usado na última importação completa
+    ultima_data_venda = db.Column(db.DateTime, nullable=True)  # Maior DATA_VENDA já importada
+    ultima_importacao = db.Column(db.DateTime, default=datetime.utcnow)
+    ultima_importacao_completa = db.Column(db.DateTime, default=datetime.utcnow)
+    total_registros = db.Column(db.Integer, default=0)
+    
     __table_args__ = (
-        db.Index('idx_mes_ano_vendedor_produto', 'mes', 'ano', 'seller_code', 'product_code'),
+        db.UniqueConstraint('mes', 'ano', name='uq_controle_importacao_mes_ano'),
     )
 
+class ControleSincronizacaoProdutos(db.Model):
+    """Modelo com o horário e a marca d'água da última sincronização do catálogo de produtos (linha única)"""
+    id = db.Column(db.Integer, primary_key=True)
+    ultima_sincronizacao = db.Column(db.DateTime, nullable=False)
+    ultima_data_venda = db.Column(db.DateTime, nullable=True)  # Maior DATA_VENDA lida do Oracle
+
+class VersaoDados(db.Model):
+    """Modelo com a versão dos dados usados nos relatórios (incrementada a cada alteração)"""
+    id = db.Column(db.Integer, primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class AjusteFinanceiro(db.Model):
     """Modelo para armazenar ajustes financeiros manuais por vendedor e período"""
     id = db.Column(db.Integer, primary_key=True)
@@ -118,3 +176,34 @@ class AjusteFaturamento(db.Model):
         db.UniqueConstraint('vendedor_rca', 'mes', 'ano', name='uq_vendedor_mes_ano_ajuste_faturamento'),
         db.Index('idx_vendedor_mes_ano_ajuste_faturamento', 'vendedor_rca', 'mes', 'ano'),
     )
+
+class TarefaSegundoPlano(db.Model):
+    """
+    Modelo para as tarefas executadas em segundo plano (importações, sincronização de produtos).
+    Fica em um banco SQLite separado (bind 'tarefas') para que o progresso possa ser
+    gravado enquanto a importação mantém a transação do banco principal aberta.
+    """
+    __bind_key__ = 'tarefas'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(40), nullable=False)  # 'importacao', 'sincronizacao_produtos'
+    chave = db.Column(db.String(100), nullable=False)  # Identifica tarefas equivalentes (ex.: 'importacao:2025-01')
+    parametros = db.Column(db.Text, nullable=True)  # JSON com os argumentos da tarefa
+    status = db.Column(db.String(20), nullable=False, default='pendente')  # pendente, executando, concluida, erro
+    progresso = db.Column(db.Float, default=0.0)  # 0 a 100
+    mensagem = db.Column(db.Text, nullable=True)
+    sucesso = db.Column(db.Boolean, nullable=True)
+    resultado = db.Column(db.Text, nullable=True)  # JSON com detalhes do resultado (ex.: por mês)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+    data_inicio = db.Column(db.DateTime, nullable=True)
+    data_fim = db.Column(db.DateTime, nullable=True)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow)  # Sinal de vida enquanto executa
+
+    # No máximo uma tarefa ativa por chave (índice único parcial do SQLite)
+    __table_args__ = (
+        db.Index(
+            'uq_tarefa_ativa_chave', 'chave', unique=True,
+            sqlite_where=db.text("status IN ('pendente', 'executando')")
+        ),
+        db.Index('idx_tarefa_data_criacao', 'data_criacao'),
+    )
@@ -0,0 +1,148 @@
+import atexit
+import os
+import threading
+import time
+from flask import current_app
+
+# O módulo oracledb só é importado no primeiro uso do Oracle: a maior parte das
+# requisições (relatórios, cadastros) lê apenas o cache SQLite
+
+# Pool de sessões Oracle compartilhado por todo o processo (criado sob demanda)
+_pool = None
+_pool_lock = threading.Lock()
+
+# Modo do cliente escolhido para o processo ('thin' ou 'thick'); definido uma única vez
+_modo_cliente = None
+
+# Contadores de uso do pool, para dimensionamento
+_estatisticas_lock = threading.Lock()
+_aquisicoes = 0
+_tempo_total_aquisicao = 0.0
+_tempo_max_aquisicao = 0.0
+
+def init_oracle_client():
+    """
+    Define o modo do cliente Oracle do processo conforme ORACLE_CLIENT_MODE:
+    - 'thin': driver puro Python, sem Instant Client;
+    - 'thick': carrega o Instant Client de ORACLE_CLIENT_LIB_DIR (erro se não conseguir);
+    - 'auto': thick se ORACLE_CLIENT_LIB_DIR existir, senão thin.
+    O modo thick só pode ser ativado antes da primeira conexão, por isso é chamado
+    na criação do pool. Retorna o modo em uso.
+    """
+    global _modo_cliente
+    if _modo_cliente is not None:
+        return _modo_cliente
+
+    import oracledb
+
+    config = current_app.config
+    modo = config['ORACLE_CLIENT_MODE']
+    lib_dir = config['ORACLE_CLIENT_LIB_DIR']
+
+    if modo not in ('thin', 'thick', 'auto'):
+        raise ValueError(f"ORACLE_CLIENT_MODE inválido: {modo}")
+
+    if modo == 'auto':
+        if lib_dir and os.path.exists(lib_dir):
+            modo = 'thick'
+        else:
+            print(f"⚠️ Oracle Instant Client não encontrado em: {lib_dir}; usando o modo thin")
+            modo = 'thin'
+
+    if modo == 'thick':
+        try:
+            oracledb.init_oracle_client(lib_dir=lib_dir or None)
+            print(f"✓ Oracle Instant Client inicializado: {lib_dir}")
+        except Exception as e:
+            if config['ORACLE_CLIENT_MODE'] == 'thick':
+                raise
+            print(f"⚠️ Erro ao inicializar Oracle Instant Client: {e}; usando o modo thin")
+            modo = 'thin'
+
+    _modo_cliente = modo
+    return _modo_cliente
+
+def get_oracle_pool():
+    """
+    Retorna o pool de sessões Oracle do processo, criando-o no primeiro uso a partir
+    das configurações ORACLE_* da aplicação.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                import oracledb
+
+                init_oracle_client()
+                config = current_app.config
+                _pool = oracledb.create_pool(
+                    user=config['ORACLE_USER'],
+                    password=config['ORACLE_PASSWORD'],
+                    dsn=config['ORACLE_DSN'],
+                    min=config['ORACLE_POOL_MIN'],
+                    max=config['ORACLE_POOL_MAX'],
+                    increment=config['ORACLE_POOL_INCREMENT'],
+                    # Aguarda no máximo ORACLE_POOL_WAIT_TIMEOUT ms por uma sessão livre
+                    getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                    wait_timeout=config['ORACLE_POOL_WAIT_TIMEOUT'],
+                    # 0 = faz ping em toda aquisição; N = só se a sessão ficou ociosa por N segundos
+                    ping_interval=config['ORACLE_POOL_PING_INTERVAL'],
+                    # Fecha sessões ociosas acima do mínimo após este tempo (segundos)
+                    timeout=config['ORACLE_POOL_IDLE_TIMEOUT'],
+                    stmtcachesize=config['ORACLE_STMT_CACHE_SIZE'],
+                )
+                print(f"✓ Pool Oracle criado (modo {_modo_cliente}, min={config['ORACLE_POOL_MIN']}, max={config['ORACLE_POOL_MAX']})")
+                # Encerra as sessões no banco ao finalizar o processo (ou o worker)
+                atexit.register(close_oracle_pool)
+    return _pool
+
+def acquire_oracle_connection():
+    """
+    Obtém uma conexão do pool. Use com 'with': ao sair do bloco a sessão volta ao pool.
+    """
+    global _aquisicoes, _tempo_total_aquisicao, _tempo_max_aquisicao
+
+    pool = get_oracle_pool()
+    inicio = time.perf_counter()
+    connection = pool.acquire()
+    duracao = time.perf_counter() - inicio
+
+    with _estatisticas_lock:
+        _aquisicoes += 1
+        _tempo_total_aquisicao += duracao
+        _tempo_max_aquisicao = max(_tempo_max_aquisicao, duracao)
+
+    return connection
+
+def obter_estatisticas_pool():
+    """Retorna o estado atual do pool Oracle (ou None se ainda não foi criado)"""
+    if _pool is None:
+        return None
+
+    with _estatisticas_lock:
+        aquisicoes = _aquisicoes
+        tempo_total = _tempo_total_aquisicao
+        tempo_max = _tempo_max_aquisicao
+
+    return {
+        'modo_cliente': _modo_cliente,
+        'min': _pool.min,
+        'max': _pool.max,
+        'increment': _pool.increment,
+        'abertas': _pool.opened,
+        'ocupadas': _pool.busy,
+        'livres': _pool.opened - _pool.busy,
+        'wait_timeout_ms': _pool.wait_timeout,
+        'ping_interval_s': _pool.ping_interval,
+        'aquisicoes': aquisicoes,
+        'tempo_medio_aquisicao_ms': (tempo_total / aquisicoes * 1000) if aquisicoes else 0.0,
+        'tempo_max_aquisicao_ms': tempo_max * 1000,
+    }
+
+def close_oracle_pool():
+    """Fecha o pool Oracle do processo (registrado com atexit na criação do pool)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close(force=True)
+            _pool = None
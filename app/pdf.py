@@ -0,0 +1,547 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from flask import current_app
+from .cache import obter_versao_dados, identificador_banco
+from .metrics import Cronometro
+
+# O ReportLab é importado dentro das funções de layout: só é carregado quando um PDF
+# é de fato montado (não na inicialização nem quando o PDF vem do cache em disco)
+
+# Incrementar ao mudar o layout do PDF: invalida todos os arquivos já gerados
+VERSAO_LAYOUT_PDF = 1
+
+_estilos = None
+_cache_pdf_lock = threading.Lock()
+
+# Pool de processos para os extratos por vendedor (criado sob demanda e reaproveitado)
+_executor_extratos = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+
+def _obter_estilos():
+    """Estilos do relatório, criados uma única vez por processo"""
+    global _estilos
+    if _estilos is None:
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+        styles = getSampleStyleSheet()
+        _estilos = {
+            'titulo': ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=18,
+                spaceAfter=30,
+                alignment=1,  # Center
+                textColor=colors.darkblue
+            ),
+            'subtitulo': ParagraphStyle(
+                'CustomSubtitle',
+                parent=styles['Heading2'],
+                fontSize=14,
+                spaceAfter=20,
+                alignment=1,  # Center
+                textColor=colors.grey
+            ),
+            'vendedor': ParagraphStyle(
+                'SellerHeader',
+                parent=styles['Heading3'],
+                fontSize=12,
+                spaceAfter=10,
+                textColor=colors.white,
+                backColor=colors.darkblue
+            ),
+            'resumo': styles['Heading2'],
+            'rodape': ParagraphStyle(
+                'Footer',
+                parent=styles['Normal'],
+                fontSize=8,
+                alignment=1,  # Center
+                textColor=colors.grey
+            ),
+        }
+    return _estilos
+
+
+def _tabela_vendedor(seller):
+    """Monta a tabela de valores de um vendedor"""
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table, TableStyle
+
+    # Dados do vendedor
+    data = [
+        ['Descrição', 'Valor'],
+        ['Faturamento Oracle', f"R$ {seller['faturamentoOracle']:,.2f}"],
+    ]
+
+    # Adicionar ajuste manual se existir
+    if seller['ajusteFaturamento']['valorAjuste'] != 0:
+        ajuste_valor = seller['ajusteFaturamento']['valorAjuste']
+        ajuste_taxa = seller['ajusteFaturamento']['taxaComissaoAjuste']
+        sinal = '+' if ajuste_valor > 0 else ''
+        data.append([f'Ajuste Manual ({ajuste_taxa:.1%})', f"{sinal}R$ {ajuste_valor:,.2f}"])
+
+    data.extend([
+        ['FATURAMENTO TOTAL', f"R$ {seller['faturamentoFinal']:,.2f}"],
+    ])
+
+    # Adicionar produtos com comissão especial detalhados
+    if seller['details']['produtos_detalhados']:
+        data.append(['', ''])  # Linha em branco
+        data.append(['PRODUTOS COM COMISSÃO ESPECIAL', ''])
+
+        for produto in seller['details']['produtos_detalhados']:
+            taxa_percentual = produto['taxa_comissao'] * 100
+            data.append([
+                f"  {produto['nome_produto']} ({taxa_percentual:.1f}%)",
+                f"R$ {produto['faturamento_total']:,.2f} | R$ {produto['comissao_total']:,.2f}"
+            ])
+
+        data.append(['', ''])  # Linha em branco
+
+    # Adicionar outros produtos
+    if seller['details']['outros_produtos']['revenue'] > 0:
+        data.append(['OUTROS PRODUTOS', f"R$ {seller['details']['outros_produtos']['revenue']:,.2f} | R$ {seller['details']['outros_produtos']['commission']:,.2f}"])
+        data.append(['', ''])  # Linha em branco
+
+    data.extend([
+        ['Comissão s/ Faturamento Oracle', f"R$ {seller['comissaoBaseOracle']:,.2f}"],
+    ])
+
+    # Adicionar comissão do ajuste se existir
+    if seller['comissaoDoAjuste'] != 0:
+        data.append(['Comissão s/ Ajuste Manual', f"R$ {seller['comissaoDoAjuste']:,.2f}"])
+
+    data.extend([
+        ['COMISSÃO TOTAL (BASE)', f"R$ {seller['totalCommission']:,.2f}"],
+        ['(+) Valor Acrésc. Título Pago Mês Ant.', f"+ R$ {seller['ajustesFinanceiros']['valorAcrescTituloPagoMesAnt']:,.2f}"],
+        ['(-) Valor Ret. Merc. (Devolução)', f"- R$ {seller['ajustesFinanceiros']['valorRetMerc']:,.2f}"],
+        ['(-) Valor Título Aberto', f"- R$ {seller['ajustesFinanceiros']['valorTituloAberto']:,.2f}"],
+        ['COMISSÃO FINAL A PAGAR', f"R$ {seller['comissaoFinal']:,.2f}"],
+    ])
+
+    # Criar tabela com colunas mais largas para orientação paisagem
+    table = Table(data, colWidths=[5.5*inch, 2.5*inch])
+
+    # Estilo da tabela
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.white]),
+    ])
+
+    # Destacar linhas importantes
+    for i, row in enumerate(data):
+        if 'TOTAL' in row[0] or 'FINAL' in row[0]:
+            table_style.add('BACKGROUND', (0, i), (-1, i), colors.orange)
+            table_style.add('TEXTCOLOR', (0, i), (-1, i), colors.white)
+            table_style.add('FONTNAME', (0, i), (-1, i), 'Helvetica-Bold')
+
+    table.setStyle(table_style)
+    return table
+
+
+def _tabela_por_mes(por_mes):
+    """Monta a tabela com o faturamento e a comissão de cada mês do intervalo"""
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table, TableStyle
+
+    data = [['Mês', 'Faturamento Total', 'Comissão Total (Base)', 'Comissão Final']]
+    for dados_mes in por_mes:
+        data.append([
+            f"{dados_mes['mes']:02d}/{dados_mes['ano']}",
+            f"R$ {dados_mes['faturamentoFinal']:,.2f}",
+            f"R$ {dados_mes['totalCommission']:,.2f}",
+            f"R$ {dados_mes['comissaoFinal']:,.2f}",
+        ])
+
+    table = Table(data, colWidths=[1.5*inch, 2.2*inch, 2.2*inch, 2.1*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.beige]),
+    ]))
+    return table
+
+
+def gerar_pdf_comissoes(commission_data, titulo_periodo):
+    """
+    Gera o PDF do relatório de comissões (paisagem, uma tabela por vendedor e um
+    resumo geral) e retorna o conteúdo em bytes
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+    cronometro = Cronometro('gerar_pdf_comissoes')
+    estilos = _obter_estilos()
+
+    # Criar buffer de memória para o PDF
+    pdf_buffer = BytesIO()
+
+    # Criar documento PDF em orientação paisagem
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=landscape(A4))
+    story = []
+
+    # Título do relatório
+    story.append(Paragraph("Relatório de Comissões", estilos['titulo']))
+    story.append(Paragraph(titulo_periodo, estilos['subtitulo']))
+    story.append(Spacer(1, 20))
+
+    # Para cada vendedor, criar uma tabela
+    for seller_code, seller in commission_data.items():
+        story.append(Paragraph(f"{seller['name']} - RCA: {seller_code}", estilos['vendedor']))
+        story.append(_tabela_vendedor(seller))
+        # Relatórios de intervalo trazem também o detalhamento mensal
+        if seller.get('porMes'):
+            story.append(Spacer(1, 8))
+            story.append(_tabela_por_mes(seller['porMes']))
+        story.append(Spacer(1, 20))
+
+    # Resumo geral
+    story.append(Paragraph("Resumo Geral", estilos['resumo']))
+    story.append(Spacer(1, 10))
+
+    total_vendedores = len(commission_data)
+    total_faturamento = sum(seller['faturamentoFinal'] for seller in commission_data.values())
+    total_comissao_base = sum(seller['totalCommission'] for seller in commission_data.values())
+    total_comissao_final = sum(seller['comissaoFinal'] for seller in commission_data.values())
+
+    summary_data = [
+        ['Total de Vendedores', 'Faturamento Total', 'Comissões Base', 'Comissões Finais'],
+        [str(total_vendedores), f"R$ {total_faturamento:,.2f}", f"R$ {total_comissao_base:,.2f}", f"R$ {total_comissao_final:,.2f}"]
+    ]
+
+    summary_table = Table(summary_data, colWidths=[2*inch, 2*inch, 2*inch, 2*inch])
+    summary_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ])
+    summary_table.setStyle(summary_style)
+    story.append(summary_table)
+
+    # Rodapé
+    story.append(Spacer(1, 30))
+    story.append(Paragraph(f"Relatório gerado em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", estilos['rodape']))
+    story.append(Paragraph("Sistema de Comissões - Versão 1.0", estilos['rodape']))
+
+    cronometro.marcar('montagem', vendedores=total_vendedores)
+
+    # Gerar PDF
+    doc.build(story)
+    cronometro.marcar('layout', vendedores=total_vendedores)
+    return pdf_buffer.getvalue()
+
+
+def gerar_pdf_vendedor(seller_code, seller, titulo_periodo):
+    """Gera o extrato em PDF de um único vendedor e retorna o conteúdo em bytes"""
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    estilos = _obter_estilos()
+
+    pdf_buffer = BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=landscape(A4))
+    story = [
+        Paragraph("Extrato de Comissão", estilos['titulo']),
+        Paragraph(titulo_periodo, estilos['subtitulo']),
+        Spacer(1, 20),
+        Paragraph(f"{seller['name']} - RCA: {seller_code}", estilos['vendedor']),
+        _tabela_vendedor(seller),
+        Spacer(1, 30),
+        Paragraph(f"Extrato gerado em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", estilos['rodape']),
+        Paragraph("Sistema de Comissões - Versão 1.0", estilos['rodape']),
+    ]
+    doc.build(story)
+    return pdf_buffer.getvalue()
+
+
+def _nome_arquivo_extrato(seller_code, seller, sufixo):
+    """Ex.: Extrato_123_JOAO_SILVA_01_2025.pdf (sem acentos nem caracteres especiais)"""
+    nome = unicodedata.normalize('NFKD', str(seller['name'])).encode('ascii', 'ignore').decode('ascii')
+    nome = re.sub(r'[^A-Za-z0-9]+', '_', nome).strip('_')
+    return f"Extrato_{seller_code}_{nome}_{sufixo}.pdf"
+
+
+def _dados_simples(valor):
+    """
+    Copia o relatório só com tipos do Python (dict, list, str, int, float...): escalares
+    do numpy/pandas viram valores nativos, para que as tarefas cheguem aos processos
+    sem depender de objetos do processo principal
+    """
+    if isinstance(valor, dict):
+        return {_dados_simples(chave): _dados_simples(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_dados_simples(item) for item in valor]
+    if hasattr(valor, 'item') and not isinstance(valor, (str, bytes)):
+        return valor.item()
+    return valor
+
+
+def _renderizar_extrato(tarefa):
+    """Executado nos processos do pool: recebe dados simples e devolve (nome do arquivo, bytes)"""
+    seller_code, seller, titulo_periodo, nome_arquivo = tarefa
+    return nome_arquivo, gerar_pdf_vendedor(seller_code, seller, titulo_periodo)
+
+
+def _obter_executor_extratos(workers):
+    """
+    Retorna o pool de processos, recriando-o se o número de workers mudou.
+    Os processos são iniciados com spawn: um fork copiaria o estado do processo do
+    Flask (threads, locks, conexões do banco e do pool Oracle) para cada worker.
+    """
+    global _executor_extratos, _executor_workers
+    with _executor_lock:
+        if _executor_extratos is None or _executor_workers != workers:
+            if _executor_extratos is not None:
+                _executor_extratos.shutdown(wait=False)
+            _executor_extratos = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor_workers = workers
+        return _executor_extratos
+
+
+def renderizar_extratos(commission_data, titulo_periodo, sufixo_arquivo, workers=1):
+    """
+    Gera um PDF por vendedor, na ordem do relatório, produzindo (nome do arquivo, bytes).
+    Com workers > 1 a montagem (CPU, limitada pelo GIL) é distribuída entre processos.
+    """
+    tarefas = [
+        (_dados_simples(seller_code), _dados_simples(seller), titulo_periodo,
+         _nome_arquivo_extrato(seller_code, seller, sufixo_arquivo))
+        for seller_code, seller in commission_data.items()
+    ]
+
+    if workers <= 1 or len(tarefas) <= 1:
+        for tarefa in tarefas:
+            yield _renderizar_extrato(tarefa)
+        return
+
+    executor = _obter_executor_extratos(workers)
+    # Lotes de tarefas por envio reduzem o custo de comunicação entre processos
+    chunksize = max(1, len(tarefas) // (workers * 4))
+    yield from executor.map(_renderizar_extrato, tarefas, chunksize=chunksize)
+
+
+class _SaidaZip:
+    """Destino não posicionável para o ZipFile: acumula bytes até serem retirados"""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def gerar_zip_extratos(commission_data, titulo_periodo, sufixo_arquivo, workers=1):
+    """
+    Produz o ZIP com os extratos em blocos de bytes, à medida que cada PDF fica
+    pronto, para ser enviado como resposta em streaming
+    """
+    saida = _SaidaZip()
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for nome_arquivo, conteudo in renderizar_extratos(commission_data, titulo_periodo, sufixo_arquivo, workers):
+            arquivo_zip.writestr(nome_arquivo, conteudo)
+            yield saida.retirar()
+    # Diretório central do ZIP, escrito ao fechar
+    yield saida.retirar()
+
+
+def obter_workers_extratos():
+    """Número de processos para os extratos (PDF_EXPORT_WORKERS; 0 = núcleos disponíveis)"""
+    workers = current_app.config['PDF_EXPORT_WORKERS']
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def _impressao_relatorio(dados):
+    """Hash do relatório serializado: o PDF só é reaproveitado se os números forem os mesmos"""
+    serializado = json.dumps(dados, sort_keys=True, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+def _chave_pdf(tipo, periodo, banco, versao, impressao):
+    """Endereço do arquivo: hash do tipo de relatório, período, banco, versão e conteúdo dos dados e do layout"""
+    conteudo = f"{tipo}|{periodo}|{banco}|{versao}|{impressao}|{VERSAO_LAYOUT_PDF}"
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:32]
+
+
+def _listar_cache_pdf(diretorio):
+    """Arquivos do cache como (caminho, tamanho, último acesso)"""
+    arquivos = []
+    with os.scandir(diretorio) as entradas:
+        for entrada in entradas:
+            if entrada.is_file() and entrada.name.endswith('.pdf'):
+                stat = entrada.stat()
+                arquivos.append((entrada.path, stat.st_size, stat.st_mtime))
+    return arquivos
+
+
+def _limitar_cache_pdf(diretorio, max_bytes, manter):
+    """Remove os arquivos menos usados até o cache caber em PDF_CACHE_MAX_BYTES"""
+    arquivos = sorted(_listar_cache_pdf(diretorio), key=lambda a: a[2])
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for caminho, tamanho, _ in arquivos:
+        if total <= max_bytes:
+            break
+        if caminho == manter:
+            continue
+        try:
+            os.remove(caminho)
+            total -= tamanho
+        except FileNotFoundError:
+            pass
+
+
+def obter_pdf_em_cache(tipo, periodo, dados, gerar):
+    """
+    Retorna o caminho de um PDF no cache em disco, gerando-o com gerar(dados) (que
+    retorna bytes) quando ainda não existir para o banco, a versão e o conteúdo
+    atuais do relatório. Ao gravar, remove as versões antigas do mesmo período e banco.
+    Retorna (caminho, None) com cache, ou (None, bytes) se o cache estiver
+    indisponível; (None, None) quando não há dados.
+    """
+    if not dados:
+        return None, None
+
+    config = current_app.config
+    versao = obter_versao_dados()
+    if not config['PDF_CACHE_ENABLED'] or versao is None:
+        return None, gerar(dados)
+
+    diretorio = config['PDF_CACHE_DIR']
+    banco = identificador_banco()
+    # Bancos diferentes no mesmo diretório não removem os arquivos um do outro
+    prefixo = f"{tipo}_{periodo}_{hashlib.sha1(banco.encode('utf-8')).hexdigest()[:8]}_"
+    chave = _chave_pdf(tipo, periodo, banco, versao, _impressao_relatorio(dados))
+    caminho = os.path.join(diretorio, f"{prefixo}{chave}.pdf")
+
+    if os.path.exists(caminho):
+        try:
+            # Atualiza o horário de acesso usado no descarte LRU
+            os.utime(caminho)
+            return caminho, None
+        except FileNotFoundError:
+            pass  # Removido por outro processo entre as duas chamadas
+
+    conteudo = gerar(dados)
+
+    with _cache_pdf_lock:
+        os.makedirs(diretorio, exist_ok=True)
+        # Grava em arquivo temporário e renomeia: leitores nunca veem um PDF parcial
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
+
+        # Versões anteriores do mesmo período ficaram obsoletas
+        for antigo, _, _ in _listar_cache_pdf(diretorio):
+            if os.path.basename(antigo).startswith(prefixo) and antigo != caminho:
+                try:
+                    os.remove(antigo)
+                except FileNotFoundError:
+                    pass
+
+        _limitar_cache_pdf(diretorio, config['PDF_CACHE_MAX_BYTES'], caminho)
+
+    return caminho, None
+
+
+def obter_pdf_relatorio(mes, ano):
+    """PDF do relatório mensal de comissões, servido do cache em disco quando possível"""
+    # Importado aqui: os processos de renderização dos extratos importam este módulo
+    # e não precisam carregar o serviço (cliente Oracle, pandas)
+    from .services import obter_relatorio_comissoes
+
+    total = Cronometro('gerar_pdf_relatorio')
+    cronometro = Cronometro('gerar_pdf_relatorio')
+    # O relatório entra na chave do arquivo; normalmente vem do cache em memória
+    commission_data, _ = obter_relatorio_comissoes(mes, ano)
+    cronometro.marcar('relatorio')
+
+    def gerar(dados):
+        cronometro.reiniciar()
+        conteudo = gerar_pdf_comissoes(dados, f"{mes}/{ano}")
+        cronometro.marcar('pdf', bytes=len(conteudo))
+        return conteudo
+
+    caminho, conteudo = obter_pdf_em_cache('comissoes', f"{ano}_{mes:02d}", commission_data, gerar)
+    # Total, incluindo a consulta ao cache em disco e a gravação do arquivo
+    total.marcar('total')
+    return caminho, conteudo
+
+
+def obter_pdf_relatorio_periodo(mes_ini, ano_ini, mes_fim, ano_fim, titulo_periodo):
+    """PDF do relatório de um intervalo de meses, com o mesmo cache em disco do mensal"""
+    from .services import obter_relatorio_periodo
+
+    commission_data, _ = obter_relatorio_periodo(mes_ini, ano_ini, mes_fim, ano_fim)
+
+    def gerar(dados):
+        return gerar_pdf_comissoes(dados, titulo_periodo)
+
+    # O título faz parte do PDF: o mesmo intervalo pedido como trimestre ou como
+    # acumulado do ano gera arquivos diferentes
+    titulo = hashlib.sha1(titulo_periodo.encode('utf-8')).hexdigest()[:8]
+    return obter_pdf_em_cache(
+        'comissoes_periodo', f"{ano_ini}_{mes_ini:02d}_{ano_fim}_{mes_fim:02d}_{titulo}", commission_data, gerar
+    )
+
+
+def obter_estatisticas_cache_pdf():
+    """Quantidade de arquivos e bytes ocupados pelo cache de PDFs"""
+    config = current_app.config
+    diretorio = config['PDF_CACHE_DIR']
+    arquivos = _listar_cache_pdf(diretorio) if os.path.isdir(diretorio) else []
+    return {
+        'arquivos': len(arquivos),
+        'bytes': sum(tamanho for _, tamanho, _ in arquivos),
+        'max_bytes': config['PDF_CACHE_MAX_BYTES'],
+    }
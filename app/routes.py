@@ -1,13 +1,13 @@
-from flask import render_template, request, jsonify, redirect, url_for, send_file
+from flask import render_template, request, jsonify, redirect, url_for, send_file, Response
 from . import app
-from .services import process_commissions, import_month_data, get_available_months, sincronizar_produtos_oracle, buscar_produtos_cache, obter_estatisticas_cache
+from .services import obter_relatorio_comissoes, obter_relatorio_periodo, meses_do_trimestre, meses_acumulado_ano, get_available_months, buscar_produtos_cache, obter_estatisticas_cache, QUERY_CATALOGO_PRODUTOS
+from .oracle import acquire_oracle_connection, obter_estatisticas_pool
+from .cache import obter_cache_relatorios, obter_versao_dados
+from .jobs import enfileirar_importacao, enfileirar_importacao_intervalo, enfileirar_sincronizacao_produtos, obter_tarefa, listar_tarefas, TarefaDuplicadaError
+from .pdf import obter_pdf_relatorio, obter_pdf_relatorio_periodo, obter_estatisticas_cache_pdf, gerar_zip_extratos, obter_workers_extratos
+from .metrics import gerar_metricas_prometheus
 from .models import Vendedor, RegraComissao, ComissaoPadrao, ProdutoEspecial, db, AjusteFinanceiro, AjusteFaturamento
 from datetime import datetime
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
 from io import BytesIO
 
 @app.route('/')
@@ -36,7 +36,7 @@ def report():
         # Redireciona para a página inicial se não especificou mês/ano
         return redirect(url_for('index'))
     
-    commission_data, message = process_commissions(mes, ano)
+    commission_data, message = obter_relatorio_comissoes(mes, ano)
     
     return render_template('relatorio.html', 
                          sellers=commission_data, 
@@ -44,18 +44,134 @@ def report():
                          ano=ano, 
                          message=message)
 
+def _ler_intervalo_relatorio():
+    """
+    Lê o intervalo do relatório dos parâmetros: trimestre + ano, ate_mes + ano
+    (acumulado do ano) ou mes_ini/ano_ini/mes_fim/ano_fim.
+    Retorna (mes_ini, ano_ini, mes_fim, ano_fim, título) ou lança ValueError.
+    """
+    ano = request.args.get('ano', type=int)
+    trimestre = request.args.get('trimestre', type=int)
+    ate_mes = request.args.get('ate_mes', type=int)
+    
+    if trimestre and ano:
+        mes_ini, ano_ini, mes_fim, ano_fim = meses_do_trimestre(trimestre, ano)
+        titulo = f"{trimestre}º Trimestre/{ano}"
+    elif ate_mes and ano:
+        mes_ini, ano_ini, mes_fim, ano_fim = meses_acumulado_ano(ate_mes, ano)
+        titulo = f"Acumulado {ano} (até {ate_mes:02d}/{ano})"
+    else:
+        mes_ini = request.args.get('mes_ini', type=int)
+        ano_ini = request.args.get('ano_ini', type=int)
+        mes_fim = request.args.get('mes_fim', type=int)
+        ano_fim = request.args.get('ano_fim', type=int)
+        if not all([mes_ini, ano_ini, mes_fim, ano_fim]):
+            raise ValueError('Informe trimestre e ano, ate_mes e ano, ou mes_ini, ano_ini, mes_fim e ano_fim')
+        titulo = f"{mes_ini:02d}/{ano_ini} a {mes_fim:02d}/{ano_fim}"
+    
+    if not (1 <= mes_ini <= 12 and 1 <= mes_fim <= 12) or (ano_ini, mes_ini) > (ano_fim, mes_fim):
+        raise ValueError('Intervalo inválido: o mês inicial deve ser anterior ou igual ao final')
+    return mes_ini, ano_ini, mes_fim, ano_fim, titulo
+
+@app.route('/relatorio/periodo')
+def report_periodo():
+    """Página do relatório de um intervalo de meses (trimestre ou acumulado do ano)"""
+    now = datetime.now()
+    contexto = {
+        'sellers': None,
+        'titulo': None,
+        'parametros': {},
+        'current_month': now.month,
+        'current_year': now.year,
+    }
+    
+    if not request.args:
+        # Sem período escolhido: mostra apenas os filtros
+        return render_template('relatorio_periodo.html',
+                             message='Selecione um trimestre ou o acumulado do ano',
+                             **contexto)
+    
+    try:
+        mes_ini, ano_ini, mes_fim, ano_fim, titulo = _ler_intervalo_relatorio()
+    except ValueError as e:
+        return render_template('relatorio_periodo.html', message=str(e), **contexto), 400
+    
+    commission_data, message = obter_relatorio_periodo(mes_ini, ano_ini, mes_fim, ano_fim)
+    contexto.update(
+        sellers=commission_data,
+        titulo=titulo,
+        # Mesmos parâmetros para o link do PDF
+        parametros={chave: valor for chave, valor in request.args.items() if valor},
+    )
+    
+    return render_template('relatorio_periodo.html', message=message, **contexto)
+
+@app.route('/api/relatorio-periodo')
+def api_relatorio_periodo():
+    """API com o relatório de comissões de um intervalo de meses (trimestre, acumulado do ano...)"""
+    try:
+        mes_ini, ano_ini, mes_fim, ano_fim, titulo = _ler_intervalo_relatorio()
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    commission_data, message = obter_relatorio_periodo(mes_ini, ano_ini, mes_fim, ano_fim)
+    
+    return jsonify({
+        'success': bool(commission_data),
+        'message': message,
+        'periodo': titulo,
+        'vendedores': commission_data
+    })
+
 @app.route('/importar', methods=['POST'])
 def import_data():
     """Importa dados de um mês específico do Oracle"""
     mes = request.form.get('mes', type=int)
     ano = request.form.get('ano', type=int)
+    modo = request.form.get('modo')  # 'agregado' (padrão) ou 'detalhado' para auditoria
+    incremental = request.form.get('incremental') == '1'
     
     if not mes or not ano:
         return jsonify({'success': False, 'message': 'Mês e ano são obrigatórios'})
     
-    success, message = import_month_data(mes, ano)
+    # A importação roda em segundo plano; o cliente acompanha por /api/tarefas/<id>
+    try:
+        tarefa = enfileirar_importacao(mes, ano, modo, incremental)
+    except TarefaDuplicadaError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Já existe uma importação em andamento que inclui {mes}/{ano}',
+            'tarefa': e.tarefa
+        }), 409
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Erro ao iniciar importação: {str(e)}'}), 500
     
-    return jsonify({'success': success, 'message': message})
+    return jsonify({'success': True, 'message': f'Importação de {mes}/{ano} iniciada', 'tarefa': tarefa}), 202
+
+@app.route('/importar-intervalo', methods=['POST'])
+def import_range_data():
+    """Importa um intervalo de meses do Oracle (consultas em paralelo, em segundo plano)"""
+    mes_ini = request.form.get('mes_ini', type=int)
+    ano_ini = request.form.get('ano_ini', type=int)
+    mes_fim = request.form.get('mes_fim', type=int)
+    ano_fim = request.form.get('ano_fim', type=int)
+    modo = request.form.get('modo')
+    
+    if not all([mes_ini, ano_ini, mes_fim, ano_fim]):
+        return jsonify({'success': False, 'message': 'Mês e ano inicial e final são obrigatórios'}), 400
+    
+    if not (1 <= mes_ini <= 12 and 1 <= mes_fim <= 12) or (ano_ini, mes_ini) > (ano_fim, mes_fim):
+        return jsonify({'success': False, 'message': 'Intervalo inválido: o mês inicial deve ser anterior ou igual ao final'}), 400
+    
+    try:
+        tarefa = enfileirar_importacao_intervalo(mes_ini, ano_ini, mes_fim, ano_fim, modo)
+    except TarefaDuplicadaError as e:
+        return jsonify({'success': False, 'message': 'Já existe uma importação em andamento com meses deste intervalo', 'tarefa': e.tarefa}), 409
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Erro ao iniciar importação: {str(e)}'}), 500
+    
+    periodo = f"{mes_ini:02d}/{ano_ini} a {mes_fim:02d}/{ano_fim}"
+    return jsonify({'success': True, 'message': f'Importação de {periodo} iniciada', 'tarefa': tarefa}), 202
 
 @app.route('/cadastro')
 def cadastro():
@@ -298,22 +414,9 @@ def delete_produto_especial(produto_id):
 def get_produtos_oracle():
     """API para buscar produtos únicos do Oracle"""
     try:
-        import oracledb
-        from flask import current_app
-        
-        config = current_app.config
-        with oracledb.connect(user=config['ORACLE_USER'], password=config['ORACLE_PASSWORD'], dsn=config['ORACLE_DSN']) as connection:
-            # Query para buscar produtos únicos
-            query = """
-            SELECT DISTINCT CODIGO_PRODUTO, DESCRICAO_PRODUTO 
-            FROM DADOS_FATURAMENTO 
-            WHERE CODIGO_PRODUTO IS NOT NULL 
-            AND DESCRICAO_PRODUTO IS NOT NULL
-            ORDER BY CODIGO_PRODUTO
-            """
-            
+        with acquire_oracle_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute(query)
+            cursor.execute(QUERY_CATALOGO_PRODUTOS.format(filtro_data=''))
             produtos = []
             
             for row in cursor.fetchall():
@@ -347,14 +450,15 @@ def get_produtos_oracle_cached():
 
 @app.route('/api/sincronizar-produtos-oracle', methods=['POST'])
 def sincronizar_produtos():
-    """API para sincronizar produtos do Oracle com o cache local"""
+    """API para sincronizar produtos do Oracle com o cache local (em segundo plano)"""
+    # completa=1 relê todo o histórico e remove os produtos que não existem mais no Oracle
+    completa = request.form.get('completa') == '1'
     try:
-        success, message = sincronizar_produtos_oracle()
+        tarefa = enfileirar_sincronizacao_produtos(completa)
+        return jsonify({'success': True, 'message': 'Sincronização iniciada', 'tarefa': tarefa}), 202
         
-        if success:
-            return jsonify({'success': True, 'message': message})
-        else:
-            return jsonify({'success': False, 'message': message}), 500
+    except TarefaDuplicadaError as e:
+        return jsonify({'success': False, 'message': 'Já existe uma sincronização em andamento', 'tarefa': e.tarefa}), 409
             
     except Exception as e:
         return jsonify({'success': False, 'message': f'Erro na sincronização: {str(e)}'}), 500
@@ -372,6 +476,40 @@ def get_estatisticas_cache():
     except Exception as e:
         return jsonify({'success': False, 'message': f'Erro ao obter estatísticas: {str(e)}'}), 500
 
+@app.route('/api/oracle/pool')
+def get_estatisticas_pool_oracle():
+    """API para obter estatísticas do pool de conexões Oracle"""
+    return jsonify({
+        'success': True,
+        'pool': obter_estatisticas_pool()
+    })
+
+@app.route('/api/cache-relatorios')
+def get_estatisticas_cache_relatorios():
+    """API para obter estatísticas do cache de relatórios"""
+    try:
+        stats = obter_cache_relatorios().estatisticas()
+        stats['versao_dados'] = obter_versao_dados()
+        stats['pdf'] = obter_estatisticas_cache_pdf()
+        return jsonify({'success': True, 'estatisticas': stats})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Erro ao obter estatísticas: {str(e)}'}), 500
+
+@app.route('/api/tarefas')
+def get_tarefas():
+    """API para listar as tarefas em segundo plano mais recentes"""
+    limite = request.args.get('limite', 20, type=int)
+    return jsonify({'success': True, 'tarefas': listar_tarefas(limite)})
+
+@app.route('/api/tarefas/<int:tarefa_id>')
+def get_tarefa(tarefa_id):
+    """API para consultar o status e o progresso de uma tarefa em segundo plano"""
+    tarefa = obter_tarefa(tarefa_id)
+    if tarefa is None:
+        return jsonify({'success': False, 'message': 'Tarefa não encontrada'}), 404
+    return jsonify({'success': True, 'tarefa': tarefa})
+
 @app.route('/api/meses-disponiveis')
 def api_available_months():
     """API para buscar meses disponíveis"""
@@ -464,6 +602,13 @@ def create_or_update_ajuste_financeiro():
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Erro ao salvar ajuste: {str(e)}'}), 500
 
+@app.route('/metrics')
+def metrics():
+    """Métricas de desempenho do processo no formato texto do Prometheus"""
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'success': False, 'message': 'Métricas desativadas (METRICS_ENABLED)'}), 404
+    return Response(gerar_metricas_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/relatorio/pdf')
 def gerar_pdf_relatorio():
     """Gera e retorna um PDF do relatório de comissões"""
@@ -474,194 +619,44 @@ def gerar_pdf_relatorio():
         if not mes or not ano:
             return jsonify({'success': False, 'message': 'Mês e ano são obrigatórios'}), 400
         
-        # Obter dados do relatório
-        commission_data, message = process_commissions(mes, ano)
+        # PDF do cache em disco (gerado apenas se os dados mudaram desde o último download)
+        caminho, conteudo = obter_pdf_relatorio(mes, ano)
         
-        if not commission_data:
+        if caminho is None and conteudo is None:
             return jsonify({'success': False, 'message': 'Nenhum dado encontrado para o período especificado'}), 404
         
-        # Criar buffer de memória para o PDF
-        pdf_buffer = BytesIO()
-        
-        # Criar documento PDF em orientação paisagem
-        doc = SimpleDocTemplate(pdf_buffer, pagesize=landscape(A4))
-        story = []
-        
-        # Estilos
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1,  # Center
-            textColor=colors.darkblue
-        )
+        # Nome do arquivo
+        nome_arquivo = f"Relatorio_Comissoes_{mes:02d}_{ano}.pdf"
         
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=20,
-            alignment=1,  # Center
-            textColor=colors.grey
+        # Retornar PDF para download
+        return send_file(
+            caminho if caminho is not None else BytesIO(conteudo),
+            as_attachment=True,
+            download_name=nome_arquivo,
+            mimetype='application/pdf'
         )
         
-        # Título do relatório
-        story.append(Paragraph(f"Relatório de Comissões", title_style))
-        story.append(Paragraph(f"{mes}/{ano}", subtitle_style))
-        story.append(Spacer(1, 20))
-        
-        # Para cada vendedor, criar uma tabela
-        for seller_code, seller in commission_data.items():
-            # Cabeçalho do vendedor
-            seller_header_style = ParagraphStyle(
-                'SellerHeader',
-                parent=styles['Heading3'],
-                fontSize=12,
-                spaceAfter=10,
-                textColor=colors.white,
-                backColor=colors.darkblue
-            )
-            story.append(Paragraph(f"{seller['name']} - RCA: {seller_code}", seller_header_style))
-            
-            # Dados do vendedor
-            data = [
-                ['Descrição', 'Valor'],
-                ['Faturamento Oracle', f"R$ {seller['faturamentoOracle']:,.2f}"],
-            ]
-            
-            # Adicionar ajuste manual se existir
-            if seller['ajusteFaturamento']['valorAjuste'] != 0:
-                ajuste_valor = seller['ajusteFaturamento']['valorAjuste']
-                ajuste_taxa = seller['ajusteFaturamento']['taxaComissaoAjuste']
-                sinal = '+' if ajuste_valor > 0 else ''
-                data.append([f'Ajuste Manual ({ajuste_taxa:.1%})', f"{sinal}R$ {ajuste_valor:,.2f}"])
-            
-            data.extend([
-                ['FATURAMENTO TOTAL', f"R$ {seller['faturamentoFinal']:,.2f}"],
-            ])
-            
-            # Adicionar produtos com comissão especial detalhados
-            if seller['details']['produtos_detalhados']:
-                data.append(['', ''])  # Linha em branco
-                data.append(['PRODUTOS COM COMISSÃO ESPECIAL', ''])
-                
-                for produto in seller['details']['produtos_detalhados']:
-                    taxa_percentual = produto['taxa_comissao'] * 100
-                    data.append([
-                        f"  {produto['nome_produto']} ({taxa_percentual:.1f}%)",
-                        f"R$ {produto['faturamento_total']:,.2f} | R$ {produto['comissao_total']:,.2f}"
-                    ])
-                
-                data.append(['', ''])  # Linha em branco
-            
-            # Adicionar outros produtos
-            if seller['details']['outros_produtos']['revenue'] > 0:
-                data.append(['OUTROS PRODUTOS', f"R$ {seller['details']['outros_produtos']['revenue']:,.2f} | R$ {seller['details']['outros_produtos']['commission']:,.2f}"])
-                data.append(['', ''])  # Linha em branco
-            
-            data.extend([
-                ['Comissão s/ Faturamento Oracle', f"R$ {seller['comissaoBaseOracle']:,.2f}"],
-            ])
-            
-            # Adicionar comissão do ajuste se existir
-            if seller['comissaoDoAjuste'] != 0:
-                data.append(['Comissão s/ Ajuste Manual', f"R$ {seller['comissaoDoAjuste']:,.2f}"])
-            
-            data.extend([
-                ['COMISSÃO TOTAL (BASE)', f"R$ {seller['totalCommission']:,.2f}"],
-                ['(+) Valor Acrésc. Título Pago Mês Ant.', f"+ R$ {seller['ajustesFinanceiros']['valorAcrescTituloPagoMesAnt']:,.2f}"],
-                ['(-) Valor Ret. Merc. (Devolução)', f"- R$ {seller['ajustesFinanceiros']['valorRetMerc']:,.2f}"],
-                ['(-) Valor Título Aberto', f"- R$ {seller['ajustesFinanceiros']['valorTituloAberto']:,.2f}"],
-                ['COMISSÃO FINAL A PAGAR', f"R$ {seller['comissaoFinal']:,.2f}"],
-            ])
-            
-            # Criar tabela com colunas mais largas para orientação paisagem
-            table = Table(data, colWidths=[5.5*inch, 2.5*inch])
-            
-            # Estilo da tabela
-            table_style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.white]),
-            ])
-            
-            # Destacar linhas importantes
-            for i, row in enumerate(data):
-                if 'TOTAL' in row[0] or 'FINAL' in row[0]:
-                    table_style.add('BACKGROUND', (0, i), (-1, i), colors.orange)
-                    table_style.add('TEXTCOLOR', (0, i), (-1, i), colors.white)
-                    table_style.add('FONTNAME', (0, i), (-1, i), 'Helvetica-Bold')
-            
-            table.setStyle(table_style)
-            story.append(table)
-            story.append(Spacer(1, 20))
-        
-        # Resumo geral
-        story.append(Paragraph("Resumo Geral", styles['Heading2']))
-        story.append(Spacer(1, 10))
-        
-        total_vendedores = len(commission_data)
-        total_faturamento = sum(seller['faturamentoFinal'] for seller in commission_data.values())
-        total_comissao_base = sum(seller['totalCommission'] for seller in commission_data.values())
-        total_comissao_final = sum(seller['comissaoFinal'] for seller in commission_data.values())
-        
-        summary_data = [
-            ['Total de Vendedores', 'Faturamento Total', 'Comissões Base', 'Comissões Finais'],
-            [str(total_vendedores), f"R$ {total_faturamento:,.2f}", f"R$ {total_comissao_base:,.2f}", f"R$ {total_comissao_final:,.2f}"]
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[2*inch, 2*inch, 2*inch, 2*inch])
-        summary_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ])
-        summary_table.setStyle(summary_style)
-        story.append(summary_table)
-        
-        # Rodapé
-        story.append(Spacer(1, 30))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            alignment=1,  # Center
-            textColor=colors.grey
-        )
-        story.append(Paragraph(f"Relatório gerado em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", footer_style))
-        story.append(Paragraph("Sistema de Comissões - Versão 1.0", footer_style))
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Erro ao gerar PDF: {str(e)}'}), 500
+
+@app.route('/relatorio/periodo/pdf')
+def gerar_pdf_relatorio_periodo():
+    """Gera e retorna o PDF do relatório de comissões de um intervalo de meses"""
+    try:
+        try:
+            mes_ini, ano_ini, mes_fim, ano_fim, titulo = _ler_intervalo_relatorio()
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
-        # Gerar PDF
-        doc.build(story)
-        pdf_buffer.seek(0)
+        caminho, conteudo = obter_pdf_relatorio_periodo(mes_ini, ano_ini, mes_fim, ano_fim, titulo)
         
-        # Nome do arquivo
-        nome_arquivo = f"Relatorio_Comissoes_{mes:02d}_{ano}.pdf"
+        if caminho is None and conteudo is None:
+            return jsonify({'success': False, 'message': 'Nenhum dado encontrado para o período especificado'}), 404
+        
+        nome_arquivo = f"Relatorio_Comissoes_{mes_ini:02d}_{ano_ini}_a_{mes_fim:02d}_{ano_fim}.pdf"
         
-        # Retornar PDF para download
         return send_file(
-            pdf_buffer,
+            caminho if caminho is not None else BytesIO(conteudo),
             as_attachment=True,
             download_name=nome_arquivo,
             mimetype='application/pdf'
@@ -670,6 +665,36 @@ def gerar_pdf_relatorio():
     except Exception as e:
         return jsonify({'success': False, 'message': f'Erro ao gerar PDF: {str(e)}'}), 500
 
+@app.route('/relatorio/pdf/vendedores')
+def gerar_extratos_vendedores():
+    """Gera um PDF por vendedor e retorna todos em um ZIP (enviado em streaming)"""
+    try:
+        mes = request.args.get('mes', type=int)
+        ano = request.args.get('ano', type=int)
+        
+        if not mes or not ano:
+            return jsonify({'success': False, 'message': 'Mês e ano são obrigatórios'}), 400
+        
+        commission_data, message = obter_relatorio_comissoes(mes, ano)
+        
+        if not commission_data:
+            return jsonify({'success': False, 'message': 'Nenhum dado encontrado para o período especificado'}), 404
+        
+        # Os dados e a configuração são lidos aqui; o gerador roda fora do contexto da requisição
+        zip_stream = gerar_zip_extratos(
+            commission_data, f"{mes}/{ano}", f"{mes:02d}_{ano}", obter_workers_extratos()
+        )
+        
+        nome_arquivo = f"Extratos_Comissoes_{mes:02d}_{ano}.zip"
+        return Response(
+            zip_stream,
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename={nome_arquivo}'}
+        )
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Erro ao gerar extratos: {str(e)}'}), 500
+
 @app.route('/api/ajuste-faturamento/<int:rca>/<int:ano>/<int:mes>', methods=['GET'])
 def get_ajuste_faturamento(rca, ano, mes):
     """API para buscar ajustes de faturamento de um vendedor em um período específico"""
@@ -0,0 +1,264 @@
+import bisect
+import itertools
+import threading
+import time
+import unicodedata
+from flask import current_app
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError
+from . import db
+from .models import ProdutoOracleCache
+
+# Índice FTS5 (tokenizer trigram) espelhando ProdutoOracleCache: rowid = id do produto,
+# colunas com o texto normalizado (sem acentos, minúsculo) usado apenas para a busca
+TABELA_FTS_PRODUTOS = 'produto_oracle_fts'
+DDL_FTS_PRODUTOS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS_PRODUTOS} "
+    "USING fts5(codigo, nome, tokenize='trigram')"
+)
+
+# O tokenizer trigram só casa termos com pelo menos 3 caracteres
+TAMANHO_MINIMO_TERMO_FTS = 3
+
+# False quando o SQLite do processo não suporta FTS5/trigram (detectado na criação)
+_fts_disponivel = None
+
+
+def normalizar_texto_busca(texto):
+    """Remove acentos e converte para minúsculas (ex.: 'Pão de Açúcar' -> 'pao de acucar')"""
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def _indice_fts_existe(connection):
+    """Verifica se o índice FTS já foi criado (a primeira sincronização o cria)"""
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+        {'nome': TABELA_FTS_PRODUTOS}
+    ).first() is not None
+
+
+def reconstruir_indice_fts_produtos(batch_size=None):
+    """
+    Recria o conteúdo do índice FTS a partir de ProdutoOracleCache, na transação
+    corrente da sessão (chamado pela sincronização antes do commit).
+    Retorna False se o SQLite não tiver suporte a FTS5/trigram.
+    """
+    global _fts_disponivel
+    if not current_app.config['PRODUCT_SEARCH_FTS'] or _fts_disponivel is False:
+        return False
+    if batch_size is None:
+        batch_size = current_app.config['CACHE_INSERT_BATCH_SIZE']
+
+    connection = db.session.connection()
+    try:
+        with connection.begin_nested():
+            connection.execute(text(DDL_FTS_PRODUTOS))
+    except OperationalError as e:
+        print(f"⚠️ FTS5 com tokenizer trigram indisponível, busca usará LIKE: {e}")
+        _fts_disponivel = False
+        return False
+
+    connection.execute(text(f"DELETE FROM {TABELA_FTS_PRODUTOS}"))
+
+    stmt = text(f"INSERT INTO {TABELA_FTS_PRODUTOS} (rowid, codigo, nome) VALUES (:id, :codigo, :nome)")
+    produtos = db.session.query(
+        ProdutoOracleCache.id, ProdutoOracleCache.codigo_produto, ProdutoOracleCache.nome_produto
+    ).all()
+    for inicio in range(0, len(produtos), batch_size):
+        connection.execute(stmt, [
+            {'id': id_, 'codigo': normalizar_texto_busca(codigo), 'nome': normalizar_texto_busca(nome)}
+            for id_, codigo, nome in produtos[inicio:inicio + batch_size]
+        ])
+
+    return True
+
+
+def atualizar_indice_fts_produtos(ids_gravados, ids_removidos, batch_size=None):
+    """
+    Aplica ao índice FTS só as diferenças de uma sincronização (produtos incluídos ou
+    alterados e produtos removidos), na transação corrente da sessão. Se o índice
+    ainda não existir, faz a reconstrução completa.
+    Retorna False se o SQLite não tiver suporte a FTS5/trigram.
+    """
+    if not current_app.config['PRODUCT_SEARCH_FTS'] or _fts_disponivel is False:
+        return False
+    if batch_size is None:
+        batch_size = current_app.config['CACHE_INSERT_BATCH_SIZE']
+
+    connection = db.session.connection()
+    if not _indice_fts_existe(connection):
+        return reconstruir_indice_fts_produtos(batch_size)
+
+    stmt_delete = text(f"DELETE FROM {TABELA_FTS_PRODUTOS} WHERE rowid IN :ids").bindparams(
+        bindparam('ids', expanding=True)
+    )
+    stmt_insert = text(f"INSERT INTO {TABELA_FTS_PRODUTOS} (rowid, codigo, nome) VALUES (:id, :codigo, :nome)")
+
+    ids_gravados = list(ids_gravados)
+    ids = ids_gravados + list(ids_removidos)
+    for inicio in range(0, len(ids), batch_size):
+        connection.execute(stmt_delete, {'ids': ids[inicio:inicio + batch_size]})
+
+    for inicio in range(0, len(ids_gravados), batch_size):
+        produtos = db.session.query(
+            ProdutoOracleCache.id, ProdutoOracleCache.codigo_produto, ProdutoOracleCache.nome_produto
+        ).filter(ProdutoOracleCache.id.in_(ids_gravados[inicio:inicio + batch_size])).all()
+        if produtos:
+            connection.execute(stmt_insert, [
+                {'id': id_, 'codigo': normalizar_texto_busca(codigo), 'nome': normalizar_texto_busca(nome)}
+                for id_, codigo, nome in produtos
+            ])
+
+    return True
+
+
+def buscar_produtos_fts(filtro, limite=50):
+    """
+    Busca produtos pelo índice FTS, ordenando por relevância (bm25) e ignorando
+    acentos. Retorna None quando o índice não pode ser usado (sem suporte a FTS5,
+    índice ainda não criado ou termo curto demais), para que o chamador use o LIKE.
+    """
+    if not current_app.config['PRODUCT_SEARCH_FTS'] or _fts_disponivel is False:
+        return None
+
+    termo = normalizar_texto_busca(filtro).strip()
+    if len(termo) < TAMANHO_MINIMO_TERMO_FTS:
+        return None
+
+    connection = db.session.connection()
+    if not _indice_fts_existe(connection):
+        return None
+
+    # O termo vai entre aspas (frase) para não ser interpretado como sintaxe do MATCH
+    consulta = '"' + termo.replace('"', '""') + '"'
+    rows = connection.execute(
+        text(
+            f"SELECT p.codigo_produto, p.nome_produto "
+            f"FROM {TABELA_FTS_PRODUTOS} f "
+            f"JOIN produto_oracle_cache p ON p.id = f.rowid "
+            f"WHERE {TABELA_FTS_PRODUTOS} MATCH :consulta "
+            # Coincidências no código pesam mais que no nome
+            f"ORDER BY bm25({TABELA_FTS_PRODUTOS}, 2.0, 1.0), p.nome_produto "
+            f"LIMIT :limite"
+        ),
+        {'consulta': consulta, 'limite': limite}
+    )
+    return [{'codigo': codigo, 'nome': nome} for codigo, nome in rows]
+
+
+class IndiceAutocompletar:
+    """
+    Snapshot imutável do catálogo para o autocompletar, consultado sem acessar o banco:
+    - códigos normalizados ordenados, para busca por prefixo com bisect;
+    - índice invertido de trigramas sobre "código + nome", para busca por trecho.
+    Os produtos ficam ordenados por nome, então as posições já saem na ordem de exibição.
+    """
+
+    def __init__(self, produtos):
+        self.produtos = tuple(sorted(((codigo, nome) for codigo, nome in produtos), key=lambda p: p[1]))
+        # Separador que nunca aparece em um termo de busca: trigramas não cruzam código e nome
+        self._textos = tuple(
+            f"{normalizar_texto_busca(codigo)}\x00{normalizar_texto_busca(nome)}"
+            for codigo, nome in self.produtos
+        )
+        self._codigos = sorted(
+            (texto.split('\x00', 1)[0], posicao) for posicao, texto in enumerate(self._textos)
+        )
+        self._chaves_codigo = [codigo for codigo, _ in self._codigos]
+
+        trigramas = {}
+        for posicao, texto in enumerate(self._textos):
+            for i in range(len(texto) - 2):
+                trigramas.setdefault(texto[i:i + 3], set()).add(posicao)
+        self._trigramas = {trigrama: frozenset(posicoes) for trigrama, posicoes in trigramas.items()}
+        self.criado_em = time.monotonic()
+
+    def __len__(self):
+        return len(self.produtos)
+
+    def _por_prefixo_codigo(self, termo):
+        inicio = bisect.bisect_left(self._chaves_codigo, termo)
+        for codigo, posicao in self._codigos[inicio:]:
+            if not codigo.startswith(termo):
+                break
+            yield posicao
+
+    def _por_trecho(self, termo):
+        if len(termo) < TAMANHO_MINIMO_TERMO_FTS:
+            # Termo curto demais para trigramas: varredura simples do snapshot
+            return (posicao for posicao, texto in enumerate(self._textos) if termo in texto)
+
+        listas = []
+        for i in range(len(termo) - 2):
+            posicoes = self._trigramas.get(termo[i:i + 3])
+            if not posicoes:
+                return iter(())
+            listas.append(posicoes)
+        listas.sort(key=len)
+        candidatos = set(listas[0]).intersection(*listas[1:])
+        # Os trigramas são condição necessária; confirma o trecho completo
+        return (posicao for posicao in sorted(candidatos) if termo in self._textos[posicao])
+
+    def buscar(self, filtro, limite=50):
+        """Códigos que começam com o termo primeiro; depois os demais trechos, por nome"""
+        termo = normalizar_texto_busca(filtro or '').strip()
+        if not termo:
+            return [{'codigo': codigo, 'nome': nome} for codigo, nome in self.produtos[:limite]]
+
+        resultado = []
+        vistos = set()
+        for posicao in itertools.chain(self._por_prefixo_codigo(termo), self._por_trecho(termo)):
+            if len(resultado) >= limite:
+                break
+            if posicao not in vistos:
+                vistos.add(posicao)
+                codigo, nome = self.produtos[posicao]
+                resultado.append({'codigo': codigo, 'nome': nome})
+        return resultado
+
+
+_indice_autocompletar = None
+_indice_autocompletar_lock = threading.Lock()
+
+
+def reconstruir_indice_autocompletar():
+    """Monta um novo snapshot a partir de ProdutoOracleCache e o publica de uma vez"""
+    global _indice_autocompletar
+    if not current_app.config['PRODUCT_AUTOCOMPLETE_INDEX']:
+        return None
+
+    produtos = db.session.query(ProdutoOracleCache.codigo_produto, ProdutoOracleCache.nome_produto).all()
+    indice = IndiceAutocompletar(produtos)
+    # Troca de referência: requisições em andamento continuam no snapshot anterior
+    _indice_autocompletar = indice
+    print(f"✓ Índice de autocompletar atualizado ({len(indice)} produtos)")
+    return indice
+
+
+def obter_indice_autocompletar():
+    """Retorna o snapshot atual, (re)construindo-o se não existir ou tiver expirado"""
+    indice = _indice_autocompletar
+    ttl = current_app.config['PRODUCT_INDEX_TTL']
+    if indice is not None and (not ttl or time.monotonic() - indice.criado_em < ttl):
+        return indice
+
+    with _indice_autocompletar_lock:
+        # Outra requisição pode ter reconstruído enquanto esperávamos o lock
+        indice = _indice_autocompletar
+        if indice is None or (ttl and time.monotonic() - indice.criado_em >= ttl):
+            indice = reconstruir_indice_autocompletar()
+    return indice
+
+
+def buscar_produtos_autocompletar(filtro, limite=50):
+    """
+    Busca no índice em memória. Retorna None se ele estiver desativado, para
+    que o chamador use o FTS ou o LIKE.
+    """
+    if not current_app.config['PRODUCT_AUTOCOMPLETE_INDEX']:
+        return None
+    indice = obter_indice_autocompletar()
+    if indice is None:
+        return None
+    return indice.buscar(filtro, limite)
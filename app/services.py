@@ -1,167 +1,609 @@
-import pandas as pd
-import oracledb
 from flask import current_app
-from .models import Vendedor, RegraComissao, ComissaoPadrao, DadosVendas, TipoVendedor, ProdutoEspecial, ProdutoOracleCache, AjusteFinanceiro, AjusteFaturamento
+from .models import Vendedor, RegraComissao, ComissaoPadrao, DadosVendas, DimensaoVendedor, DimensaoProduto, TipoVendedor, ProdutoEspecial, ProdutoOracleCache, AjusteFinanceiro, AjusteFaturamento, ControleImportacao, ControleSincronizacaoProdutos
 from . import db
-from datetime import datetime
+from .oracle import acquire_oracle_connection
+from .cache import obter_cache_relatorios, obter_versao_dados, identificador_banco
+from .metrics import Cronometro, medir_fase, registrar_fase
+from .tracing import rastreado
+from .search import (
+    buscar_produtos_fts, atualizar_indice_fts_produtos,
+    buscar_produtos_autocompletar, reconstruir_indice_autocompletar
+)
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, update, delete, bindparam, func, tuple_
+from sqlalchemy.exc import IntegrityError
+import contextvars
+import hashlib
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import time
 
-# Inicializa o Oracle Instant Client
-def init_oracle_client():
-    """Inicializa o Oracle Instant Client"""
-    try:
-        # Caminho para o Oracle Instant Client
-        instant_client_path = r"C:\oracle\instantclient_23_9"
-        
-        if os.path.exists(instant_client_path):
-            # Adiciona o caminho ao PATH do sistema
-            if instant_client_path not in os.environ.get('PATH', ''):
-                os.environ['PATH'] = instant_client_path + os.pathsep + os.environ.get('PATH', '')
-            
-            # Inicializa o cliente Oracle
-            oracledb.init_oracle_client(lib_dir=instant_client_path)
-            print(f"✓ Oracle Instant Client inicializado: {instant_client_path}")
-            return True
-        else:
-            print(f"⚠️ Oracle Instant Client não encontrado em: {instant_client_path}")
-            return False
-    except Exception as e:
-        print(f"⚠️ Erro ao inicializar Oracle Instant Client: {e}")
-        return False
+# pandas é importado dentro das funções que o usam: carregá-lo leva mais que o resto
+# da aplicação e muitas requisições (cadastros, busca de produtos, tarefas) não precisam dele
 
-# Inicializa o cliente na importação do módulo
-init_oracle_client()
+# Modos de importação do Oracle:
+# - 'agregado': uma linha por vendedor/produto/mês, somada no próprio Oracle
+# - 'detalhado': todas as linhas de nota fiscal (para auditoria)
+IMPORT_MODES = ('agregado', 'detalhado')
 
-def fetch_sales_data_from_oracle(mes, ano):
-    """Conecta ao Oracle, executa a query e retorna um DataFrame Pandas."""
-    config = current_app.config
-    try:
-        with oracledb.connect(user=config['ORACLE_USER'], password=config['ORACLE_PASSWORD'], dsn=config['ORACLE_DSN']) as connection:
-            # Query com filtro por mês e ano usando DATA_VENDA
-            query = f"""
-            SELECT * FROM DADOS_FATURAMENTO 
-            WHERE EXTRACT(MONTH FROM DATA_VENDA) = {mes}
-            AND EXTRACT(YEAR FROM DATA_VENDA) = {ano}
+# As queries usam um intervalo semiaberto em DATA_VENDA com variáveis de ligação:
+# o predicado é sargável (permite range scan/partition pruning) e o texto do SQL
+# é o mesmo para todos os períodos, reaproveitando o cursor no shared pool.
+# Na importação incremental o limite inferior é o início do dia da marca d'água.
+#
+# DATA_VENDA guarda só o dia, então vendas lançadas depois da importação podem cair
+# no próprio dia da marca. DIA_VENDA identifica as linhas cujas vendas são todas de
+# um mesmo dia, para que a incremental substitua o dia da marca no cache: no modo
+# detalhado é o dia de cada linha; no agregado as vendas do último dia do período
+# são somadas em linhas à parte (DIA_VENDA nulo nas demais).
+QUERY_FATURAMENTO_DETALHADO = """
+            SELECT {hint}DADOS_FATURAMENTO.*, TRUNC(DATA_VENDA) AS DIA_VENDA
+            FROM DADOS_FATURAMENTO 
+            WHERE DATA_VENDA >= :data_inicio
+            AND DATA_VENDA < :data_fim
             """
-            df = pd.read_sql(query, connection)
-            
-            # Renomear colunas para corresponder à lógica do script original
-            column_mapping = {
-                'CODIGO_VENDEDOR': 'sellerCode',
-                'NOME_VENDEDOR': 'sellerName',
-                'CODIGO_PRODUTO': 'productCode',
-                'DESCRICAO_PRODUTO': 'productDesc',
-                'FATURAMENTO_LIQUIDO': 'revenue',  # Usando FATURAMENTO_LIQUIDO para ficar certinho
-                'DEVOLUCAO': 'valorRetMerc',
-                'CUSTO_FIN_FAT': 'valorTituloAberto',
-                'CUSTO_FIN_DEV': 'valorAcrescTituloPagoMesAnt'
-            }
-            df.rename(columns=column_mapping, inplace=True)
-
-            # Garantir que os tipos de dados estejam corretos
-            df['sellerCode'] = pd.to_numeric(df['sellerCode'], errors='coerce')
-            df['productCode'] = df['productCode'].astype(str)
-            numeric_cols = ['revenue', 'valorRetMerc', 'valorTituloAberto', 'valorAcrescTituloPagoMesAnt']
-            for col in numeric_cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            
-            # Garantir que os nomes dos vendedores não estejam vazios
-            df['sellerName'] = df['sellerName'].fillna('Vendedor Desconhecido')
-            
-            print(f"Dados do Oracle carregados: {len(df)} registros")
-            print(f"Vendedores únicos: {df['sellerCode'].nunique()}")
-            print(f"Primeiros nomes de vendedores: {df['sellerName'].head().tolist()}")
-            
-            return df
+
+QUERY_FATURAMENTO_AGREGADO = """
+            SELECT CODIGO_VENDEDOR,
+                   MAX(NOME_VENDEDOR) AS NOME_VENDEDOR,
+                   CODIGO_PRODUTO,
+                   MAX(DESCRICAO_PRODUTO) AS DESCRICAO_PRODUTO,
+                   SUM(FATURAMENTO_LIQUIDO) AS FATURAMENTO_LIQUIDO,
+                   SUM(DEVOLUCAO) AS DEVOLUCAO,
+                   SUM(CUSTO_FIN_FAT) AS CUSTO_FIN_FAT,
+                   SUM(CUSTO_FIN_DEV) AS CUSTO_FIN_DEV,
+                   MAX(DATA_VENDA) AS DATA_VENDA,
+                   DIA_VENDA
+            FROM (
+                SELECT {hint}DADOS_FATURAMENTO.*,
+                       CASE WHEN TRUNC(DATA_VENDA) = TRUNC(MAX(DATA_VENDA) OVER ())
+                            THEN TRUNC(DATA_VENDA) END AS DIA_VENDA
+                FROM DADOS_FATURAMENTO 
+                WHERE DATA_VENDA >= :data_inicio
+                AND DATA_VENDA < :data_fim
+            )
+            GROUP BY CODIGO_VENDEDOR, CODIGO_PRODUTO, DIA_VENDA
+            """
+
+def _periodo_mes(mes, ano):
+    """Retorna o intervalo semiaberto [início do mês, início do mês seguinte)"""
+    data_inicio = datetime(int(ano), int(mes), 1)
+    if data_inicio.month == 12:
+        data_fim = datetime(data_inicio.year + 1, 1, 1)
+    else:
+        data_fim = datetime(data_inicio.year, data_inicio.month + 1, 1)
+    return data_inicio, data_fim
+
+def _montar_query_faturamento(modo):
+    """
+    Monta o texto da query de faturamento para o modo informado.
+    O hint opcional (ex.: partição ou paralelismo) vem da configuração, então o
+    texto continua estável entre períodos.
+    """
+    hint = current_app.config.get('ORACLE_FATURAMENTO_HINT')
+    hint_sql = f"/*+ {hint} */ " if hint else ""
+    if modo == 'agregado':
+        return QUERY_FATURAMENTO_AGREGADO.format(hint=hint_sql)
+    return QUERY_FATURAMENTO_DETALHADO.format(hint=hint_sql)
+
+def _resolver_modo_importacao(modo):
+    """Valida o modo de importação, usando o padrão da configuração quando não informado"""
+    modo = modo or current_app.config['ORACLE_IMPORT_MODE']
+    if modo not in IMPORT_MODES:
+        raise ValueError(f"Modo de importação inválido: {modo}")
+    return modo
+
+def _normalizar_dados_oracle(df):
+    """Renomeia as colunas do Oracle e garante os tipos usados no restante do processo"""
+    import pandas as pd
+    # Renomear colunas para corresponder à lógica do script original
+    column_mapping = {
+        'CODIGO_VENDEDOR': 'sellerCode',
+        'NOME_VENDEDOR': 'sellerName',
+        'CODIGO_PRODUTO': 'productCode',
+        'DESCRICAO_PRODUTO': 'productDesc',
+        'FATURAMENTO_LIQUIDO': 'revenue',  # Usando FATURAMENTO_LIQUIDO para ficar certinho
+        'DEVOLUCAO': 'valorRetMerc',
+        'CUSTO_FIN_FAT': 'valorTituloAberto',
+        'CUSTO_FIN_DEV': 'valorAcrescTituloPagoMesAnt',
+        'DATA_VENDA': 'dataVenda',
+        'DIA_VENDA': 'diaVenda'
+    }
+    df.rename(columns=column_mapping, inplace=True)
+
+    # Garantir que os tipos de dados estejam corretos
+    df['sellerCode'] = pd.to_numeric(df['sellerCode'], errors='coerce')
+    df['productCode'] = df['productCode'].astype(str)
+    numeric_cols = ['revenue', 'valorRetMerc', 'valorTituloAberto', 'valorAcrescTituloPagoMesAnt']
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    
+    for col in ('dataVenda', 'diaVenda'):
+        if col in df:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    
+    # Garantir que os nomes dos vendedores não estejam vazios
+    df['sellerName'] = df['sellerName'].fillna('Vendedor Desconhecido')
+    return df
+
+def iter_sales_data_from_oracle(mes, ano, modo=None, chunk_size=None, desde=None):
+    """
+    Executa a query de faturamento e devolve os dados em blocos (DataFrames já
+    tipados) de até chunk_size linhas, usando fetchmany com arraysize/prefetchrows
+    ajustados. O pico de memória fica limitado ao tamanho do bloco.
+    Se 'desde' for informado, traz apenas as vendas com DATA_VENDA a partir dele.
+    """
+    import pandas as pd
+    modo = _resolver_modo_importacao(modo)
+    if chunk_size is None:
+        chunk_size = current_app.config['ORACLE_FETCH_CHUNK_SIZE']
+
+    cronometro = Cronometro('fetch_sales_data_from_oracle')
+    with acquire_oracle_connection() as connection:
+        cronometro.marcar('conexao')
+        cursor = connection.cursor()
+        # Linhas trazidas por round-trip e já na resposta do execute
+        cursor.arraysize = chunk_size
+        cursor.prefetchrows = chunk_size
+
+        # Query com filtro por período de DATA_VENDA via variáveis de ligação
+        data_inicio, data_fim = _periodo_mes(mes, ano)
+        if desde is not None:
+            data_inicio = max(data_inicio, desde)
+        cursor.execute(
+            _montar_query_faturamento(modo),
+            data_inicio=data_inicio,
+            data_fim=data_fim
+        )
+        colunas = [coluna[0] for coluna in cursor.description]
+        cronometro.marcar('consulta', modo=modo)
+
+        # Leitura e conversão são acumuladas entre os blocos; o tempo de quem consome
+        # os blocos (ex.: gravação no cache) fica de fora
+        tempo_leitura = tempo_normalizacao = 0.0
+        linhas = 0
+        try:
+            while True:
+                inicio = time.perf_counter()
+                rows = cursor.fetchmany(chunk_size)
+                tempo_leitura += time.perf_counter() - inicio
+                if not rows:
+                    break
+                inicio = time.perf_counter()
+                df = _normalizar_dados_oracle(pd.DataFrame.from_records(rows, columns=colunas))
+                tempo_normalizacao += time.perf_counter() - inicio
+                linhas += len(rows)
+                yield df
+        finally:
+            registrar_fase('fetch_sales_data_from_oracle', 'leitura', tempo_leitura, linhas=linhas)
+            registrar_fase('fetch_sales_data_from_oracle', 'normalizacao', tempo_normalizacao, linhas=linhas)
+
+def fetch_sales_data_from_oracle(mes, ano, modo=None):
+    """
+    Conecta ao Oracle, executa a query e retorna um DataFrame Pandas.
+    No modo 'agregado' o Oracle devolve as somas por vendedor/produto; no modo
+    'detalhado' devolve cada linha de faturamento.
+    """
+    import pandas as pd
+    try:
+        modo = _resolver_modo_importacao(modo)
+        chunks = list(iter_sales_data_from_oracle(mes, ano, modo))
+        if not chunks:
+            return pd.DataFrame()
+        cronometro = Cronometro('fetch_sales_data_from_oracle')
+        df = pd.concat(chunks, ignore_index=True)
+        cronometro.marcar('concatenacao', linhas=len(df))
+
+        print(f"Dados do Oracle carregados ({modo}): {len(df)} registros")
+        print(f"Vendedores únicos: {df['sellerCode'].nunique()}")
+        print(f"Primeiros nomes de vendedores: {df['sellerName'].head().tolist()}")
+        
+        return df
     except Exception as e:
         print(f"Erro ao conectar ou buscar dados do Oracle: {e}")
         return pd.DataFrame()
 
-def save_sales_data_to_cache(df, mes, ano):
+def save_sales_data_to_cache(df, mes, ano, modo=None):
     """Salva os dados do DataFrame no cache local e atualiza nomes de vendedores."""
     if df.empty:
         return False
-    
+
+    success, _ = save_sales_chunks_to_cache([df], mes, ano, modo)
+    return success
+
+def _informar_progresso(progresso, percentual=None, mensagem=None):
+    """Repassa o andamento para o callback de progresso, quando houver (tarefas em segundo plano)"""
+    if progresso is not None:
+        progresso(percentual, mensagem)
+
+@rastreado
+def save_sales_chunks_to_cache(chunks, mes, ano, modo=None, incremental=False, progresso=None,
+                               apenas_vendedores_novos=None, dia_marca=None):
+    """
+    Grava no cache local os blocos de dados de vendas à medida que chegam (ex.: de
+    iter_sales_data_from_oracle) e atualiza os vendedores, tudo em uma transação.
+    Na carga completa substitui o mês e os vendedores; na incremental apenas
+    acrescenta as linhas novas e os vendedores ainda não cadastrados.
+    dia_marca (date, incremental): as linhas do cache com dia_venda a partir deste dia são
+    substituídas, pois a busca as traz de novo junto com as vendas lançadas depois.
+    apenas_vendedores_novos=True preserva os vendedores também na carga completa
+    (usado na importação de intervalos).
+    Também registra a marca d'água (maior DATA_VENDA) do período.
+    Retorna (sucesso, total de registros gravados); total é None em caso de erro.
+    progresso, se informado, recebe (percentual, mensagem) a cada bloco gravado.
+    """
+    import pandas as pd
     try:
-        # Primeiro, remove dados existentes para este mês/ano
-        DadosVendas.query.filter_by(mes=mes, ano=ano).delete()
-        
-        # APAGA TODOS os vendedores existentes e adiciona apenas os do Oracle
-        print("🗑️ Apagando todos os vendedores existentes...")
-        Vendedor.query.delete()
+        modo = _resolver_modo_importacao(modo)
+
+        # Espera o primeiro bloco antes de qualquer escrita: o DELETE abre a transação
+        # de escrita do SQLite, que não deve ficar aberta durante a consulta no Oracle
+        chunks = (chunk for chunk in chunks if not chunk.empty)
+        primeiro = next(chunks, None)
+        if primeiro is None and not incremental:
+            return False, 0
+
+        cronometro = Cronometro('save_sales_data_to_cache')
+
+        # Na carga completa, remove dados existentes para este mês/ano; na incremental,
+        # apenas os dias que a busca trouxe de novo
+        removidos = 0
+        if not incremental:
+            DadosVendas.query.filter_by(mes=mes, ano=ano).delete()
+            cronometro.marcar('exclusao')
+        elif dia_marca is not None and primeiro is not None:
+            removidos = DadosVendas.query.filter(
+                DadosVendas.mes == mes, DadosVendas.ano == ano, DadosVendas.dia_venda >= dia_marca
+            ).delete(synchronize_session=False)
+            cronometro.marcar('exclusao', linhas=removidos)
         
-        # Adiciona apenas os vendedores que vêm do Oracle
-        vendedores_no_df = df[['sellerCode', 'sellerName']].drop_duplicates().to_dict('records')
-        print(f"➕ Adicionando {len(vendedores_no_df)} vendedores do Oracle:")
+        # Insere os novos dados de vendas em lotes, bloco a bloco
+        inicio = time.perf_counter()
+        tempo_insercao = 0.0
+        vendedores = {}
+        maior_data_venda = None
+        total = 0
+        dimensoes = None
+        blocos = itertools.chain([primeiro], chunks) if primeiro is not None else []
+        for chunk in blocos:
+            if dimensoes is None:
+                dimensoes = (
+                    _DicionarioDimensao(DimensaoVendedor, DimensaoVendedor.nome, int),
+                    _DicionarioDimensao(DimensaoProduto, DimensaoProduto.descricao, str),
+                )
+            for rca, nome in zip(chunk['sellerCode'].tolist(), chunk['sellerName'].tolist()):
+                vendedores.setdefault(int(rca), str(nome))
+            if 'dataVenda' in chunk:
+                maior_chunk = chunk['dataVenda'].max()
+                if pd.notna(maior_chunk) and (maior_data_venda is None or maior_chunk > maior_data_venda):
+                    maior_data_venda = maior_chunk
+            inicio_insercao = time.perf_counter()
+            total += _inserir_dados_vendas_em_lotes(chunk, mes, ano, dimensoes)
+            tempo_insercao += time.perf_counter() - inicio_insercao
+            _informar_progresso(progresso, None, f"{total:,} registros gravados no cache")
+        # Só o INSERT: a espera pelos blocos do Oracle (streaming) é medida na busca
+        registrar_fase('save_sales_data_to_cache', 'insercao', tempo_insercao, linhas=total)
+        cronometro.reiniciar()
+
+        _informar_progresso(progresso, 85, f"Atualizando vendedores ({total:,} registros gravados)")
+        if apenas_vendedores_novos is None:
+            apenas_vendedores_novos = incremental
+        if apenas_vendedores_novos:
+            # Acrescenta apenas os vendedores novos, preservando os cadastros existentes
+            existentes = {rca for (rca,) in db.session.query(Vendedor.rca).filter(Vendedor.rca.in_(list(vendedores)))}
+            novos = {rca: nome for rca, nome in vendedores.items() if rca not in existentes}
+            if novos:
+                print(f"➕ Adicionando {len(novos)} vendedores novos do Oracle")
+        else:
+            # APAGA TODOS os vendedores existentes e adiciona apenas os do Oracle
+            print("🗑️ Apagando todos os vendedores existentes...")
+            Vendedor.query.delete()
+            novos = vendedores
+            print(f"➕ Adicionando {len(novos)} vendedores do Oracle:")
         
-        for v_data in vendedores_no_df:
-            print(f"   - RCA {v_data['sellerCode']}: {v_data['sellerName']}")
+        for rca, nome in novos.items():
+            print(f"   - RCA {rca}: {nome}")
             novo_vendedor = Vendedor(
-                rca=v_data['sellerCode'], 
-                nome=v_data['sellerName'],
+                rca=rca, 
+                nome=nome,
                 tipo=TipoVendedor.EXTERNO,
                 is_cooperativa=False,
                 ignorar_no_relatorio=False
             )
             db.session.add(novo_vendedor)
 
+        _registrar_controle_importacao(mes, ano, modo, incremental, maior_data_venda, total - removidos)
+        cronometro.marcar('vendedores')
         db.session.commit()
-        
-        # Insere os novos dados de vendas
-        for _, row in df.iterrows():
-            dados = DadosVendas(
-                mes=mes,
-                ano=ano,
-                seller_code=int(row['sellerCode']),
-                seller_name=str(row['sellerName']),
-                product_code=str(row['productCode']),
-                product_desc=str(row['productDesc']),
-                revenue=float(row['revenue']),
-                valor_ret_merc=float(row['valorRetMerc']),
-                valor_titulo_aberto=float(row['valorTituloAberto']),
-                valor_acresc_titulo_pago_mes_ant=float(row['valorAcrescTituloPagoMesAnt'])
-            )
-            db.session.add(dados)
-        
-        db.session.commit()
-        return True
+        cronometro.marcar('commit')
+
+        duracao = time.perf_counter() - inicio
+        print(f"💾 {total} registros gravados no cache em {duracao:.2f}s ({total / max(duracao, 1e-9):,.0f} linhas/s)")
+        return True, total
     except Exception as e:
         print(f"Erro ao salvar dados no cache: {e}")
         db.session.rollback()
-        return False
+        return False, None
+
+def _registrar_controle_importacao(mes, ano, modo, incremental, maior_data_venda, total):
+    """
+    Atualiza a marca d'água e os horários de importação do período (sem commit).
+    Na incremental, total é a variação de linhas do cache (novas menos substituídas).
+    """
+    import pandas as pd
+    agora = datetime.utcnow()
+    if isinstance(maior_data_venda, pd.Timestamp):
+        maior_data_venda = maior_data_venda.to_pydatetime()
+
+    controle = ControleImportacao.query.filter_by(mes=mes, ano=ano).first()
+    if controle is None:
+        controle = ControleImportacao(mes=mes, ano=ano, modo=modo, total_registros=0)
+        db.session.add(controle)
+
+    if incremental:
+        if maior_data_venda is not None and (controle.ultima_data_venda is None or maior_data_venda > controle.ultima_data_venda):
+            controle.ultima_data_venda = maior_data_venda
+        controle.total_registros = (controle.total_registros or 0) + total
+    else:
+        controle.modo = modo
+        controle.ultima_data_venda = maior_data_venda
+        controle.ultima_importacao_completa = agora
+        controle.total_registros = total
+    controle.ultima_importacao = agora
+
+class _DicionarioDimensao:
+    """
+    Pares (código, nome) -> id de uma dimensão do cache de vendas, carregados uma vez
+    por gravação. Os pares novos são inseridos na transação corrente; como a dimensão
+    só recebe inserções, basta reler os ids acima do maior já conhecido.
+    """
+
+    def __init__(self, modelo, coluna_nome, tipo_codigo):
+        self.modelo = modelo
+        self.coluna_nome = coluna_nome
+        self.tipo_codigo = tipo_codigo
+        self.ids = {}
+        self.maior_id = 0
+        self._carregar_novos()
 
+    def _carregar_novos(self):
+        resultado = db.session.execute(
+            select(self.modelo.id, self.modelo.codigo, self.coluna_nome).where(self.modelo.id > self.maior_id)
+        )
+        for id_, codigo, nome in resultado:
+            self.ids[(codigo, nome)] = id_
+            self.maior_id = max(self.maior_id, id_)
+
+    def _inserir(self, novos):
+        """
+        Cadastra os pares novos e relê os ids. Outra importação pode ter cadastrado o
+        mesmo par depois da carga: o lote é inserido em um savepoint e, se violar a
+        unicidade de (código, nome), os pares que ainda faltam são inseridos um a um.
+        """
+        stmt = insert(self.modelo.__table__)
+        registros = [{'codigo': codigo, self.coluna_nome.key: nome} for codigo, nome in novos]
+        try:
+            with db.session.begin_nested():
+                db.session.execute(stmt, registros)
+        except IntegrityError:
+            self._carregar_novos()
+            for registro in registros:
+                if (registro['codigo'], registro[self.coluna_nome.key]) in self.ids:
+                    continue
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(stmt, registro)
+                except IntegrityError:
+                    pass
+        self._carregar_novos()
+
+    def codificar(self, codigos, nomes):
+        """Array com o id de cada linha, cadastrando os pares ainda inexistentes"""
+        import pandas as pd
+        pares = pd.MultiIndex.from_arrays([codigos, nomes])
+        unicos = pares.unique()
+        distintos = [(self.tipo_codigo(codigo), str(nome)) for codigo, nome in unicos]
+        novos = [par for par in distintos if par not in self.ids]
+        if novos:
+            self._inserir(novos)
+        ids = pd.Series([self.ids[par] for par in distintos], index=unicos, dtype='int64')
+        return ids.reindex(pares).to_numpy()
+
+def _inserir_dados_vendas_em_lotes(df, mes, ano, dimensoes, batch_size=None):
+    """
+    Insere as linhas do DataFrame em DadosVendas com INSERT executemany em lotes de
+    tamanho fixo, montados direto dos arrays de colunas (sem objetos ORM).
+    Vendedor e produto são gravados como ids das dimensões (dimensoes = dicionários
+    de vendedores e de produtos da gravação corrente).
+    """
+    if batch_size is None:
+        batch_size = current_app.config['CACHE_INSERT_BATCH_SIZE']
+
+    dimensao_vendedor, dimensao_produto = dimensoes
+    vendedor_ids = dimensao_vendedor.codificar(df['sellerCode'].astype('int64'), df['sellerName'].astype(str))
+    produto_ids = dimensao_produto.codificar(df['productCode'].astype(str), df['productDesc'].astype(str))
+
+    # Dia de todas as vendas da linha (ver DIA_VENDA nas queries); nulo se não informado
+    if 'diaVenda' in df:
+        dias = df['diaVenda'].dt.date.astype(object).where(df['diaVenda'].notna(), None).tolist()
+    else:
+        dias = [None] * len(df)
+
+    data_importacao = datetime.utcnow()
+    stmt = insert(DadosVendas.__table__)
+    total = 0
+
+    for inicio in range(0, len(df), batch_size):
+        fim = inicio + batch_size
+        lote = df.iloc[inicio:fim]
+        registros = [
+            {
+                'mes': mes,
+                'ano': ano,
+                'vendedor_id': vendedor_id,
+                'produto_id': produto_id,
+                'revenue': revenue,
+                'valor_ret_merc': valor_ret_merc,
+                'valor_titulo_aberto': valor_titulo_aberto,
+                'valor_acresc_titulo_pago_mes_ant': valor_acresc,
+                'dia_venda': dia_venda,
+                'data_importacao': data_importacao,
+            }
+            for vendedor_id, produto_id, revenue, valor_ret_merc, valor_titulo_aberto, valor_acresc, dia_venda in zip(
+                vendedor_ids[inicio:fim].tolist(),
+                produto_ids[inicio:fim].tolist(),
+                lote['revenue'].astype('float64').tolist(),
+                lote['valorRetMerc'].astype('float64').tolist(),
+                lote['valorTituloAberto'].astype('float64').tolist(),
+                lote['valorAcrescTituloPagoMesAnt'].astype('float64').tolist(),
+                dias[inicio:fim],
+            )
+        ]
+        db.session.execute(stmt, registros)
+        total += len(registros)
+
+    return total
+
+# Colunas de valores lidas do cache de vendas e seus tipos no DataFrame; vendedor e
+# produto vêm das dimensões (ver _ler_vendas_cache)
+SALES_CACHE_COLUMNS = {
+    'revenue': (DadosVendas.revenue, 'float64'),
+    'valorRetMerc': (DadosVendas.valor_ret_merc, 'float64'),
+    'valorTituloAberto': (DadosVendas.valor_titulo_aberto, 'float64'),
+    'valorAcrescTituloPagoMesAnt': (DadosVendas.valor_acresc_titulo_pago_mes_ant, 'float64'),
+}
+
+def _ler_dimensao(coluna_nome, ids):
+    """Lê a dimensão (código e nome, indexada pelo id) e a posição de cada id nela"""
+    import pandas as pd
+    modelo = coluna_nome.class_
+    dimensao = pd.read_sql(
+        select(modelo.id, modelo.codigo, coluna_nome.label('nome')),
+        db.session.connection(),
+        index_col='id'
+    )
+    return dimensao, dimensao.index.get_indexer(ids)
+
+def _categorico(valores_dimensao, posicoes):
+    """
+    Coluna categórica com o valor da dimensão em cada posição: os textos distintos
+    ficam uma vez na memória e cada linha guarda apenas um código inteiro.
+    Categorias ordenadas, para groupby(sort=True) manter a ordem alfabética.
+    """
+    import pandas as pd
+    codigos, categorias = pd.factorize(valores_dimensao, sort=True)
+    return pd.Categorical.from_codes(codigos[posicoes], categories=categorias)
+
+def _ler_vendas_cache(filtro, colunas=SALES_CACHE_COLUMNS):
+    """
+    Lê as vendas que atendem ao filtro. A consulta principal traz apenas os ids das
+    dimensões e os valores; códigos e nomes vêm de uma consulta por dimensão (as
+    dimensões só crescem, então contêm todos os ids lidos) e entram no DataFrame
+    como colunas categóricas: cada nome fica uma vez na memória, não uma por linha.
+    """
+    import pandas as pd
+    fatos = pd.read_sql(
+        select(
+            DadosVendas.vendedor_id, DadosVendas.produto_id,
+            *[coluna.label(nome) for nome, (coluna, _) in colunas.items()]
+        ).where(filtro),
+        db.session.connection(),
+        dtype={'vendedor_id': 'int64', 'produto_id': 'int64', **{nome: dtype for nome, (_, dtype) in colunas.items()}}
+    )
+    if fatos.empty:
+        return pd.DataFrame()
+
+    vendedores, posicoes_vendedor = _ler_dimensao(DimensaoVendedor.nome, fatos['vendedor_id'])
+    produtos, posicoes_produto = _ler_dimensao(DimensaoProduto.descricao, fatos['produto_id'])
+    df = pd.DataFrame({
+        'sellerCode': vendedores['codigo'].to_numpy(dtype='int64')[posicoes_vendedor],
+        'sellerName': _categorico(vendedores['nome'], posicoes_vendedor),
+        'productCode': _categorico(produtos['codigo'].astype(str), posicoes_produto),
+        'productDesc': _categorico(produtos['nome'], posicoes_produto),
+    })
+    for nome in colunas:
+        df[nome] = fatos[nome].to_numpy()
+    return df
+
+@rastreado
 def get_sales_data_from_cache(mes, ano):
-    """Busca dados de vendas do cache local"""
+    """
+    Busca dados de vendas do cache local.
+    Executa um SELECT apenas das colunas necessárias e monta o DataFrame direto do
+    cursor, com tipos explícitos, sem materializar objetos ORM (ver _ler_vendas_cache).
+    """
+    import pandas as pd
     try:
-        dados = DadosVendas.query.filter_by(mes=mes, ano=ano).all()
-        if not dados:
-            return pd.DataFrame()
-        
-        # Converte para DataFrame
-        df_data = []
-        for d in dados:
-            df_data.append({
-                'sellerCode': d.seller_code,
-                'sellerName': d.seller_name,
-                'productCode': d.product_code,
-                'productDesc': d.product_desc,
-                'revenue': d.revenue,
-                'valorRetMerc': d.valor_ret_merc,
-                'valorTituloAberto': d.valor_titulo_aberto,
-                'valorAcrescTituloPagoMesAnt': d.valor_acresc_titulo_pago_mes_ant
-            })
-        
-        return pd.DataFrame(df_data)
+        return _ler_vendas_cache((DadosVendas.mes == mes) & (DadosVendas.ano == ano))
     except Exception as e:
         print(f"Erro ao buscar dados do cache: {e}")
         return pd.DataFrame()
 
-def import_month_data(mes, ano):
-    """Importa dados de um mês específico do Oracle para o cache local"""
-    print(f"🔄 Importando dados para {mes}/{ano}...")
+@rastreado
+def get_sales_data_for_periods(meses):
+    """
+    Busca em uma única consulta colunar os dados de vendas de vários meses
+    (lista de (mes, ano)), com as colunas 'mes' e 'ano' para o detalhamento mensal.
+    """
+    import pandas as pd
+    try:
+        colunas = dict(SALES_CACHE_COLUMNS, mes=(DadosVendas.mes, 'int64'), ano=(DadosVendas.ano, 'int64'))
+        return _ler_vendas_cache(tuple_(DadosVendas.mes, DadosVendas.ano).in_(meses), colunas)
+    except Exception as e:
+        print(f"Erro ao buscar dados do cache: {e}")
+        return pd.DataFrame()
+
+@rastreado
+def import_month_data(mes, ano, modo=None, incremental=False, progresso=None):
+    """
+    Importa dados de um mês específico do Oracle para o cache local.
+    Por padrão usa o modo agregado (uma linha por vendedor/produto); o modo
+    'detalhado' mantém as linhas de nota fiscal para auditoria.
+    Com incremental=True busca apenas as vendas a partir do dia da marca d'água do
+    período (substituindo esse dia no cache), fazendo uma reconciliação completa
+    quando ela estiver vencida.
+    progresso, se informado, recebe (percentual, mensagem) durante a importação.
+    """
+    try:
+        modo = _resolver_modo_importacao(modo)
+    except ValueError as e:
+        return False, str(e)
+
+    if incremental:
+        controle = ControleImportacao.query.filter_by(mes=mes, ano=ano).first()
+        if _precisa_reconciliacao(controle, modo):
+            print(f"🔁 Reconciliação completa de {mes}/{ano}")
+        else:
+            marca = controle.ultima_data_venda
+            dia_marca = datetime(marca.year, marca.month, marca.day)
+            print(f"🔄 Importação incremental de {mes}/{ano} (modo {modo}) a partir de {dia_marca:%d/%m/%Y}...")
+            _informar_progresso(progresso, 10, "Consultando vendas novas no Oracle...")
+            success, total = save_sales_chunks_to_cache(
+                iter_sales_data_from_oracle(mes, ano, modo, desde=dia_marca), mes, ano, modo,
+                incremental=True, progresso=progresso, dia_marca=dia_marca.date()
+            )
+            if success:
+                return True, f"✅ Importação incremental concluída ({modo}): {total} registros gravados a partir de {dia_marca:%d/%m/%Y}"
+            return False, "❌ Erro ao importar dados do Oracle para o cache local"
+
+    if current_app.config['ORACLE_FETCH_STREAMING']:
+        # Busca e grava bloco a bloco, sem montar o mês inteiro em memória
+        _informar_progresso(progresso, 10, "Consultando vendas no Oracle...")
+        success, total = save_sales_chunks_to_cache(
+            iter_sales_data_from_oracle(mes, ano, modo), mes, ano, modo, progresso=progresso
+        )
+
+        if success:
+            return True, f"✅ Dados importados com sucesso ({modo}): {total} registros"
+        if total == 0:
+            return False, "Nenhum dado encontrado no Oracle para este período"
+        return False, "❌ Erro ao importar dados do Oracle para o cache local"
     
     # Busca dados do Oracle
-    df = fetch_sales_data_from_oracle(mes, ano)
+    _informar_progresso(progresso, 10, "Consultando vendas no Oracle...")
+    df = fetch_sales_data_from_oracle(mes, ano, modo)
     
     if df.empty:
         return False, "Nenhum dado encontrado no Oracle para este período"
@@ -174,13 +616,120 @@ def import_month_data(mes, ano):
         print(f"   - RCA {v['sellerCode']}: {v['sellerName']}")
     
     # Salva no cache local
-    success = save_sales_data_to_cache(df, mes, ano)
+    _informar_progresso(progresso, 60, f"Gravando {len(df):,} registros no cache...")
+    success = save_sales_data_to_cache(df, mes, ano, modo)
     
     if success:
-        return True, f"✅ Dados importados com sucesso: {len(df)} registros"
+        return True, f"✅ Dados importados com sucesso ({modo}): {len(df)} registros"
     else:
         return False, "❌ Erro ao salvar dados no cache local"
 
+def meses_do_intervalo(mes_ini, ano_ini, mes_fim, ano_fim):
+    """Lista (mes, ano) de mes_ini/ano_ini até mes_fim/ano_fim, inclusive"""
+    inicio = ano_ini * 12 + mes_ini - 1
+    fim = ano_fim * 12 + mes_fim - 1
+    return [(indice % 12 + 1, indice // 12) for indice in range(inicio, fim + 1)]
+
+def import_month_range(mes_ini, ano_ini, mes_fim, ano_fim, modo=None, progresso=None):
+    """
+    Importa um intervalo de meses do Oracle. As consultas dos meses rodam em
+    paralelo (IMPORT_RANGE_WORKERS threads, cada uma com uma conexão do pool) e a
+    gravação é feita por um único escritor (esta thread), mês a mês, na ordem em
+    que as consultas terminam. No máximo IMPORT_RANGE_WORKERS meses ficam em memória
+    (em consulta ou aguardando o escritor). Cada mês é gravado e confirmado separadamente: a
+    falha de um mês não desfaz os demais. Os vendedores existentes são preservados
+    e apenas os novos são acrescentados.
+    Retorna (sucesso, mensagem, resultados por mês).
+    """
+    try:
+        modo = _resolver_modo_importacao(modo)
+    except ValueError as e:
+        return False, str(e), []
+
+    meses = meses_do_intervalo(mes_ini, ano_ini, mes_fim, ano_fim)
+    if not meses:
+        return False, "O mês inicial deve ser anterior ou igual ao mês final", []
+    limite = current_app.config['IMPORT_RANGE_MAX_MONTHS']
+    if len(meses) > limite:
+        return False, f"O intervalo tem {len(meses)} meses; o máximo é {limite}", []
+
+    app = current_app._get_current_object()
+    workers = min(len(meses), current_app.config['IMPORT_RANGE_WORKERS'])
+    # Uma vaga por mês consultado e ainda não gravado: se o escritor atrasar, as
+    # consultas seguintes esperam em vez de acumular meses inteiros em memória
+    vagas = threading.BoundedSemaphore(workers)
+
+    def buscar_mes(mes, ano):
+        # Executado nas threads de consulta: apenas leitura do Oracle, sem acesso ao SQLite.
+        # A vaga é devolvida pelo escritor, depois de gravar (ou descartar) o mês
+        vagas.acquire()
+        with app.app_context():
+            inicio = time.perf_counter()
+            chunks = [chunk for chunk in iter_sales_data_from_oracle(mes, ano, modo) if not chunk.empty]
+            return chunks, time.perf_counter() - inicio
+
+    print(f"📅 Importando {len(meses)} meses ({mes_ini:02d}/{ano_ini} a {mes_fim:02d}/{ano_fim}) com {workers} consultas simultâneas")
+    _informar_progresso(progresso, 0, f"Consultando {len(meses)} meses no Oracle...")
+
+    inicio = time.perf_counter()
+    resultados = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='importacao-oracle') as executor:
+        # Cada consulta roda com uma cópia do contexto atual: as fases medidas nas threads
+        # entram no resumo da tarefa (ver app/metrics.py)
+        futuros = {
+            executor.submit(contextvars.copy_context().run, buscar_mes, mes, ano): (mes, ano)
+            for mes, ano in meses
+        }
+        for concluidos, futuro in enumerate(as_completed(futuros), 1):
+            # Retira o futuro do dicionário para que os blocos do mês sejam liberados após a gravação
+            mes, ano = futuros.pop(futuro)
+            resultado = {'mes': mes, 'ano': ano, 'sucesso': False, 'registros': 0}
+            try:
+                chunks, tempo_consulta = futuro.result()
+                resultado['tempo_consulta'] = round(tempo_consulta, 2)
+            except Exception as e:
+                resultado['mensagem'] = f"Erro ao consultar o Oracle: {e}"
+            else:
+                if not chunks:
+                    resultado['mensagem'] = "Nenhum dado encontrado no Oracle para este período"
+                else:
+                    sucesso, total = save_sales_chunks_to_cache(chunks, mes, ano, modo, apenas_vendedores_novos=True)
+                    resultado['sucesso'] = sucesso
+                    resultado['registros'] = total or 0
+                    resultado['mensagem'] = (
+                        f"{total} registros importados" if sucesso else "Erro ao salvar dados no cache local"
+                    )
+            finally:
+                # Solta as referências ao mês antes de liberar a vaga para a próxima consulta
+                futuro = chunks = None
+                vagas.release()
+            resultados[(mes, ano)] = resultado
+            print(f"   {'✅' if resultado['sucesso'] else '❌'} {mes:02d}/{ano}: {resultado['mensagem']}")
+            _informar_progresso(
+                progresso, concluidos * 100 / len(meses),
+                f"{concluidos}/{len(meses)} meses processados (último: {mes:02d}/{ano})"
+            )
+
+    resultados = [resultados[periodo] for periodo in meses]
+    importados = sum(1 for resultado in resultados if resultado['sucesso'])
+    duracao = time.perf_counter() - inicio
+    print(f"📅 Intervalo concluído em {duracao:.2f}s: {importados}/{len(meses)} meses importados")
+
+    if importados == len(meses):
+        return True, f"✅ {importados} meses importados com sucesso ({modo})", resultados
+    if importados:
+        return True, f"⚠️ {importados} de {len(meses)} meses importados ({modo}); verifique os meses com falha", resultados
+    return False, "❌ Nenhum mês do intervalo foi importado", resultados
+
+def _precisa_reconciliacao(controle, modo):
+    """Indica se o período precisa de uma importação completa em vez de incremental"""
+    if controle is None or controle.ultima_data_venda is None or controle.modo != modo:
+        return True
+    if controle.ultima_importacao_completa is None:
+        return True
+    horas = current_app.config['IMPORT_RECONCILIACAO_HORAS']
+    return datetime.utcnow() - controle.ultima_importacao_completa > timedelta(hours=horas)
+
 def get_available_months():
     """Retorna lista de meses/anos disponíveis no cache"""
     try:
@@ -224,6 +773,83 @@ def get_commission_rate(vendedor_rca, product_code):
     # 5. Taxa padrão fallback (não deveria acontecer se o banco estiver bem populado)
     return 0.015
 
+def load_commission_rules():
+    """
+    Carrega as quatro tabelas de regras de comissão de uma só vez.
+    Retorna um snapshot em memória usado por resolve_commission_rates.
+    """
+    import pandas as pd
+    session = db.session
+
+    regras = session.query(
+        RegraComissao.vendedor_rca,
+        RegraComissao.codigo_produto,
+        RegraComissao.taxa_comissao
+    ).order_by(RegraComissao.id).all()
+    regras_df = pd.DataFrame(regras, columns=['sellerCode', 'productCode', 'rate'])
+    regras_df['productCode'] = regras_df['productCode'].astype(str)
+
+    # Mantém a primeira regra encontrada, como o .first() de get_commission_rate
+    regras_vendedor = regras_df[regras_df['sellerCode'].notna()].drop_duplicates(['sellerCode', 'productCode'])
+    regras_globais = regras_df[regras_df['sellerCode'].isna()].drop_duplicates('productCode')
+
+    especiais = session.query(
+        ProdutoEspecial.codigo_produto,
+        ProdutoEspecial.taxa_comissao
+    ).all()
+    padroes = session.query(
+        ComissaoPadrao.vendedor_rca,
+        ComissaoPadrao.taxa_comissao
+    ).all()
+
+    return {
+        'vendedor_produto': pd.Series(
+            regras_vendedor['rate'].to_numpy(dtype='float64'),
+            index=pd.MultiIndex.from_arrays([
+                regras_vendedor['sellerCode'].astype('int64'),
+                regras_vendedor['productCode']
+            ])
+        ),
+        'produto_especial': pd.Series({str(codigo): taxa for codigo, taxa in especiais}, dtype='float64'),
+        'produto': pd.Series(
+            regras_globais['rate'].to_numpy(dtype='float64'),
+            index=regras_globais['productCode'].to_numpy()
+        ),
+        'padrao_vendedor': pd.Series({rca: taxa for rca, taxa in padroes}, dtype='float64'),
+    }
+
+def resolve_commission_rates(sales_df, rules=None):
+    """
+    Resolve a taxa de comissão de todas as linhas do DataFrame em uma única passada,
+    seguindo a mesma hierarquia de get_commission_rate.
+    """
+    import pandas as pd
+    if rules is None:
+        rules = load_commission_rules()
+
+    if sales_df.empty:
+        return pd.Series(index=sales_df.index, dtype='float64')
+
+    seller_codes = sales_df['sellerCode'].astype('int64')
+    product_codes = sales_df['productCode'].astype(str)
+
+    # 1. Regra mais específica: Vendedor + Produto específico
+    regras_vendedor = rules['vendedor_produto']
+    if regras_vendedor.empty:
+        rates = pd.Series(float('nan'), index=sales_df.index, dtype='float64')
+    else:
+        chaves = pd.MultiIndex.from_arrays([seller_codes, product_codes])
+        rates = pd.Series(regras_vendedor.reindex(chaves).to_numpy(), index=sales_df.index)
+
+    # 2. Produto especial / 3. Regra por produto / 4. Comissão padrão do vendedor
+    rates = rates.fillna(product_codes.map(rules['produto_especial']))
+    rates = rates.fillna(product_codes.map(rules['produto']))
+    rates = rates.fillna(seller_codes.map(rules['padrao_vendedor']))
+
+    # 5. Taxa padrão fallback
+    return rates.fillna(0.015).astype('float64')
+
+@rastreado
 def process_commissions(mes=None, ano=None):
     """Orquestra o processo: busca dados, aplica regras, calcula e estrutura o resultado."""
     # Se não especificou mês/ano, usa o mês atual
@@ -232,59 +858,91 @@ def process_commissions(mes=None, ano=None):
         mes = now.month
         ano = now.year
     
+    cronometro = Cronometro('process_commissions')
+
     # Busca dados do cache local
     sales_df = get_sales_data_from_cache(mes, ano)
+    cronometro.marcar('leitura_cache', linhas=len(sales_df))
     
     if sales_df.empty:
         return {}, f"Nenhum dado encontrado para {mes}/{ano}. Importe os dados primeiro."
     
+    # Pré-carrega vendedores, ajustes do período e regras em um número fixo de consultas;
+    # a montagem por vendedor abaixo é feita apenas em memória
+    vendedores = {v.rca: v for v in Vendedor.query.all()}
+    ajustes_financeiros = {a.vendedor_rca: a for a in AjusteFinanceiro.query.filter_by(mes=mes, ano=ano)}
+    ajustes_faturamento = {a.vendedor_rca: a for a in AjusteFaturamento.query.filter_by(mes=mes, ano=ano)}
+    rules = load_commission_rules()
+    cronometro.marcar('carga_regras')
+    
     # Obter lista de vendedores a serem ignorados
-    ignored_sellers = [v.rca for v in Vendedor.query.filter_by(ignorar_no_relatorio=True).all()]
+    ignored_sellers = [rca for rca, v in vendedores.items() if v.ignorar_no_relatorio]
     sales_df = sales_df[~sales_df['sellerCode'].isin(ignored_sellers)]
     
-    # Aplicar a função get_commission_rate para cada linha para obter a taxa
-    sales_df['commissionRate'] = sales_df.apply(
-        lambda row: get_commission_rate(row['sellerCode'], row['productCode']),
-        axis=1
-    )
+    # Resolver a taxa de todas as linhas de uma vez, com as regras carregadas uma única vez
+    sales_df['commissionRate'] = resolve_commission_rates(sales_df, rules)
     
     # Calcular a comissão
     sales_df['commission'] = sales_df['revenue'] * sales_df['commissionRate']
-    
-    # Agrupar e agregar os resultados por vendedor
-    grouped = sales_df.groupby('sellerCode')
+    cronometro.marcar('resolucao_taxas')
     
     seller_data = {}
     
     # Produtos com comissão modificada (produtos especiais + regras específicas)
-    produtos_especiais_cod = [p.codigo_produto for p in ProdutoEspecial.query.all()]
-    regras_especiais_cod = [r.codigo_produto for r in RegraComissao.query.filter(
-        RegraComissao.vendedor_rca == None, 
-        RegraComissao.codigo_produto != None
-    ).all()]
-    produtos_comissao_modificada = list(set(produtos_especiais_cod + regras_especiais_cod))
-
-    for seller_code, group in grouped:
-        seller_info = Vendedor.query.filter_by(rca=seller_code).first()
+    produtos_comissao_modificada = list(set(rules['produto_especial'].index) | set(rules['produto'].index))
+    comissao_modificada = sales_df['productCode'].isin(produtos_comissao_modificada)
+
+    # Agregar uma única vez por vendedor e por vendedor/produto; os dados de cada
+    # vendedor são apenas recortados desses resultados no laço abaixo
+    totais_vendedor = sales_df.groupby('sellerCode', sort=True).agg(
+        sellerName=('sellerName', 'first'),  # Nome do vendedor que veio do Oracle
+        revenue=('revenue', 'sum'),  # Faturamento Oracle
+        commission=('commission', 'sum'),  # Comissão base do Oracle (PASSO 1 - não alterar)
+    )
+    outros_vendedor = sales_df[~comissao_modificada].groupby('sellerCode')[['revenue', 'commission']].sum()
+    produtos_agregados = sales_df[comissao_modificada].groupby(
+        ['sellerCode', 'productCode', 'productDesc'], sort=True, observed=True
+    ).agg(
+        revenue=('revenue', 'sum'),
+        commission=('commission', 'sum'),
+        commissionRate=('commissionRate', 'first'),
+    )
+
+    # Detalhar produtos com comissão especial, por vendedor
+    produtos_por_vendedor = {}
+    for (seller_code, product_code, product_desc), faturamento_produto, comissao_produto, taxa_comissao in zip(
+        produtos_agregados.index.tolist(),
+        produtos_agregados['revenue'].tolist(),
+        produtos_agregados['commission'].tolist(),
+        produtos_agregados['commissionRate'].tolist(),
+    ):
+        produtos_por_vendedor.setdefault(seller_code, []).append({
+            'codigo_produto': product_code,
+            'nome_produto': product_desc,
+            'taxa_comissao': taxa_comissao,
+            'faturamento_total': faturamento_produto,
+            'comissao_total': comissao_produto
+        })
+
+    outros_revenue = outros_vendedor['revenue'].to_dict()
+    outros_commission = outros_vendedor['commission'].to_dict()
+    cronometro.marcar('agregacao')
+
+    for seller_code, seller_name, faturamento_oracle, comissao_base_oracle in zip(
+        totais_vendedor.index.tolist(),
+        totais_vendedor['sellerName'].tolist(),
+        totais_vendedor['revenue'].tolist(),
+        totais_vendedor['commission'].tolist(),
+    ):
+        seller_info = vendedores.get(seller_code)
         if not seller_info:
             continue
-
-        # Pega o nome do vendedor do DataFrame, que veio do Oracle
-        seller_name = group['sellerName'].iloc[0] if not group.empty else seller_info.nome
         
-        # Buscar ajustes financeiros manuais para este vendedor e período
-        ajuste_financeiro = AjusteFinanceiro.query.filter_by(
-            vendedor_rca=seller_code,
-            mes=mes,
-            ano=ano
-        ).first()
+        # Ajustes financeiros manuais para este vendedor e período
+        ajuste_financeiro = ajustes_financeiros.get(seller_code)
         
-        # Buscar ajuste de faturamento manual para este vendedor e período
-        ajuste_faturamento = AjusteFaturamento.query.filter_by(
-            vendedor_rca=seller_code,
-            mes=mes,
-            ano=ano
-        ).first()
+        # Ajuste de faturamento manual para este vendedor e período
+        ajuste_faturamento = ajustes_faturamento.get(seller_code)
         
         # Usar valores manuais se existirem, senão usar 0
         valor_ret_merc_manual = ajuste_financeiro.valor_ret_merc if ajuste_financeiro else 0.0
@@ -294,36 +952,7 @@ def process_commissions(mes=None, ano=None):
         # Valores do ajuste de faturamento
         valor_ajuste_faturamento = ajuste_faturamento.valor_ajuste if ajuste_faturamento else 0.0
         taxa_comissao_ajuste = ajuste_faturamento.taxa_comissao_ajuste if ajuste_faturamento else 0.0
-            
-        # Separar produtos com comissão modificada e outros produtos
-        produtos_comissao_modificada_df = group[group['productCode'].isin(produtos_comissao_modificada)]
-        outros_produtos = group[~group['productCode'].isin(produtos_comissao_modificada)]
-
-        # Detalhar produtos com comissão especial
-        produtos_detalhados = []
-        if not produtos_comissao_modificada_df.empty:
-            # Agrupar por produto para obter detalhes individuais
-            produtos_agrupados = produtos_comissao_modificada_df.groupby(['productCode', 'productDesc'])
-            
-            for (product_code, product_desc), produto_group in produtos_agrupados:
-                # Obter taxa de comissão aplicada ao produto
-                taxa_comissao = get_commission_rate(seller_code, product_code)
-                
-                # Calcular faturamento e comissão do produto
-                faturamento_produto = produto_group['revenue'].sum()
-                comissao_produto = produto_group['commission'].sum()
-                
-                produtos_detalhados.append({
-                    'codigo_produto': product_code,
-                    'nome_produto': product_desc,
-                    'taxa_comissao': taxa_comissao,
-                    'faturamento_total': faturamento_produto,
-                    'comissao_total': comissao_produto
-                })
-
-        # Calcular comissão base do Oracle (PASSO 1 - não alterar)
-        comissao_base_oracle = group['commission'].sum()
-        
+
         # Calcular comissão do ajuste de faturamento (PASSO 3)
         comissao_do_ajuste = valor_ajuste_faturamento * taxa_comissao_ajuste
         
@@ -341,7 +970,6 @@ def process_commissions(mes=None, ano=None):
         comissao_final = comissao_final - valor_titulo_aberto_manual
         
         # Calcular faturamento total (PASSO 5)
-        faturamento_oracle = group['revenue'].sum()
         faturamento_final = faturamento_oracle + valor_ajuste_faturamento
         
         seller_data[seller_code] = {
@@ -351,10 +979,10 @@ def process_commissions(mes=None, ano=None):
             'faturamentoOracle': faturamento_oracle,
             'faturamentoFinal': faturamento_final,
             'details': {
-                'produtos_detalhados': produtos_detalhados,
+                'produtos_detalhados': produtos_por_vendedor.get(seller_code, []),
                 'outros_produtos': {
-                    'revenue': outros_produtos['revenue'].sum() if not outros_produtos.empty else 0,
-                    'commission': outros_produtos['commission'].sum() if not outros_produtos.empty else 0,
+                    'revenue': outros_revenue.get(seller_code, 0),
+                    'commission': outros_commission.get(seller_code, 0),
                 }
             },
             'comissaoBaseOracle': comissao_base_oracle,
@@ -375,70 +1003,440 @@ def process_commissions(mes=None, ano=None):
 
     # Ordenar vendedores por faturamento final (do maior para o menor)
     sorted_sellers = dict(sorted(seller_data.items(), key=lambda item: item[1]['faturamentoFinal'], reverse=True))
+    cronometro.marcar('montagem', vendedores=len(sorted_sellers))
 
     return sorted_sellers, f"Relatório gerado para {mes}/{ano}"
 
-def sincronizar_produtos_oracle():
+def meses_do_trimestre(trimestre, ano):
+    """Retorna (mes_ini, ano_ini, mes_fim, ano_fim) do trimestre (1 a 4)"""
+    if not 1 <= trimestre <= 4:
+        raise ValueError("Trimestre deve estar entre 1 e 4")
+    return 3 * trimestre - 2, ano, 3 * trimestre, ano
+
+def meses_acumulado_ano(mes, ano):
+    """Retorna (mes_ini, ano_ini, mes_fim, ano_fim) de janeiro até o mês informado"""
+    return 1, ano, mes, ano
+
+@rastreado
+def process_commissions_periodo(mes_ini, ano_ini, mes_fim, ano_fim):
     """
-    Sincroniza a lista de produtos do Oracle com o cache local
+    Relatório de comissões de um intervalo de meses (trimestre, acumulado do ano...).
+    Carrega todos os meses em uma consulta, resolve a taxa uma vez por par
+    (vendedor, produto) distinto e aplica os ajustes de cada mês (financeiros e de
+    faturamento) ao somar. A estrutura por vendedor é a mesma de process_commissions,
+    com 'porMes' trazendo o faturamento e a comissão de cada mês.
+    As taxas usadas são as regras atuais, como no relatório mensal.
     """
-    try:
-        config = current_app.config
-        
-        # Conecta ao Oracle
-        with oracledb.connect(
-            user=config['ORACLE_USER'], 
-            password=config['ORACLE_PASSWORD'], 
-            dsn=config['ORACLE_DSN']
-        ) as connection:
-            
-            # Query para buscar produtos únicos
-            query = """
-            SELECT DISTINCT CODIGO_PRODUTO, DESCRICAO_PRODUTO 
+    import pandas as pd
+    meses = meses_do_intervalo(mes_ini, ano_ini, mes_fim, ano_fim)
+    periodo = f"{mes_ini:02d}/{ano_ini} a {mes_fim:02d}/{ano_fim}"
+    if not meses:
+        return {}, "Intervalo inválido: o mês inicial deve ser anterior ou igual ao final"
+
+    cronometro = Cronometro('process_commissions_periodo')
+    sales_df = get_sales_data_for_periods(meses)
+    cronometro.marcar('leitura_cache', linhas=len(sales_df), meses=len(meses))
+    if sales_df.empty:
+        return {}, f"Nenhum dado encontrado para {periodo}. Importe os dados primeiro."
+
+    # Mesmas consultas fixas do relatório mensal, agora para todos os meses do intervalo
+    vendedores = {v.rca: v for v in Vendedor.query.all()}
+    filtro_ajuste_financeiro = tuple_(AjusteFinanceiro.mes, AjusteFinanceiro.ano).in_(meses)
+    filtro_ajuste_faturamento = tuple_(AjusteFaturamento.mes, AjusteFaturamento.ano).in_(meses)
+    ajustes_financeiros = AjusteFinanceiro.query.filter(filtro_ajuste_financeiro).all()
+    ajustes_faturamento = AjusteFaturamento.query.filter(filtro_ajuste_faturamento).all()
+    rules = load_commission_rules()
+    cronometro.marcar('carga_regras')
+
+    ignored_sellers = [rca for rca, v in vendedores.items() if v.ignorar_no_relatorio]
+    sales_df = sales_df[~sales_df['sellerCode'].isin(ignored_sellers)]
+
+    # Taxa resolvida uma vez por (vendedor, produto) e distribuída para as linhas
+    pares = sales_df[['sellerCode', 'productCode']].drop_duplicates()
+    taxas = pd.Series(
+        resolve_commission_rates(pares, rules).to_numpy(),
+        index=pd.MultiIndex.from_frame(pares)
+    )
+    sales_df['commissionRate'] = taxas.reindex(
+        pd.MultiIndex.from_frame(sales_df[['sellerCode', 'productCode']])
+    ).to_numpy()
+    sales_df['commission'] = sales_df['revenue'] * sales_df['commissionRate']
+    cronometro.marcar('resolucao_taxas')
+
+    produtos_comissao_modificada = list(set(rules['produto_especial'].index) | set(rules['produto'].index))
+    comissao_modificada = sales_df['productCode'].isin(produtos_comissao_modificada)
+
+    # Agregações do intervalo inteiro, cada uma em uma única passada
+    totais_vendedor = sales_df.groupby('sellerCode', sort=True).agg(
+        sellerName=('sellerName', 'first'),
+        revenue=('revenue', 'sum'),
+        commission=('commission', 'sum'),
+    )
+    totais_mes = sales_df.groupby(['sellerCode', 'ano', 'mes'], sort=True)[['revenue', 'commission']].sum()
+    outros_vendedor = sales_df[~comissao_modificada].groupby('sellerCode')[['revenue', 'commission']].sum()
+    produtos_agregados = sales_df[comissao_modificada].groupby(
+        ['sellerCode', 'productCode', 'productDesc'], sort=True, observed=True
+    ).agg(
+        revenue=('revenue', 'sum'),
+        commission=('commission', 'sum'),
+        commissionRate=('commissionRate', 'first'),
+    )
+
+    produtos_por_vendedor = {}
+    for (seller_code, product_code, product_desc), faturamento_produto, comissao_produto, taxa_comissao in zip(
+        produtos_agregados.index.tolist(),
+        produtos_agregados['revenue'].tolist(),
+        produtos_agregados['commission'].tolist(),
+        produtos_agregados['commissionRate'].tolist(),
+    ):
+        produtos_por_vendedor.setdefault(seller_code, []).append({
+            'codigo_produto': product_code,
+            'nome_produto': product_desc,
+            'taxa_comissao': taxa_comissao,
+            'faturamento_total': faturamento_produto,
+            'comissao_total': comissao_produto
+        })
+
+    # Ajustes por vendedor e mês: a comissão do ajuste de faturamento usa a taxa do próprio mês.
+    # Como no relatório mensal, só contam os ajustes dos meses em que o vendedor teve vendas,
+    # de modo que o intervalo é igual à soma dos relatórios mensais
+    meses_vendedor = {}
+    for (seller_code, ano, mes), faturamento_mes, comissao_mes in zip(
+        totais_mes.index.tolist(), totais_mes['revenue'].tolist(), totais_mes['commission'].tolist()
+    ):
+        meses_vendedor.setdefault(seller_code, {})[(mes, ano)] = {
+            'mes': mes, 'ano': ano,
+            'faturamentoOracle': faturamento_mes, 'comissaoBaseOracle': comissao_mes,
+            'valorAjuste': 0.0, 'comissaoDoAjuste': 0.0, 'ajustesFinanceiros': 0.0,
+        }
+
+    financeiros_vendedor = {}
+    for ajuste in ajustes_financeiros:
+        dados_mes = meses_vendedor.get(ajuste.vendedor_rca, {}).get((ajuste.mes, ajuste.ano))
+        if dados_mes is None:
+            continue
+        totais = financeiros_vendedor.setdefault(ajuste.vendedor_rca, {
+            'valorRetMerc': 0.0, 'valorTituloAberto': 0.0, 'valorAcrescTituloPagoMesAnt': 0.0,
+        })
+        totais['valorRetMerc'] += ajuste.valor_ret_merc or 0.0
+        totais['valorTituloAberto'] += ajuste.valor_titulo_aberto or 0.0
+        totais['valorAcrescTituloPagoMesAnt'] += ajuste.valor_acresc_titulo_pago_mes_ant or 0.0
+        dados_mes['ajustesFinanceiros'] += (
+            (ajuste.valor_acresc_titulo_pago_mes_ant or 0.0)
+            - (ajuste.valor_ret_merc or 0.0)
+            - (ajuste.valor_titulo_aberto or 0.0)
+        )
+
+    faturamento_vendedor = {}
+    for ajuste in ajustes_faturamento:
+        dados_mes = meses_vendedor.get(ajuste.vendedor_rca, {}).get((ajuste.mes, ajuste.ano))
+        if dados_mes is None:
+            continue
+        totais = faturamento_vendedor.setdefault(ajuste.vendedor_rca, {
+            'valorAjuste': 0.0, 'comissaoDoAjuste': 0.0, 'motivos': [],
+        })
+        comissao_ajuste = ajuste.valor_ajuste * ajuste.taxa_comissao_ajuste
+        totais['valorAjuste'] += ajuste.valor_ajuste
+        totais['comissaoDoAjuste'] += comissao_ajuste
+        if ajuste.motivo:
+            totais['motivos'].append(f"{ajuste.mes:02d}/{ajuste.ano}: {ajuste.motivo}")
+        dados_mes['valorAjuste'] += ajuste.valor_ajuste
+        dados_mes['comissaoDoAjuste'] += comissao_ajuste
+
+    outros_revenue = outros_vendedor['revenue'].to_dict()
+    outros_commission = outros_vendedor['commission'].to_dict()
+    cronometro.marcar('agregacao')
+
+    seller_data = {}
+    for seller_code, seller_name, faturamento_oracle, comissao_base_oracle in zip(
+        totais_vendedor.index.tolist(),
+        totais_vendedor['sellerName'].tolist(),
+        totais_vendedor['revenue'].tolist(),
+        totais_vendedor['commission'].tolist(),
+    ):
+        seller_info = vendedores.get(seller_code)
+        if not seller_info:
+            continue
+
+        financeiro = financeiros_vendedor.get(seller_code, {
+            'valorRetMerc': 0.0, 'valorTituloAberto': 0.0, 'valorAcrescTituloPagoMesAnt': 0.0,
+        })
+        faturamento = faturamento_vendedor.get(seller_code, {
+            'valorAjuste': 0.0, 'comissaoDoAjuste': 0.0, 'motivos': [],
+        })
+
+        comissao_do_ajuste = faturamento['comissaoDoAjuste']
+        total_commission = comissao_base_oracle + comissao_do_ajuste
+        comissao_final = (
+            total_commission
+            + financeiro['valorAcrescTituloPagoMesAnt']
+            - financeiro['valorRetMerc']
+            - financeiro['valorTituloAberto']
+        )
+        valor_ajuste = faturamento['valorAjuste']
+
+        por_mes = []
+        for (mes, ano), dados_mes in sorted(meses_vendedor[seller_code].items(), key=lambda item: (item[0][1], item[0][0])):
+            por_mes.append({
+                'mes': mes,
+                'ano': ano,
+                'faturamentoOracle': dados_mes['faturamentoOracle'],
+                'faturamentoFinal': dados_mes['faturamentoOracle'] + dados_mes['valorAjuste'],
+                'totalCommission': dados_mes['comissaoBaseOracle'] + dados_mes['comissaoDoAjuste'],
+                'comissaoFinal': (
+                    dados_mes['comissaoBaseOracle'] + dados_mes['comissaoDoAjuste'] + dados_mes['ajustesFinanceiros']
+                ),
+            })
+
+        seller_data[seller_code] = {
+            'name': seller_name,
+            'type': seller_info.tipo.value,
+            'is_cooperativa': seller_info.is_cooperativa,
+            'faturamentoOracle': faturamento_oracle,
+            'faturamentoFinal': faturamento_oracle + valor_ajuste,
+            'details': {
+                'produtos_detalhados': produtos_por_vendedor.get(seller_code, []),
+                'outros_produtos': {
+                    'revenue': outros_revenue.get(seller_code, 0),
+                    'commission': outros_commission.get(seller_code, 0),
+                }
+            },
+            'comissaoBaseOracle': comissao_base_oracle,
+            'comissaoDoAjuste': comissao_do_ajuste,
+            'totalCommission': total_commission,
+            'comissaoFinal': comissao_final,
+            'ajusteFaturamento': {
+                'valorAjuste': valor_ajuste,
+                # Taxa efetiva do intervalo (cada mês usa a taxa do próprio ajuste)
+                'taxaComissaoAjuste': (comissao_do_ajuste / valor_ajuste) if valor_ajuste else 0.0,
+                'motivo': '; '.join(faturamento['motivos']) or None,
+            },
+            'ajustesFinanceiros': {
+                'valorRetMerc': financeiro['valorRetMerc'],
+                'valorTituloAberto': financeiro['valorTituloAberto'],
+                'valorAcrescTituloPagoMesAnt': financeiro['valorAcrescTituloPagoMesAnt'],
+            },
+            'porMes': por_mes,
+        }
+
+    sorted_sellers = dict(sorted(seller_data.items(), key=lambda item: item[1]['faturamentoFinal'], reverse=True))
+    cronometro.marcar('montagem', vendedores=len(sorted_sellers))
+
+    return sorted_sellers, f"Relatório gerado para {periodo} ({len(meses)} meses)"
+
+def obter_relatorio_periodo(mes_ini, ano_ini, mes_fim, ano_fim):
+    """Relatório de um intervalo de meses com o mesmo cache versionado do relatório mensal"""
+    versao = obter_versao_dados()
+    if versao is None:
+        return process_commissions_periodo(mes_ini, ano_ini, mes_fim, ano_fim)
+
+    cache = obter_cache_relatorios()
+    chave = (identificador_banco(), 'periodo', mes_ini, ano_ini, mes_fim, ano_fim, versao)
+    resultado = cache.get(chave)
+    if resultado is None:
+        resultado = process_commissions_periodo(mes_ini, ano_ini, mes_fim, ano_fim)
+        cache.set(chave, resultado)
+    return resultado
+
+def obter_relatorio_comissoes(mes, ano):
+    """
+    Retorna o relatório de comissões do período usando o cache de resultados.
+    A chave inclui o banco e a versão dos dados, que muda a cada alteração em vendas,
+    regras, vendedores ou ajustes; assim o resultado nunca fica desatualizado.
+    O resultado é compartilhado entre requisições e não deve ser modificado.
+    """
+    versao = obter_versao_dados()
+    if versao is None:
+        return process_commissions(mes, ano)
+
+    cache = obter_cache_relatorios()
+    chave = (identificador_banco(), mes, ano, versao)
+    resultado = cache.get(chave)
+    if resultado is None:
+        resultado = process_commissions(mes, ano)
+        cache.set(chave, resultado)
+    return resultado
+
+# Query para buscar produtos únicos, com a última venda de cada um (marca d'água).
+# A sincronização completa lê todo o histórico; as demais filtram por DATA_VENDA a
+# partir do dia da marca, com o mesmo predicado sargável das importações, e leem só
+# os produtos vendidos desde a sincronização anterior.
+QUERY_CATALOGO_PRODUTOS = """
+            SELECT CODIGO_PRODUTO, DESCRICAO_PRODUTO, MAX(DATA_VENDA) AS DATA_VENDA
             FROM DADOS_FATURAMENTO 
             WHERE CODIGO_PRODUTO IS NOT NULL 
             AND DESCRICAO_PRODUTO IS NOT NULL
+            {filtro_data}
+            GROUP BY CODIGO_PRODUTO, DESCRICAO_PRODUTO
             ORDER BY CODIGO_PRODUTO
             """
-            
+
+FILTRO_CATALOGO_DESDE = "AND DATA_VENDA >= :desde"
+
+def _hash_nome_produto(nome):
+    """Hash do nome do produto, usado para detectar alterações no catálogo"""
+    return hashlib.md5(nome.encode('utf-8')).hexdigest()
+
+@rastreado
+def sincronizar_produtos_oracle(progresso=None, completa=False):
+    """
+    Sincroniza a lista de produtos do Oracle com o cache local.
+    O catálogo é lido em blocos e comparado com o cache por código e hash do nome;
+    apenas inclusões, alterações e exclusões são aplicadas (no cache e no índice FTS),
+    em lotes e em uma única transação, de modo que as buscas nunca veem o catálogo
+    vazio. Produtos sem alteração não são regravados; o horário da sincronização e a
+    marca d'água (maior DATA_VENDA lida) ficam em ControleSincronizacaoProdutos.
+    Com marca d'água, lê só os produtos vendidos a partir do dia dela (inclusões e
+    alterações). A sincronização completa (a primeira, ou com completa=True) lê todo o
+    histórico e também remove os produtos que não aparecem mais no Oracle.
+    progresso, se informado, recebe (percentual, mensagem) durante a sincronização.
+    """
+    try:
+        batch_size = current_app.config['CACHE_INSERT_BATCH_SIZE']
+
+        controle = db.session.get(ControleSincronizacaoProdutos, 1)
+        marca = controle.ultima_data_venda if controle is not None else None
+        completa = completa or marca is None
+
+        # Estado atual do cache: código -> (id, hash do nome)
+        existentes = {
+            codigo: (id_, _hash_nome_produto(nome))
+            for id_, codigo, nome in db.session.query(
+                ProdutoOracleCache.id, ProdutoOracleCache.codigo_produto, ProdutoOracleCache.nome_produto
+            )
+        }
+        # Encerra a transação de leitura antes da consulta (possivelmente longa) ao Oracle
+        db.session.rollback()
+
+        vistos = set()
+        inserir = []
+        atualizar = []
+        maior_data_venda = None
+
+        if completa:
+            query, binds = QUERY_CATALOGO_PRODUTOS.format(filtro_data=''), {}
+        else:
+            # Vendas lançadas depois da leitura anterior podem cair no próprio dia da marca
+            desde = datetime(marca.year, marca.month, marca.day)
+            query, binds = QUERY_CATALOGO_PRODUTOS.format(filtro_data=FILTRO_CATALOGO_DESDE), {'desde': desde}
+
+        # Obtém uma conexão do pool Oracle e lê o catálogo em blocos
+        _informar_progresso(progresso, 10, "Lendo catálogo de produtos do Oracle...")
+        with medir_fase('sincronizar_produtos_oracle', 'leitura'), acquire_oracle_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute(query)
-            produtos_oracle = cursor.fetchall()
-            
-            # Limpa o cache atual
-            ProdutoOracleCache.query.delete()
-            db.session.commit()
-            
-            # Insere os novos produtos no cache
-            produtos_inseridos = 0
-            for row in produtos_oracle:
-                try:
-                    produto_cache = ProdutoOracleCache(
-                        codigo_produto=str(row[0]).strip(),
-                        nome_produto=str(row[1]).strip(),
-                        data_sincronizacao=datetime.utcnow()
-                    )
-                    db.session.add(produto_cache)
-                    produtos_inseridos += 1
-                except Exception as e:
-                    # Log do erro mas continua processando
-                    print(f"⚠️ Erro ao inserir produto {row[0]}: {str(e)}")
-                    continue
-            
+            cursor.arraysize = batch_size
+            cursor.execute(query, **binds)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    codigo = str(row[0]).strip()
+                    nome = str(row[1]).strip()
+                    if row[2] is not None and (maior_data_venda is None or row[2] > maior_data_venda):
+                        maior_data_venda = row[2]
+                    # O mesmo código pode vir com descrições diferentes; mantém a primeira
+                    if codigo in vistos:
+                        continue
+                    vistos.add(codigo)
+
+                    atual = existentes.get(codigo)
+                    if atual is None:
+                        inserir.append({'codigo_produto': codigo, 'nome_produto': nome})
+                    elif atual[1] != _hash_nome_produto(nome):
+                        atualizar.append({'b_id': atual[0], 'b_nome': nome})
+                _informar_progresso(progresso, None, f"{len(vistos):,} produtos lidos do Oracle")
+
+        # Só a leitura completa mostra quais produtos deixaram de existir
+        remover = [id_ for codigo, (id_, _) in existentes.items() if codigo not in vistos] if completa else []
+
+        # Aplica as diferenças em lotes, tudo na mesma transação
+        _informar_progresso(
+            progresso, 70, f"Aplicando diferenças ({len(inserir)} novos, {len(atualizar)} alterados, {len(remover)} removidos)..."
+        )
+        tabela = ProdutoOracleCache.__table__
+        agora = datetime.utcnow()
+
+        for inicio in range(0, len(inserir), batch_size):
+            lote = inserir[inicio:inicio + batch_size]
+            for registro in lote:
+                registro['data_sincronizacao'] = agora
+            db.session.execute(insert(tabela), lote)
+
+        stmt_update = update(tabela).where(tabela.c.id == bindparam('b_id')).values(
+            nome_produto=bindparam('b_nome'), data_sincronizacao=agora
+        )
+        for inicio in range(0, len(atualizar), batch_size):
+            db.session.execute(stmt_update, atualizar[inicio:inicio + batch_size])
+
+        for inicio in range(0, len(remover), batch_size):
+            db.session.execute(delete(tabela).where(tabela.c.id.in_(remover[inicio:inicio + batch_size])))
+
+        # Ids dos produtos incluídos, para o índice FTS
+        gravados = [registro['b_id'] for registro in atualizar]
+        codigos_novos = [registro['codigo_produto'] for registro in inserir]
+        for inicio in range(0, len(codigos_novos), batch_size):
+            gravados.extend(db.session.execute(
+                select(tabela.c.id).where(tabela.c.codigo_produto.in_(codigos_novos[inicio:inicio + batch_size]))
+            ).scalars())
+
+        # Registra o horário da sincronização (usado nas estatísticas do cache) e a
+        # marca d'água na linha de controle
+        if marca is not None and (maior_data_venda is None or marca > maior_data_venda):
+            maior_data_venda = marca
+        controle = db.session.get(ControleSincronizacaoProdutos, 1)
+        if controle is None:
+            db.session.add(ControleSincronizacaoProdutos(
+                id=1, ultima_sincronizacao=agora, ultima_data_venda=maior_data_venda
+            ))
+        else:
+            controle.ultima_sincronizacao = agora
+            controle.ultima_data_venda = maior_data_venda
+
+        # Aplica as mesmas diferenças ao índice de busca textual, na mesma transação
+        _informar_progresso(progresso, 90, "Atualizando índices de busca...")
+        with medir_fase('sincronizar_produtos_oracle', 'indice_fts', gravados=len(gravados), removidos=len(remover)):
+            atualizar_indice_fts_produtos(gravados, remover, batch_size)
             db.session.commit()
-            
-            return True, f"Sincronização concluída! {produtos_inseridos} produtos sincronizados."
+
+        # Publica o novo catálogo para o autocompletar em memória
+        with medir_fase('sincronizar_produtos_oracle', 'autocompletar'):
+            reconstruir_indice_autocompletar()
+
+        if completa:
+            return True, (
+                f"Sincronização concluída! {len(vistos)} produtos sincronizados "
+                f"({len(inserir)} novos, {len(atualizar)} alterados, {len(remover)} removidos)."
+            )
+        return True, (
+            f"Sincronização concluída! {len(vistos)} produtos vendidos desde {desde:%d/%m/%Y} "
+            f"({len(inserir)} novos, {len(atualizar)} alterados)."
+        )
             
     except Exception as e:
         db.session.rollback()
         print(f"❌ Erro na sincronização: {str(e)}")
         return False, f"Erro na sincronização: {str(e)}"
 
+@rastreado
 def buscar_produtos_cache(filtro=None, limite=50):
     """
-    Busca produtos no cache local com filtro opcional
+    Busca produtos no cache local com filtro opcional.
+    Termos com 3 ou mais caracteres vão para o índice FTS5 (trigram, sem acentos,
+    ordenado por relevância). Sem filtro, com termo curto ou sem índice FTS, usa o
+    índice de autocompletar em memória e, por último, a busca com LIKE.
     """
     try:
+        if filtro:
+            produtos_fts = buscar_produtos_fts(filtro, limite)
+            if produtos_fts is not None:
+                return produtos_fts
+
+        produtos_memoria = buscar_produtos_autocompletar(filtro, limite)
+        if produtos_memoria is not None:
+            return produtos_memoria
+
         query = ProdutoOracleCache.query
         
         if filtro:
@@ -467,13 +1465,16 @@ def obter_estatisticas_cache():
     """
     try:
         total_produtos = ProdutoOracleCache.query.count()
-        ultima_sincronizacao = ProdutoOracleCache.query.order_by(
-            ProdutoOracleCache.data_sincronizacao.desc()
-        ).first()
+        controle = db.session.get(ControleSincronizacaoProdutos, 1)
+        if controle is not None:
+            ultima_sincronizacao = controle.ultima_sincronizacao
+        else:
+            # Bancos sincronizados antes da linha de controle
+            ultima_sincronizacao = db.session.query(func.max(ProdutoOracleCache.data_sincronizacao)).scalar()
         
         return {
             'total_produtos': total_produtos,
-            'ultima_sincronizacao': ultima_sincronizacao.data_sincronizacao if ultima_sincronizacao else None
+            'ultima_sincronizacao': ultima_sincronizacao
         }
     except Exception as e:
         print(f"❌ Erro ao obter estatísticas do cache: {str(e)}")
@@ -0,0 +1,28 @@
+// Acompanhamento das tarefas em segundo plano (importações e sincronizações)
+
+// Consulta o status da tarefa a cada segundo até ela terminar; aoAtualizar recebe cada leitura
+function acompanharTarefa(tarefaId, aoAtualizar) {
+    return new Promise((resolve, reject) => {
+        function consultar() {
+            fetch(`/api/tarefas/${tarefaId}`)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    reject(new Error(data.message));
+                    return;
+                }
+                const tarefa = data.tarefa;
+                if (aoAtualizar) {
+                    aoAtualizar(tarefa);
+                }
+                if (tarefa.status === 'concluida' || tarefa.status === 'erro') {
+                    resolve(tarefa);
+                } else {
+                    setTimeout(consultar, 1000);
+                }
+            })
+            .catch(reject);
+        }
+        consultar();
+    });
+}
@@ -0,0 +1,186 @@
+import contextvars
+import functools
+import heapq
+import re
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .metrics import definir_metrica, observar, registrar_evento
+
+# Rastreamento das consultas SQL: conta e mede os statements executados em um bloco
+# (requisição, chamada de serviço ou teste). Os eventos ficam registrados em Engine,
+# valendo para todos os binds; sem rastreio ativo o custo é só a leitura do contextvar.
+
+METRICA_CONSULTAS_REQUISICAO = 'comissoes_requisicao_consultas_sql'
+definir_metrica(
+    METRICA_CONSULTAS_REQUISICAO, 'Consultas SQL executadas por requisição (com SQL_TRACE_ENABLED)',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+
+# Tamanho máximo do texto guardado de cada statement
+TAMANHO_MAXIMO_STATEMENT = 500
+
+# Rastreios ativos no contexto atual (aninhados: requisição > serviço > ...)
+_rastreios_ativos = contextvars.ContextVar('rastreios_sql', default=())
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """O bloco executou mais consultas SQL do que o orçamento declarado"""
+
+
+class RastreioConsultas:
+    """Contagem, tempo total e statements mais lentos de um bloco"""
+
+    def __init__(self, nome, max_lentas=5):
+        self.nome = nome
+        self.max_lentas = max_lentas
+        self.total = 0
+        self.tempo_total = 0.0
+        self.statements = []
+        self._lentas = []  # heap (duração, ordem, statement) com as max_lentas maiores
+        self._lock = threading.Lock()
+
+    def registrar(self, statement, duracao):
+        with self._lock:
+            self.total += 1
+            self.tempo_total += duracao
+            self.statements.append(statement)
+            item = (duracao, self.total, statement)
+            if len(self._lentas) < self.max_lentas:
+                heapq.heappush(self._lentas, item)
+            elif duracao > self._lentas[0][0]:
+                heapq.heapreplace(self._lentas, item)
+
+    @property
+    def mais_lentas(self):
+        """[(duração em segundos, statement)] da mais lenta para a mais rápida"""
+        with self._lock:
+            return [(duracao, statement) for duracao, _, statement in sorted(self._lentas, reverse=True)]
+
+    def resumo(self):
+        return {
+            'nome': self.nome,
+            'consultas': self.total,
+            'tempo_ms': round(self.tempo_total * 1000, 3),
+            'mais_lentas': [
+                {'duracao_ms': round(duracao * 1000, 3), 'sql': statement}
+                for duracao, statement in self.mais_lentas
+            ],
+        }
+
+
+def _normalizar_statement(statement):
+    texto = re.sub(r'\s+', ' ', statement).strip()
+    if len(texto) > TAMANHO_MAXIMO_STATEMENT:
+        texto = texto[:TAMANHO_MAXIMO_STATEMENT] + '...'
+    return texto
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    if _rastreios_ativos.get() and context is not None:
+        context._inicio_rastreio = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    rastreios = _rastreios_ativos.get()
+    if not rastreios:
+        return
+    inicio = getattr(context, '_inicio_rastreio', None)
+    if inicio is None:
+        return
+    duracao = time.perf_counter() - inicio
+    texto = _normalizar_statement(statement)
+    for rastreio in rastreios:
+        rastreio.registrar(texto, duracao)
+
+    if has_app_context():
+        limite_ms = current_app.config['SQL_TRACE_SLOW_MS']
+        if limite_ms and duracao * 1000 >= limite_ms:
+            registrar_evento('consulta_lenta', rastreio=rastreios[-1].nome,
+                             duracao_ms=round(duracao * 1000, 3), sql=texto)
+
+
+@contextmanager
+def rastrear_consultas(nome='bloco', max_lentas=None):
+    """Rastreia as consultas SQL executadas no bloco (inclusive em blocos aninhados)"""
+    if max_lentas is None:
+        max_lentas = current_app.config['SQL_TRACE_SLOWEST'] if has_app_context() else 5
+    rastreio = RastreioConsultas(nome, max_lentas)
+    token = _rastreios_ativos.set(_rastreios_ativos.get() + (rastreio,))
+    try:
+        yield rastreio
+    finally:
+        _rastreios_ativos.reset(token)
+
+
+@contextmanager
+def orcamento_consultas(maximo, nome='bloco'):
+    """
+    Para testes: falha (OrcamentoConsultasExcedido) se o bloco executar mais de
+    'maximo' consultas SQL, listando os statements executados.
+        with orcamento_consultas(7, 'process_commissions'):
+            process_commissions(1, 2025)
+    """
+    with rastrear_consultas(nome) as rastreio:
+        yield rastreio
+    if rastreio.total > maximo:
+        statements = '\n'.join(f"  {i}. {statement}" for i, statement in enumerate(rastreio.statements, 1))
+        raise OrcamentoConsultasExcedido(
+            f"{nome}: {rastreio.total} consultas SQL, orçamento de {maximo}\n{statements}"
+        )
+
+
+def _rastreamento_ativo():
+    return has_app_context() and current_app.config['SQL_TRACE_ENABLED']
+
+
+def rastreado(funcao):
+    """
+    Com SQL_TRACE_ENABLED, rastreia as consultas de cada chamada do serviço e
+    registra o resumo no log estruturado (evento 'consultas_sql')
+    """
+    @functools.wraps(funcao)
+    def wrapper(*args, **kwargs):
+        if not _rastreamento_ativo():
+            return funcao(*args, **kwargs)
+        with rastrear_consultas(funcao.__name__) as rastreio:
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar_evento('consultas_sql', escopo='servico', **rastreio.resumo())
+    return wrapper
+
+
+def _antes_da_requisicao():
+    if current_app.config['SQL_TRACE_ENABLED']:
+        g._rastreio_sql = RastreioConsultas(request.path, current_app.config['SQL_TRACE_SLOWEST'])
+        _rastreios_ativos.set((g._rastreio_sql,))
+
+
+def _depois_da_requisicao(response):
+    rastreio = g.get('_rastreio_sql')
+    if rastreio is not None:
+        rota = request.url_rule.rule if request.url_rule is not None else 'sem_rota'
+        observar(METRICA_CONSULTAS_REQUISICAO, rastreio.total, metodo=request.method, rota=rota)
+        registrar_evento('consultas_sql', escopo='requisicao', rota=rota, **rastreio.resumo())
+    return response
+
+
+def _fim_da_requisicao(exc):
+    if g.pop('_rastreio_sql', None) is not None:
+        _rastreios_ativos.set(())
+
+
+def configurar_rastreamento(app):
+    """Registra o rastreio das consultas por requisição (ativo com SQL_TRACE_ENABLED)"""
+    if 'rastreamento_sql' in app.extensions:
+        return
+    app.extensions['rastreamento_sql'] = True
+    app.before_request(_antes_da_requisicao)
+    app.after_request(_depois_da_requisicao)
+    app.teardown_request(_fim_da_requisicao)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Benchmark de desempenho da importação e dos relatórios com dados sintéticos.
+Gera vendas, regras e ajustes na escala informada em um banco SQLite temporário,
+mede os cenários principais e grava os tempos em JSON para comparar execuções.
+
+Uso: python benchmark_desempenho.py [--vendedores 500] [--produtos 20000] [--linhas 1000000]
+                                    [--meses 1] [--repeticoes 3] [--saida resultados.json]
+                                    [--comparar resultados_anteriores.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from config import Config
+
+ANO = 2025
+
+# Termos da busca de produtos: prefixos de código, trechos de nome e acentuação diferente
+TERMOS_BUSCA = ['1', '12', '123', '4567', 'sint', 'sintetico 1', 'SINTÉTICO 99', 'embalagem 5kg', 'caixa', 'zzz']
+
+
+class ConfigBenchmark(Config):
+    SQLALCHEMY_BINDS = {'tarefas': 'sqlite://'}
+    PDF_CACHE_ENABLED = False
+    PRODUCT_INDEX_TTL = 0
+
+
+@contextlib.contextmanager
+def silencioso(ativo=True):
+    """Descarta as mensagens impressas pelos serviços (ex.: um print por vendedor)"""
+    if not ativo:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def gerar_vendas_sinteticas(total_vendedores, total_produtos, total_linhas, mes, semente=0):
+    """DataFrame no formato de fetch_sales_data_from_oracle, com valores aleatórios reprodutíveis"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(semente + mes)
+    vendedores = rng.integers(1, total_vendedores + 1, total_linhas)
+    produtos = rng.integers(1, total_produtos + 1, total_linhas)
+    dias = rng.integers(0, 28, total_linhas)
+
+    nomes_vendedores = np.array([f"VENDEDOR SINTÉTICO {rca:04d}" for rca in range(total_vendedores + 1)], dtype=object)
+    codigos_produtos = np.array([str(codigo) for codigo in range(total_produtos + 1)], dtype=object)
+    nomes_produtos = np.array(
+        [f"PRODUTO SINTÉTICO {codigo} {('CAIXA', 'FARDO', 'UNIDADE')[codigo % 3]} EMBALAGEM {codigo % 50}KG"
+         for codigo in range(total_produtos + 1)],
+        dtype=object
+    )
+
+    return pd.DataFrame({
+        'sellerCode': vendedores.astype('int64'),
+        'sellerName': nomes_vendedores[vendedores],
+        'productCode': codigos_produtos[produtos],
+        'productDesc': nomes_produtos[produtos],
+        'revenue': rng.gamma(2.0, 150.0, total_linhas).round(2),
+        'valorRetMerc': np.zeros(total_linhas),
+        'valorTituloAberto': np.zeros(total_linhas),
+        'valorAcrescTituloPagoMesAnt': np.zeros(total_linhas),
+        'dataVenda': pd.Timestamp(ANO, mes, 1) + pd.to_timedelta(dias, unit='D'),
+    })
+
+
+def popular_regras_e_ajustes(total_vendedores, total_produtos, meses, semente=0):
+    """
+    Regras de comissão, produtos especiais, catálogo de produtos e ajustes mensais,
+    gravados com INSERTs em lote. Proporções próximas às de produção: ~1% de produtos
+    especiais, ~1% de regras por produto, 5 regras por vendedor, ajustes para 30% dos vendedores.
+    """
+    import numpy as np
+    from sqlalchemy import insert
+    from app import db
+    from app.models import (
+        ComissaoPadrao, RegraComissao, ProdutoEspecial, ProdutoOracleCache,
+        AjusteFinanceiro, AjusteFaturamento
+    )
+
+    rng = np.random.default_rng(semente)
+    vendedores = range(1, total_vendedores + 1)
+    produtos = np.arange(1, total_produtos + 1)
+
+    db.session.execute(insert(ComissaoPadrao.__table__), [
+        {'vendedor_rca': rca, 'taxa_comissao': 0.01} for rca in vendedores
+    ])
+
+    especiais = rng.choice(produtos, max(1, total_produtos // 100), replace=False)
+    db.session.execute(insert(ProdutoEspecial.__table__), [
+        {'codigo_produto': str(codigo), 'nome_produto': f"PRODUTO SINTÉTICO {codigo}", 'taxa_comissao': 0.02}
+        for codigo in especiais.tolist()
+    ])
+
+    regras = [
+        {'vendedor_rca': None, 'codigo_produto': str(codigo), 'taxa_comissao': 0.03}
+        for codigo in rng.choice(produtos, max(1, total_produtos // 100), replace=False).tolist()
+    ]
+    for rca in vendedores:
+        regras.extend(
+            {'vendedor_rca': rca, 'codigo_produto': str(codigo), 'taxa_comissao': 0.04}
+            for codigo in rng.choice(produtos, min(5, total_produtos), replace=False).tolist()
+        )
+    db.session.execute(insert(RegraComissao.__table__), regras)
+
+    db.session.execute(insert(ProdutoOracleCache.__table__), [
+        {'codigo_produto': str(codigo),
+         'nome_produto': f"PRODUTO SINTÉTICO {codigo} {('CAIXA', 'FARDO', 'UNIDADE')[codigo % 3]} EMBALAGEM {codigo % 50}KG"}
+        for codigo in produtos.tolist()
+    ])
+
+    for mes in meses:
+        com_ajuste = rng.choice(np.arange(1, total_vendedores + 1), max(1, total_vendedores * 3 // 10), replace=False).tolist()
+        db.session.execute(insert(AjusteFinanceiro.__table__), [
+            {'vendedor_rca': rca, 'mes': mes, 'ano': ANO, 'valor_ret_merc': 10.0,
+             'valor_titulo_aberto': 5.0, 'valor_acresc_titulo_pago_mes_ant': 2.5}
+            for rca in com_ajuste
+        ])
+        db.session.execute(insert(AjusteFaturamento.__table__), [
+            {'vendedor_rca': rca, 'mes': mes, 'ano': ANO, 'valor_ajuste': 1000.0,
+             'taxa_comissao_ajuste': 0.01, 'motivo': 'Ajuste sintético'}
+            for rca in com_ajuste
+        ])
+
+    db.session.commit()
+
+
+def medir(resultados, nome, funcao, repeticoes, preparar=None, **info):
+    """Executa a função 'repeticoes' vezes e registra mediana, mínimo e máximo (segundos)"""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    resultados[nome] = {
+        'mediana_s': statistics.median(tempos),
+        'min_s': min(tempos),
+        'max_s': max(tempos),
+        'repeticoes': repeticoes,
+        **info,
+    }
+    print(f"  {nome:<42} {statistics.median(tempos):9.4f}s  (mín {min(tempos):.4f}s, máx {max(tempos):.4f}s)")
+
+
+def executar_cenarios(app, args, meses, vendas_por_mes):
+    """Roda os cenários e retorna {nome: medições}"""
+    from app import db
+    from app.cache import obter_cache_relatorios
+    from app.search import reconstruir_indice_fts_produtos, reconstruir_indice_autocompletar
+    from app.services import (
+        save_sales_data_to_cache, get_sales_data_from_cache, process_commissions,
+        process_commissions_periodo, buscar_produtos_cache
+    )
+    from app.pdf import gerar_pdf_comissoes
+
+    resultados = {}
+    silenciar = not args.verbose
+    mes = meses[0]
+    linhas = len(vendas_por_mes[mes])
+
+    print("💾 Importação")
+    for mes_importado in meses[1:]:
+        with silencioso(silenciar):
+            save_sales_data_to_cache(vendas_por_mes[mes_importado], mes_importado, ANO)
+
+    def salvar():
+        with silencioso(silenciar):
+            assert save_sales_data_to_cache(vendas_por_mes[mes], mes, ANO)
+    medir(resultados, 'save_sales_data_to_cache', salvar, args.repeticoes, linhas=linhas)
+
+    print("📊 Relatórios")
+    medir(resultados, 'get_sales_data_from_cache', lambda: get_sales_data_from_cache(mes, ANO),
+          args.repeticoes, linhas=linhas)
+
+    def processar():
+        relatorio, _ = process_commissions(mes, ANO)
+        assert relatorio
+    medir(resultados, 'process_commissions', processar, args.repeticoes, linhas=linhas)
+
+    if len(meses) > 1:
+        medir(resultados, 'process_commissions_periodo',
+              lambda: process_commissions_periodo(meses[0], ANO, meses[-1], ANO),
+              args.repeticoes, linhas=linhas * len(meses), meses=len(meses))
+
+    relatorio, _ = process_commissions(mes, ANO)
+    medir(resultados, 'gerar_pdf_comissoes', lambda: gerar_pdf_comissoes(relatorio, f"{mes}/{ANO}"),
+          args.repeticoes, vendedores=len(relatorio))
+
+    # Rota completa (leitura + cálculo + layout), sem cache de relatórios nem de PDFs
+    cliente = app.test_client()
+
+    def baixar_pdf():
+        resposta = cliente.get(f'/relatorio/pdf?mes={mes}&ano={ANO}')
+        assert resposta.status_code == 200
+    medir(resultados, 'gerar_pdf_relatorio (rota)', baixar_pdf, args.repeticoes,
+          preparar=obter_cache_relatorios().clear, vendedores=len(relatorio))
+
+    print("🔍 Busca de produtos")
+    with silencioso(silenciar):
+        reconstruir_indice_fts_produtos()
+        db.session.commit()
+        reconstruir_indice_autocompletar()
+
+    variantes = {
+        'memoria': {'PRODUCT_AUTOCOMPLETE_INDEX': True, 'PRODUCT_SEARCH_FTS': True},
+        'fts': {'PRODUCT_AUTOCOMPLETE_INDEX': False, 'PRODUCT_SEARCH_FTS': True},
+        'like': {'PRODUCT_AUTOCOMPLETE_INDEX': False, 'PRODUCT_SEARCH_FTS': False},
+    }
+    configuracao_original = {chave: app.config[chave] for chave in variantes['memoria']}
+    for variante, configuracao in variantes.items():
+        app.config.update(configuracao)
+
+        def buscar():
+            for termo in TERMOS_BUSCA:
+                buscar_produtos_cache(termo)
+        medir(resultados, f'buscar_produtos_cache ({variante})', buscar, args.repeticoes,
+              consultas=len(TERMOS_BUSCA))
+    app.config.update(configuracao_original)
+
+    return resultados
+
+
+def comparar(resultados, caminho_anterior):
+    """Mostra a variação de cada cenário em relação a uma execução anterior"""
+    with open(caminho_anterior, encoding='utf-8') as arquivo:
+        anterior = json.load(arquivo)
+
+    if anterior.get('parametros') != resultados['parametros']:
+        print("⚠️ Parâmetros diferentes da execução anterior; a comparação é apenas indicativa")
+
+    print(f"📈 Comparação com {caminho_anterior}")
+    for nome, medicao in resultados['cenarios'].items():
+        base = anterior.get('cenarios', {}).get(nome)
+        if base is None:
+            print(f"  {nome:<42} (novo)")
+            continue
+        razao = medicao['mediana_s'] / base['mediana_s'] if base['mediana_s'] else float('inf')
+        print(f"  {nome:<42} {base['mediana_s']:9.4f}s -> {medicao['mediana_s']:9.4f}s  ({razao:5.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de importação e relatórios com dados sintéticos")
+    parser.add_argument('--vendedores', type=int, default=500)
+    parser.add_argument('--produtos', type=int, default=20000)
+    parser.add_argument('--linhas', type=int, default=1_000_000, help="linhas de vendas por mês")
+    parser.add_argument('--meses', type=int, default=1, help="meses gerados (a partir de janeiro)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--diretorio', help="onde criar o banco temporário (padrão: diretório temporário do sistema)")
+    parser.add_argument('--saida', default='resultados_benchmark.json')
+    parser.add_argument('--comparar', help="JSON de uma execução anterior")
+    parser.add_argument('--verbose', action='store_true', help="mostra as mensagens dos serviços")
+    args = parser.parse_args()
+
+    meses = list(range(1, min(args.meses, 12) + 1))
+    diretorio = tempfile.mkdtemp(prefix='benchmark_comissoes_', dir=args.diretorio)
+
+    class ConfigExecucao(ConfigBenchmark):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}"
+
+    from app import create_app, db
+
+    try:
+        app = create_app(ConfigExecucao)
+        with app.app_context():
+            db.create_all()
+
+            print(f"🧪 Gerando {args.linhas:,} linhas/mês x {len(meses)} mês(es), "
+                  f"{args.vendedores} vendedores, {args.produtos:,} produtos")
+            inicio = time.perf_counter()
+            vendas_por_mes = {
+                mes: gerar_vendas_sinteticas(args.vendedores, args.produtos, args.linhas, mes, args.semente)
+                for mes in meses
+            }
+            popular_regras_e_ajustes(args.vendedores, args.produtos, meses, args.semente)
+            print(f"  Dados gerados em {time.perf_counter() - inicio:.1f}s")
+
+            cenarios = executar_cenarios(app, args, meses, vendas_por_mes)
+            tamanho_banco = os.path.getsize(os.path.join(diretorio, 'benchmark.db'))
+            db.session.remove()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    resultados = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'nucleos': os.cpu_count(),
+        'parametros': {
+            'vendedores': args.vendedores,
+            'produtos': args.produtos,
+            'linhas_por_mes': args.linhas,
+            'meses': len(meses),
+            'semente': args.semente,
+        },
+        'tamanho_banco_bytes': tamanho_banco,
+        'cenarios': cenarios,
+    }
+
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+    print(f"✅ Resultados gravados em {args.saida} (banco com {tamanho_banco / 1024 / 1024:.1f} MB)")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
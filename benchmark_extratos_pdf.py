@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark da geração dos extratos em PDF por vendedor.
+Mede o tempo para gerar o ZIP com N vendedores sintéticos variando o número de processos.
+
+Uso: python benchmark_extratos_pdf.py [vendedores] [produtos_por_vendedor]
+"""
+
+import os
+import sys
+import time
+
+from app.pdf import gerar_zip_extratos
+
+
+def gerar_relatorio_sintetico(total_vendedores, produtos_por_vendedor):
+    """Monta dados no formato de process_commissions, sem banco"""
+    relatorio = {}
+    for rca in range(1, total_vendedores + 1):
+        produtos = [{
+            'codigo_produto': str(codigo),
+            'nome_produto': f"PRODUTO ESPECIAL {codigo}",
+            'taxa_comissao': 0.02,
+            'faturamento_total': 1000.0 + codigo,
+            'comissao_total': (1000.0 + codigo) * 0.02,
+        } for codigo in range(produtos_por_vendedor)]
+        faturamento = sum(p['faturamento_total'] for p in produtos) + 50000.0
+        relatorio[rca] = {
+            'name': f"VENDEDOR SINTÉTICO {rca}",
+            'faturamentoOracle': faturamento,
+            'ajusteFaturamento': {'valorAjuste': 500.0, 'taxaComissaoAjuste': 0.01},
+            'faturamentoFinal': faturamento + 500.0,
+            'comissaoBaseOracle': faturamento * 0.01,
+            'comissaoDoAjuste': 5.0,
+            'totalCommission': faturamento * 0.01 + 5.0,
+            'ajustesFinanceiros': {
+                'valorAcrescTituloPagoMesAnt': 10.0, 'valorRetMerc': 20.0, 'valorTituloAberto': 30.0
+            },
+            'comissaoFinal': faturamento * 0.01 - 35.0,
+            'details': {
+                'produtos_detalhados': produtos,
+                'outros_produtos': {'revenue': 50000.0, 'commission': 500.0},
+            },
+        }
+    return relatorio
+
+
+def medir(relatorio, workers):
+    inicio = time.perf_counter()
+    tamanho = sum(len(bloco) for bloco in gerar_zip_extratos(relatorio, "1/2025", "01_2025", workers))
+    return time.perf_counter() - inicio, tamanho
+
+
+def main():
+    total_vendedores = int(sys.argv[1]) if len(sys.argv) > 1 else 320
+    produtos_por_vendedor = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    nucleos = os.cpu_count() or 1
+
+    relatorio = gerar_relatorio_sintetico(total_vendedores, produtos_por_vendedor)
+    print(f"📊 {total_vendedores} vendedores, {produtos_por_vendedor} produtos especiais cada, {nucleos} núcleos")
+
+    niveis = sorted({1, 2, 4, 8, nucleos} & set(range(1, nucleos + 1)))
+    base = None
+    for workers in niveis:
+        if workers > 1:
+            medir(relatorio, workers)  # Aquece o pool (criação dos processos)
+        duracao, tamanho = medir(relatorio, workers)
+        base = base or duracao
+        print(f"  workers={workers:<3} {duracao:7.2f}s  {total_vendedores / duracao:7.1f} PDFs/s  "
+              f"speedup {base / duracao:4.2f}x  ZIP {tamanho / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark do tempo de inicialização da aplicação.
+Mede create_app() em processos novos (como no boot de um worker) e o custo dos
+módulos pesados que ficam fora da inicialização (pandas, ReportLab, oracledb).
+
+Uso: python benchmark_inicializacao.py [repeticoes]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+MODULOS_PESADOS = ('pandas', 'reportlab', 'oracledb')
+
+SCRIPT_INICIALIZACAO = """
+import json, sys, time
+inicio = time.perf_counter()
+from app import create_app
+create_app()
+print(json.dumps({
+    'segundos': time.perf_counter() - inicio,
+    'carregados': [m for m in %r if m in sys.modules],
+}))
+""" % (MODULOS_PESADOS,)
+
+SCRIPT_MODULO = """
+import json, time
+inicio = time.perf_counter()
+import %s
+print(json.dumps({'segundos': time.perf_counter() - inicio}))
+"""
+
+
+def executar(script):
+    saida = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    # A última linha é o JSON; as anteriores são mensagens da aplicação
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    medicoes = [executar(SCRIPT_INICIALIZACAO) for _ in range(repeticoes)]
+    tempos = [m['segundos'] for m in medicoes]
+    print(f"🚀 create_app(): mediana {statistics.median(tempos):.3f}s "
+          f"(mín {min(tempos):.3f}s, máx {max(tempos):.3f}s, {repeticoes} processos)")
+    carregados = medicoes[-1]['carregados']
+    print(f"  Módulos pesados carregados na inicialização: {', '.join(carregados) if carregados else 'nenhum'}")
+
+    print("⏱️ Custo de importação adiado para o primeiro uso:")
+    for modulo in ('pandas', 'reportlab.platypus', 'oracledb'):
+        tempos_modulo = [executar(SCRIPT_MODULO % modulo)['segundos'] for _ in range(repeticoes)]
+        print(f"  {modulo:<20} {statistics.median(tempos_modulo):.3f}s")
+
+
+if __name__ == '__main__':
+    main()
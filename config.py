@@ -8,7 +8,102 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///business_rules.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Perfil aplicado a cada conexão SQLite (ver app/database.py): WAL permite servir
+    # relatórios enquanto uma importação grava; synchronous=NORMAL é seguro com WAL
+    # (um commit pode se perder só em queda de energia, sem corromper o banco)
+    SQLITE_PRAGMAS_ENABLED = os.environ.get('SQLITE_PRAGMAS_ENABLED', '1') == '1'
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_TEMP_STORE = os.environ.get('SQLITE_TEMP_STORE', 'MEMORY')
+    SQLITE_JOURNAL_SIZE_LIMIT = int(os.environ.get('SQLITE_JOURNAL_SIZE_LIMIT', 64 * 1024 * 1024))
+
+    # Banco separado para o estado das tarefas em segundo plano (ver app/jobs.py)
+    SQLALCHEMY_BINDS = {
+        'tarefas': os.environ.get('JOBS_DATABASE_URL', 'sqlite:///tarefas.db'),
+    }
+
+    # Tarefas em segundo plano: threads por processo, intervalo do sinal de vida e
+    # tempo sem sinal após o qual uma tarefa ativa é considerada abandonada (segundos)
+    JOBS_MAX_WORKERS = int(os.environ.get('JOBS_MAX_WORKERS', 2))
+    JOBS_HEARTBEAT_SECONDS = int(os.environ.get('JOBS_HEARTBEAT_SECONDS', 30))
+    JOBS_STALE_SECONDS = int(os.environ.get('JOBS_STALE_SECONDS', 600))
+
     # Configurações do Oracle
     ORACLE_USER = os.environ.get('ORACLE_USER', 'dicon')
     ORACLE_PASSWORD = os.environ.get('ORACLE_PASSWORD', 'wdicon01')
     ORACLE_DSN = os.environ.get('ORACLE_DSN', '10.0.0.10:1521/WINT')
+
+    # Modo do cliente Oracle: 'thin' (sem Instant Client), 'thick' (Instant Client em
+    # ORACLE_CLIENT_LIB_DIR) ou 'auto' (thick se o diretório existir). Definido no primeiro uso
+    ORACLE_CLIENT_MODE = os.environ.get('ORACLE_CLIENT_MODE', 'auto')
+    ORACLE_CLIENT_LIB_DIR = os.environ.get('ORACLE_CLIENT_LIB_DIR', r"C:\oracle\instantclient_23_9")
+
+    # Modo de importação: 'agregado' (somas por vendedor/produto) ou 'detalhado' (linhas de nota)
+    ORACLE_IMPORT_MODE = os.environ.get('ORACLE_IMPORT_MODE', 'agregado')
+
+    # Pool de sessões Oracle compartilhado pelo processo
+    ORACLE_POOL_MIN = int(os.environ.get('ORACLE_POOL_MIN', 1))
+    ORACLE_POOL_MAX = int(os.environ.get('ORACLE_POOL_MAX', 4))
+    ORACLE_POOL_INCREMENT = int(os.environ.get('ORACLE_POOL_INCREMENT', 1))
+    ORACLE_POOL_WAIT_TIMEOUT = int(os.environ.get('ORACLE_POOL_WAIT_TIMEOUT', 10000))  # ms
+    ORACLE_POOL_PING_INTERVAL = int(os.environ.get('ORACLE_POOL_PING_INTERVAL', 0))  # s (0 = ping em toda aquisição)
+    ORACLE_POOL_IDLE_TIMEOUT = int(os.environ.get('ORACLE_POOL_IDLE_TIMEOUT', 300))  # s
+
+    # Importação de intervalos de meses: consultas simultâneas ao Oracle (limitadas
+    # também por ORACLE_POOL_MAX) e tamanho máximo do intervalo
+    IMPORT_RANGE_WORKERS = int(os.environ.get('IMPORT_RANGE_WORKERS', 4))
+    IMPORT_RANGE_MAX_MONTHS = int(os.environ.get('IMPORT_RANGE_MAX_MONTHS', 24))
+
+    # Importação incremental: horas até exigir uma reconciliação completa do período
+    IMPORT_RECONCILIACAO_HORAS = int(os.environ.get('IMPORT_RECONCILIACAO_HORAS', 24))
+
+    # Busca em blocos do Oracle: linhas por fetchmany (arraysize/prefetchrows) e
+    # se a importação grava bloco a bloco em vez de carregar o mês inteiro
+    ORACLE_FETCH_CHUNK_SIZE = int(os.environ.get('ORACLE_FETCH_CHUNK_SIZE', 20000))
+    ORACLE_FETCH_STREAMING = os.environ.get('ORACLE_FETCH_STREAMING', '1') == '1'
+
+    # Tamanho do cache de statements por conexão Oracle
+    ORACLE_STMT_CACHE_SIZE = int(os.environ.get('ORACLE_STMT_CACHE_SIZE', 40))
+    # Hint opcional para a query de faturamento (ex.: "INDEX(DADOS_FATURAMENTO IDX_DATA_VENDA)")
+    ORACLE_FATURAMENTO_HINT = os.environ.get('ORACLE_FATURAMENTO_HINT')
+
+    # Quantidade máxima de relatórios (período + versão dos dados) mantidos em memória
+    REPORT_CACHE_MAX_ENTRIES = int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', 24))
+
+    # Busca de produtos pelo índice SQLite FTS5 (trigram) para termos de 3+ caracteres;
+    # com 0 usa o índice em memória ou o LIKE
+    PRODUCT_SEARCH_FTS = os.environ.get('PRODUCT_SEARCH_FTS', '1') == '1'
+
+    # Índice de autocompletar em memória (códigos ordenados + trigramas dos nomes), usado
+    # sem termo, com termo curto ou sem FTS. É reconstruído após cada sincronização; o TTL (segundos) faz outros processos
+    # recarregarem o catálogo sincronizado por um worker diferente
+    PRODUCT_AUTOCOMPLETE_INDEX = os.environ.get('PRODUCT_AUTOCOMPLETE_INDEX', '1') == '1'
+    PRODUCT_INDEX_TTL = int(os.environ.get('PRODUCT_INDEX_TTL', 300))
+
+    # Cache em disco dos PDFs gerados (chave: período, banco, versão e hash do relatório), com limite de tamanho
+    PDF_CACHE_ENABLED = os.environ.get('PDF_CACHE_ENABLED', '1') == '1'
+    PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', os.path.join(os.path.abspath(os.path.dirname(__file__)), 'pdf_cache'))
+    PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+
+    # Processos usados para gerar os extratos por vendedor (0 = número de núcleos; 1 = sem pool)
+    PDF_EXPORT_WORKERS = int(os.environ.get('PDF_EXPORT_WORKERS', 0))
+
+    # Métricas de desempenho (duração das fases e latência das rotas) em /metrics, no
+    # formato do Prometheus, e log estruturado (JSON) no logger 'comissoes.metricas':
+    # uma linha por requisição em INFO e uma por fase em DEBUG
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_STRUCTURED_LOG = os.environ.get('METRICS_STRUCTURED_LOG', '1') == '1'
+    METRICS_LOG_LEVEL = os.environ.get('METRICS_LOG_LEVEL', 'INFO')
+
+    # Rastreamento das consultas SQL (quantidade, tempo e statements mais lentos) por
+    # requisição e por chamada dos serviços principais, no log estruturado. Consultas
+    # acima de SQL_TRACE_SLOW_MS (0 = desativado) geram o evento 'consulta_lenta'
+    SQL_TRACE_ENABLED = os.environ.get('SQL_TRACE_ENABLED', '0') == '1'
+    SQL_TRACE_SLOWEST = int(os.environ.get('SQL_TRACE_SLOWEST', 5))
+    SQL_TRACE_SLOW_MS = float(os.environ.get('SQL_TRACE_SLOW_MS', 0))
+
+    # Tamanho dos lotes de INSERT ao gravar dados de vendas no cache local
+    CACHE_INSERT_BATCH_SIZE = int(os.environ.get('CACHE_INSERT_BATCH_SIZE', 5000))
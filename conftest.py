@@ -0,0 +1,119 @@
+"""
+Fixtures compartilhadas dos testes: aplicação isolada com banco SQLite em memória e
+uma conexão Oracle simulada. Os scripts de teste também usam criar_app_teste,
+app_teste e oracle_falso quando executados diretamente (python test_xxx.py).
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask
+
+from config import Config
+from app import db
+
+
+class ConfigTeste(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_BINDS = {'tarefas': 'sqlite://'}
+    METRICS_STRUCTURED_LOG = False
+
+
+def criar_app_teste(**config):
+    """Cria uma aplicação isolada com banco em memória; config sobrescreve ConfigTeste"""
+    app = Flask(__name__)
+    app.config.from_object(ConfigTeste)
+    app.config.update(config)
+    db.init_app(app)
+    return app
+
+
+@contextmanager
+def app_teste(**config):
+    """Aplicação com o contexto ativo e as tabelas criadas, removidas ao sair"""
+    app = criar_app_teste(**config)
+    with app.app_context():
+        db.create_all()
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+@pytest.fixture
+def app():
+    with app_teste() as app:
+        yield app
+
+
+class CursorOracleFalso:
+    """
+    Cursor do oracledb simulado: responder(sql, binds) devolve (colunas, linhas) a cada
+    execute. Registra as execuções e a quantidade de linhas de cada fetchmany.
+    """
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.description = None
+        self.execucoes = []
+        self.blocos = []
+        self._linhas = []
+
+    def execute(self, sql, parametros=None, **binds):
+        binds = dict(parametros or {}, **binds)
+        self.execucoes.append((sql, binds))
+        colunas, linhas = self.responder(sql, binds)
+        self.description = [(coluna,) for coluna in colunas]
+        self._linhas = list(linhas)
+
+    def fetchmany(self, quantidade=None):
+        quantidade = quantidade or self.arraysize
+        bloco, self._linhas = self._linhas[:quantidade], self._linhas[quantidade:]
+        self.blocos.append(len(bloco))
+        return bloco
+
+    def fetchall(self):
+        return self.fetchmany(len(self._linhas))
+
+    def close(self):
+        pass
+
+
+class ConexaoOracleFalsa:
+    """Conexão simulada: cada cursor() responde com o mesmo responder"""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.cursores = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def cursor(self):
+        cursor = CursorOracleFalso(self.responder)
+        self.cursores.append(cursor)
+        return cursor
+
+    @property
+    def execucoes(self):
+        return [execucao for cursor in self.cursores for execucao in cursor.execucoes]
+
+
+@contextmanager
+def oracle_falso(responder):
+    """Substitui a conexão do pool Oracle usada pelos serviços pela conexão simulada"""
+    from app import services
+
+    conexao = ConexaoOracleFalsa(responder)
+    original = services.acquire_oracle_connection
+    services.acquire_oracle_connection = lambda: conexao
+    try:
+        yield conexao
+    finally:
+        services.acquire_oracle_connection = original
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a busca de produtos no cache local.
+Verifica o índice FTS5 (sem acentos, por relevância), o índice em memória e o
+fallback com LIKE.
+"""
+
+from sqlalchemy import event
+
+from conftest import app_teste
+from app import db
+from app.models import ProdutoOracleCache
+
+
+def popular_produtos():
+    db.session.add(ProdutoOracleCache(codigo_produto='101', nome_produto='PÃO DE AÇÚCAR'))
+    db.session.add(ProdutoOracleCache(codigo_produto='202', nome_produto='AÇÚCAR REFINADO'))
+    db.session.add(ProdutoOracleCache(codigo_produto='303', nome_produto='CAFÉ TORRADO'))
+    db.session.commit()
+
+
+def test_busca_fts_e_fallback():
+    """Após indexar, a busca ignora acentos; sem índice ou com termo curto usa LIKE"""
+    from app.search import reconstruir_indice_fts_produtos
+    from app.services import buscar_produtos_cache
+
+    with app_teste(PRODUCT_AUTOCOMPLETE_INDEX=False):
+        popular_produtos()
+
+        # Sem índice: LIKE exige o acento
+        assert buscar_produtos_cache('acucar') == []
+        assert len(buscar_produtos_cache('AÇÚCAR')) == 2
+
+        assert reconstruir_indice_fts_produtos()
+        db.session.commit()
+
+        codigos = [p['codigo'] for p in buscar_produtos_cache('acucar')]
+        assert sorted(codigos) == ['101', '202']
+        assert [p['codigo'] for p in buscar_produtos_cache('Cafe')] == ['303']
+        assert [p['codigo'] for p in buscar_produtos_cache('303')] == ['303']
+
+        # Aspas no termo não quebram a sintaxe do MATCH
+        assert buscar_produtos_cache('"pão') == []
+
+        # Termo com menos de 3 caracteres cai no LIKE
+        assert [p['codigo'] for p in buscar_produtos_cache('30')] == ['303']
+
+
+def test_indice_autocompletar_em_memoria():
+    """Sem FTS, o snapshot responde sem consultar o banco e só muda quando é reconstruído"""
+    from app import search
+    from app.search import reconstruir_indice_autocompletar
+    from app.services import buscar_produtos_cache
+
+    with app_teste(PRODUCT_SEARCH_FTS=False, PRODUCT_AUTOCOMPLETE_INDEX=True):
+        popular_produtos()
+        # Descarta o snapshot de outros testes (o índice é global do processo)
+        search._indice_autocompletar = None
+
+        # Primeira busca monta o snapshot
+        assert len(buscar_produtos_cache('')) == 3
+
+        consultas = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: consultas.append(args[2]))
+
+        assert [p['codigo'] for p in buscar_produtos_cache('acucar')] == ['202', '101']
+        # Prefixo de código vem antes dos trechos encontrados no nome
+        assert [p['codigo'] for p in buscar_produtos_cache('30')] == ['303']
+        assert [p['codigo'] for p in buscar_produtos_cache('a', limite=2)] == ['202', '303']
+        assert buscar_produtos_cache('xyz') == []
+        assert consultas == []
+
+        # Produto novo só aparece após a reconstrução (feita pela sincronização)
+        db.session.add(ProdutoOracleCache(codigo_produto='404', nome_produto='AÇÚCAR MASCAVO'))
+        db.session.commit()
+        assert len(buscar_produtos_cache('acucar')) == 2
+        reconstruir_indice_autocompletar()
+        assert [p['codigo'] for p in buscar_produtos_cache('acucar')] == ['404', '202', '101']
+
+        search._indice_autocompletar = None
+
+
+def test_configuracao_padrao_usa_fts():
+    """Com a configuração padrão, termos de 3+ caracteres vão ao FTS; termos curtos ao snapshot"""
+    from app import search
+    from app.search import reconstruir_indice_fts_produtos
+    from app.services import buscar_produtos_cache
+
+    with app_teste():
+        popular_produtos()
+        db.session.add(ProdutoOracleCache(codigo_produto='404', nome_produto='DOCE DE LEITE'))
+        db.session.add(ProdutoOracleCache(codigo_produto='DOC1', nome_produto='CAIXA PADRÃO'))
+        db.session.commit()
+        # Como na sincronização: o índice FTS é montado e o snapshot descartado
+        assert reconstruir_indice_fts_produtos()
+        db.session.commit()
+        search._indice_autocompletar = None
+
+        consultas = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: consultas.append(args[2]))
+
+        assert sorted(p['codigo'] for p in buscar_produtos_cache('AÇUCAR')) == ['101', '202']
+        assert [p['codigo'] for p in buscar_produtos_cache('padrao')] == ['DOC1']
+        # Relevância (bm25): coincidência no código vem antes da coincidência no nome
+        assert [p['codigo'] for p in buscar_produtos_cache('doc')] == ['DOC1', '404']
+        assert sum('MATCH' in sql for sql in consultas) == 3
+
+        consultas.clear()
+        assert [p['codigo'] for p in buscar_produtos_cache('30')] == ['303']
+        assert not any('MATCH' in sql for sql in consultas)
+
+        search._indice_autocompletar = None
+
+
+if __name__ == '__main__':
+    test_busca_fts_e_fallback()
+    print("✅ Busca de produtos com FTS5 e fallback LIKE funcionando")
+    test_indice_autocompletar_em_memoria()
+    print("✅ Índice de autocompletar em memória funcionando")
+    test_configuracao_padrao_usa_fts()
+    print("✅ Configuração padrão busca pelo FTS, com relevância e sem acentos")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o cache em disco dos PDFs de comissão.
+Verifica reaproveitamento, invalidação pela versão e pelo conteúdo dos dados, a
+separação por banco e o limite de tamanho.
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import text
+
+from conftest import app_teste
+from app import db
+from app.models import Vendedor, DadosVendas, DimensaoVendedor, DimensaoProduto, AjusteFinanceiro
+
+
+def popular_vendas():
+    db.session.add(Vendedor(rca=1, nome="VENDEDOR 1"))
+    vendedor = DimensaoVendedor(codigo=1, nome="VENDEDOR 1")
+    produto = DimensaoProduto(codigo='10', descricao='PRODUTO 10')
+    for mes in (1, 2, 3):
+        db.session.add(DadosVendas(mes=mes, ano=2025, vendedor=vendedor, produto=produto, revenue=1000.0))
+    db.session.commit()
+
+
+def test_pdf_reaproveitado_e_invalidado():
+    """Downloads repetidos usam o mesmo arquivo; alterações geram um novo e removem o antigo"""
+    from app.pdf import obter_pdf_relatorio
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        with app_teste(PDF_CACHE_ENABLED=True, PDF_CACHE_DIR=diretorio):
+            popular_vendas()
+
+            caminho, _ = obter_pdf_relatorio(1, 2025)
+            assert caminho and os.path.exists(caminho)
+            with open(caminho, 'rb') as arquivo:
+                assert arquivo.read(4) == b'%PDF'
+            assert obter_pdf_relatorio(1, 2025) == (caminho, None)
+
+            db.session.add(AjusteFinanceiro(vendedor_rca=1, mes=1, ano=2025, valor_ret_merc=5.0))
+            db.session.commit()
+            novo_caminho, _ = obter_pdf_relatorio(1, 2025)
+            assert novo_caminho != caminho
+            assert not os.path.exists(caminho)
+
+            # Período sem dados não gera arquivo
+            assert obter_pdf_relatorio(12, 2030) == (None, None)
+            assert os.listdir(diretorio) == [os.path.basename(novo_caminho)]
+
+
+def test_limite_de_tamanho():
+    """Acima de PDF_CACHE_MAX_BYTES os PDFs menos usados são descartados"""
+    from app.pdf import obter_pdf_relatorio
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        with app_teste(PDF_CACHE_ENABLED=True, PDF_CACHE_DIR=diretorio, PDF_CACHE_MAX_BYTES=1):
+            popular_vendas()
+
+            for mes in (1, 2, 3):
+                caminho, _ = obter_pdf_relatorio(mes, 2025)
+            # Só o arquivo recém-gerado é mantido
+            assert os.listdir(diretorio) == [os.path.basename(caminho)]
+
+
+def test_pdf_periodo_por_titulo():
+    """O mesmo intervalo com títulos diferentes (trimestre x acumulado) gera PDFs diferentes"""
+    from app.pdf import obter_pdf_relatorio_periodo
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        with app_teste(PDF_CACHE_ENABLED=True, PDF_CACHE_DIR=diretorio):
+            popular_vendas()
+
+            trimestre, _ = obter_pdf_relatorio_periodo(1, 2025, 3, 2025, "1º Trimestre/2025")
+            acumulado, _ = obter_pdf_relatorio_periodo(1, 2025, 3, 2025, "Acumulado 2025 (até 03/2025)")
+            assert trimestre != acumulado
+            assert sorted(os.listdir(diretorio)) == sorted(os.path.basename(c) for c in (trimestre, acumulado))
+            assert obter_pdf_relatorio_periodo(1, 2025, 3, 2025, "1º Trimestre/2025") == (trimestre, None)
+
+
+def test_pdf_por_banco_e_conteudo():
+    """Bancos com o mesmo período e versão não compartilham o PDF; dados diferentes geram outro arquivo"""
+    from app.cache import obter_cache_relatorios
+    from app.pdf import obter_pdf_relatorio
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        pdfs = []
+        for banco in ('a.db', 'b.db'):
+            uri = f"sqlite:///{os.path.join(diretorio, banco)}"
+            with app_teste(SQLALCHEMY_DATABASE_URI=uri, PDF_CACHE_ENABLED=True, PDF_CACHE_DIR=diretorio):
+                popular_vendas()
+                caminho, _ = obter_pdf_relatorio(1, 2025)
+                pdfs.append(caminho)
+
+                if banco == 'b.db':
+                    # Alteração que não passa pela sessão (não muda a versão), vista por
+                    # um processo sem o relatório em memória
+                    db.session.execute(text("UPDATE dados_vendas SET revenue = 2000"))
+                    db.session.commit()
+                    obter_cache_relatorios().clear()
+                    pdfs.append(obter_pdf_relatorio(1, 2025)[0])
+
+        assert len(set(pdfs)) == 3
+        assert os.path.exists(pdfs[0]) and os.path.exists(pdfs[2])
+        # O PDF antigo do banco B foi substituído; o do banco A continua no cache
+        assert not os.path.exists(pdfs[1])
+
+
+if __name__ == '__main__':
+    test_pdf_reaproveitado_e_invalidado()
+    print("✅ PDFs reaproveitados e invalidados pela versão dos dados")
+    test_limite_de_tamanho()
+    print("✅ Cache de PDFs respeita o limite de tamanho")
+    test_pdf_periodo_por_titulo()
+    print("✅ PDFs de período separados pelo título")
+    test_pdf_por_banco_e_conteudo()
+    print("✅ PDFs separados por banco e pelo conteúdo do relatório")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o cache versionado de relatórios de comissão.
+Verifica que a versão dos dados muda a cada alteração e que o cache é invalidado.
+"""
+
+import os
+import tempfile
+
+from conftest import app_teste
+from app import db
+from app.models import Vendedor, DadosVendas, DimensaoVendedor, DimensaoProduto, AjusteFinanceiro, ProdutoOracleCache
+
+
+def popular_vendas():
+    db.session.add(Vendedor(rca=1, nome="VENDEDOR 1"))
+    db.session.add(DadosVendas(
+        mes=1, ano=2025, revenue=1000.0,
+        vendedor=DimensaoVendedor(codigo=1, nome="VENDEDOR 1"),
+        produto=DimensaoProduto(codigo='10', descricao='PRODUTO 10')
+    ))
+    db.session.commit()
+
+
+def test_versao_muda_com_alteracoes():
+    """Gravações ORM e em lote nas tabelas do relatório incrementam a versão"""
+    from app.cache import obter_versao_dados
+    from app.services import save_sales_data_to_cache, get_sales_data_from_cache
+
+    with app_teste(REPORT_CACHE_MAX_ENTRIES=2):
+        versao_inicial = obter_versao_dados()
+
+        popular_vendas()
+        versao_apos_insercao = obter_versao_dados()
+        assert versao_apos_insercao > versao_inicial
+
+        # Alteração em tabela fora do relatório não muda a versão
+        db.session.add(ProdutoOracleCache(codigo_produto='10', nome_produto='PRODUTO 10'))
+        db.session.commit()
+        assert obter_versao_dados() == versao_apos_insercao
+
+        # Gravação em lote (Core insert + Query.delete)
+        df = get_sales_data_from_cache(1, 2025)
+        assert save_sales_data_to_cache(df, 1, 2025)
+        versao_apos_lote = obter_versao_dados()
+        assert versao_apos_lote > versao_apos_insercao
+
+        # Rollback não altera a versão
+        db.session.add(AjusteFinanceiro(vendedor_rca=1, mes=1, ano=2025))
+        db.session.flush()
+        db.session.rollback()
+        assert obter_versao_dados() == versao_apos_lote
+
+
+def test_cache_invalida_e_descarta():
+    """Relatório repetido vem do cache; alterações e o limite de entradas o invalidam"""
+    from app.cache import obter_cache_relatorios
+    from app.services import obter_relatorio_comissoes
+
+    with app_teste(REPORT_CACHE_MAX_ENTRIES=2):
+        popular_vendas()
+        cache = obter_cache_relatorios()
+        cache.clear()
+
+        primeiro, _ = obter_relatorio_comissoes(1, 2025)
+        segundo, _ = obter_relatorio_comissoes(1, 2025)
+        assert primeiro is segundo
+
+        db.session.add(AjusteFinanceiro(vendedor_rca=1, mes=1, ano=2025, valor_ret_merc=5.0))
+        db.session.commit()
+        terceiro, _ = obter_relatorio_comissoes(1, 2025)
+        assert terceiro is not segundo
+        assert terceiro[1]['ajustesFinanceiros']['valorRetMerc'] == 5.0
+
+        # Limite de 2 entradas: o período menos usado é descartado
+        obter_relatorio_comissoes(2, 2025)
+        obter_relatorio_comissoes(3, 2025)
+        estatisticas = cache.estatisticas()
+        assert estatisticas['entradas'] == 2
+        assert estatisticas['descartes'] >= 1
+        assert estatisticas['acertos'] >= 1
+
+
+def test_cache_por_aplicacao_e_banco():
+    """Cada aplicação tem o próprio cache, do tamanho configurado nela, e o banco entra na chave"""
+    from app.cache import obter_cache_relatorios, identificador_banco
+    from app.services import obter_relatorio_comissoes
+
+    pasta = tempfile.mkdtemp(prefix='teste_cache_relatorios_')
+    banco_a = f"sqlite:///{os.path.join(pasta, 'a.db')}"
+    banco_b = f"sqlite:///{os.path.join(pasta, 'b.db')}"
+
+    with app_teste(SQLALCHEMY_DATABASE_URI=banco_a, REPORT_CACHE_MAX_ENTRIES=3):
+        popular_vendas()
+        cache_a = obter_cache_relatorios()
+        relatorio_a, _ = obter_relatorio_comissoes(1, 2025)
+        assert cache_a.max_entradas == 3
+        assert identificador_banco() == banco_a
+        assert [chave[0] for chave in cache_a._dados] == [banco_a]
+
+    with app_teste(SQLALCHEMY_DATABASE_URI=banco_b, REPORT_CACHE_MAX_ENTRIES=5):
+        cache_b = obter_cache_relatorios()
+        assert cache_b is not cache_a
+        assert cache_b.max_entradas == 5
+        # Mesmo período em outro banco (sem vendas): não reaproveita o relatório do banco A
+        relatorio_b, _ = obter_relatorio_comissoes(1, 2025)
+        assert relatorio_a and relatorio_b == {}
+
+
+if __name__ == '__main__':
+    test_versao_muda_com_alteracoes()
+    print("✅ Versão dos dados acompanha as alterações")
+    test_cache_invalida_e_descarta()
+    print("✅ Cache de relatórios invalidado e limitado corretamente")
+    test_cache_por_aplicacao_e_banco()
+    print("✅ Cache de relatórios separado por aplicação e banco")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o número de consultas SQL do relatório de comissões.
+O total de consultas de process_commissions não pode crescer com o número de vendedores.
+"""
+
+import json
+import logging
+
+import pytest
+from sqlalchemy import event
+
+from conftest import app_teste
+from app import db
+from app.models import (
+    Vendedor, ComissaoPadrao, RegraComissao, ProdutoEspecial, DadosVendas,
+    DimensaoVendedor, DimensaoProduto, AjusteFinanceiro, AjusteFaturamento
+)
+
+
+# Vendas do período, as dimensões de vendedores e produtos, vendedores, ajustes
+# financeiros e de faturamento e as três tabelas de regras (padrão por vendedor,
+# produtos especiais e regras)
+ORCAMENTO_CONSULTAS_RELATORIO = 9
+
+
+def popular_periodo(total_vendedores):
+    """Cria vendedores com vendas, regras e ajustes no período 1/2025"""
+    db.session.add(ProdutoEspecial(codigo_produto='1', nome_produto='PRODUTO 1', taxa_comissao=0.02))
+    db.session.add(RegraComissao(vendedor_rca=None, codigo_produto='2', taxa_comissao=0.03))
+    produtos = {codigo: DimensaoProduto(codigo=codigo, descricao=f"PRODUTO {codigo}") for codigo in ('1', '2', '3', '4')}
+    for rca in range(1, total_vendedores + 1):
+        db.session.add(Vendedor(rca=rca, nome=f"VENDEDOR {rca}"))
+        db.session.add(ComissaoPadrao(vendedor_rca=rca, taxa_comissao=0.01))
+        db.session.add(RegraComissao(vendedor_rca=rca, codigo_produto='3', taxa_comissao=0.04))
+        db.session.add(AjusteFinanceiro(vendedor_rca=rca, mes=1, ano=2025, valor_ret_merc=1.0))
+        db.session.add(AjusteFaturamento(vendedor_rca=rca, mes=1, ano=2025, valor_ajuste=10.0, taxa_comissao_ajuste=0.01))
+        vendedor = DimensaoVendedor(codigo=rca, nome=f"VENDEDOR {rca}")
+        for produto in produtos.values():
+            db.session.add(DadosVendas(mes=1, ano=2025, vendedor=vendedor, produto=produto, revenue=100.0))
+    db.session.commit()
+
+
+def contar_consultas_relatorio(total_vendedores):
+    """Executa process_commissions e retorna (quantidade de consultas, relatório)"""
+    from app.services import process_commissions
+
+    with app_teste():
+        popular_periodo(total_vendedores)
+
+        consultas = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            relatorio, _ = process_commissions(1, 2025)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        return len(consultas), relatorio
+
+
+def test_consultas_constantes_por_vendedor():
+    """O número de consultas é o mesmo para 3 ou 30 vendedores"""
+    consultas_poucos, relatorio_poucos = contar_consultas_relatorio(3)
+    consultas_muitos, relatorio_muitos = contar_consultas_relatorio(30)
+
+    assert len(relatorio_poucos) == 3
+    assert len(relatorio_muitos) == 30
+    assert consultas_poucos == consultas_muitos
+
+    vendedor = relatorio_muitos[1]
+    taxas = {p['codigo_produto']: p['taxa_comissao'] for p in vendedor['details']['produtos_detalhados']}
+    assert taxas == {'1': 0.02, '2': 0.03}
+    assert vendedor['ajustesFinanceiros']['valorRetMerc'] == 1.0
+    assert vendedor['ajusteFaturamento']['valorAjuste'] == 10.0
+
+
+def test_orcamento_consultas_relatorio():
+    """process_commissions cabe no orçamento; um acesso por vendedor (N+1) o estoura"""
+    from app.services import process_commissions
+    from app.tracing import orcamento_consultas, OrcamentoConsultasExcedido
+
+    with app_teste():
+        popular_periodo(10)
+
+        with orcamento_consultas(ORCAMENTO_CONSULTAS_RELATORIO, 'process_commissions') as rastreio:
+            relatorio, _ = process_commissions(1, 2025)
+        assert len(relatorio) == 10
+        assert rastreio.mais_lentas and rastreio.tempo_total > 0
+
+        with pytest.raises(OrcamentoConsultasExcedido, match='11 consultas SQL'):
+            with orcamento_consultas(ORCAMENTO_CONSULTAS_RELATORIO, 'N+1'):
+                AjusteFinanceiro.query.all()
+                for rca in relatorio:
+                    AjusteFaturamento.query.filter_by(vendedor_rca=rca, mes=1, ano=2025).first()
+
+
+def test_rastreamento_servico_no_log():
+    """Com SQL_TRACE_ENABLED, cada chamada de serviço gera o resumo das consultas no log"""
+    from app.metrics import logger
+    from app.services import process_commissions
+
+    mensagens = []
+    handler = logging.Handler()
+    handler.emit = lambda record: mensagens.append(json.loads(record.getMessage()))
+    logger.addHandler(handler)
+    nivel_anterior = logger.level
+    logger.setLevel(logging.INFO)
+
+    try:
+        with app_teste(SQL_TRACE_ENABLED=True):
+            popular_periodo(3)
+            process_commissions(1, 2025)
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(nivel_anterior)
+
+    resumos = {m['nome']: m for m in mensagens if m['evento'] == 'consultas_sql'}
+    assert resumos['process_commissions']['consultas'] == ORCAMENTO_CONSULTAS_RELATORIO
+    # A leitura do cache (vendas e as duas dimensões) é um serviço rastreado dentro do relatório
+    assert resumos['get_sales_data_from_cache']['consultas'] == 3
+    assert resumos['process_commissions']['mais_lentas'][0]['sql'].startswith(('SELECT', 'select'))
+
+
+if __name__ == '__main__':
+    test_consultas_constantes_por_vendedor()
+    print("✅ Número de consultas do relatório não depende da quantidade de vendedores")
+    test_orcamento_consultas_relatorio()
+    print("✅ Relatório dentro do orçamento de consultas")
+    test_rastreamento_servico_no_log()
+    print("✅ Resumo das consultas registrado no log")
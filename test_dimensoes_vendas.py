@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Script de teste para as dimensões de vendedores e produtos do cache de vendas.
+Verifica a codificação na gravação, a leitura com colunas categóricas e a
+conversão de um banco no formato antigo.
+"""
+
+import pandas as pd
+from sqlalchemy import text
+
+from conftest import app_teste
+from app import db
+from app.models import Vendedor, DadosVendas, DimensaoVendedor, DimensaoProduto
+
+
+def vendas_oracle(linhas):
+    """DataFrame no formato da busca do Oracle: (rca, nome, produto, descrição, faturamento)"""
+    df = pd.DataFrame(linhas, columns=['sellerCode', 'sellerName', 'productCode', 'productDesc', 'revenue'])
+    for coluna in ('valorRetMerc', 'valorTituloAberto', 'valorAcrescTituloPagoMesAnt'):
+        df[coluna] = 0.0
+    return df
+
+
+def test_gravacao_e_leitura_pelas_dimensoes():
+    """Cada par (código, nome) é gravado uma vez e cada mês mantém o nome importado"""
+    from app.services import save_sales_chunks_to_cache, get_sales_data_from_cache, process_commissions
+
+    with app_teste():
+        janeiro = vendas_oracle([
+            (1, 'VENDEDOR 1', '10', 'PRODUTO 10', 100.0),
+            (1, 'VENDEDOR 1', '20', 'PRODUTO 20', 50.0),
+            (2, 'VENDEDOR 2', '10', 'PRODUTO 10', 30.0),
+        ])
+        # Em fevereiro o vendedor 2 mudou de nome no Oracle
+        fevereiro = vendas_oracle([
+            (1, 'VENDEDOR 1', '10', 'PRODUTO 10', 200.0),
+            (2, 'VENDEDOR DOIS', '20', 'PRODUTO 20', 70.0),
+        ])
+        assert save_sales_chunks_to_cache([janeiro], 1, 2025) == (True, 3)
+        assert save_sales_chunks_to_cache([fevereiro], 2, 2025, apenas_vendedores_novos=True) == (True, 2)
+        # Reimportar um mês não duplica as dimensões
+        assert save_sales_chunks_to_cache([janeiro], 1, 2025, apenas_vendedores_novos=True) == (True, 3)
+
+        assert DadosVendas.query.count() == 5
+        assert sorted((v.codigo, v.nome) for v in DimensaoVendedor.query) == [
+            (1, 'VENDEDOR 1'), (2, 'VENDEDOR 2'), (2, 'VENDEDOR DOIS')
+        ]
+        assert DimensaoProduto.query.count() == 2
+
+        df = get_sales_data_from_cache(1, 2025)
+        assert list(df.columns[:4]) == ['sellerCode', 'sellerName', 'productCode', 'productDesc']
+        assert df['sellerCode'].dtype == 'int64'
+        for coluna in ('sellerName', 'productCode', 'productDesc'):
+            assert isinstance(df[coluna].dtype, pd.CategoricalDtype)
+        linhas = sorted(zip(df['sellerCode'], df['sellerName'].astype(str), df['productCode'].astype(str), df['revenue']))
+        assert linhas == [(1, 'VENDEDOR 1', '10', 100.0), (1, 'VENDEDOR 1', '20', 50.0), (2, 'VENDEDOR 2', '10', 30.0)]
+
+        # O nome exibido é o do mês do relatório
+        assert process_commissions(1, 2025)[0][2]['name'] == 'VENDEDOR 2'
+        assert process_commissions(2, 2025)[0][2]['name'] == 'VENDEDOR DOIS'
+
+
+def test_par_cadastrado_por_outra_importacao():
+    """Par cadastrado depois da carga do dicionário não duplica nem desfaz a gravação em andamento"""
+    from sqlalchemy import insert
+    from app.services import _DicionarioDimensao
+
+    with app_teste():
+        dimensao = _DicionarioDimensao(DimensaoVendedor, DimensaoVendedor.nome, int)
+        # Outra importação cadastra o vendedor 1 depois da carga
+        db.session.execute(insert(DimensaoVendedor.__table__), {'codigo': 1, 'nome': 'VENDEDOR 1'})
+        db.session.add(Vendedor(rca=9, nome="VENDEDOR 9"))
+        db.session.flush()
+
+        ids = dimensao.codificar(pd.Series([1, 2, 1]), pd.Series(['VENDEDOR 1', 'VENDEDOR 2', 'VENDEDOR 1']))
+        db.session.commit()
+
+        cadastrados = {(v.codigo, v.nome): v.id for v in DimensaoVendedor.query}
+        assert len(cadastrados) == 2
+        assert list(ids) == [cadastrados[(1, 'VENDEDOR 1')], cadastrados[(2, 'VENDEDOR 2')], cadastrados[(1, 'VENDEDOR 1')]]
+        assert Vendedor.query.count() == 1
+
+
+def test_conversao_do_formato_antigo():
+    """O cache com nomes repetidos em cada linha é convertido sem perder vendas"""
+    from app.database import migrar_dados_vendas_para_dimensoes
+    from app.services import process_commissions
+
+    with app_teste():
+        db.session.add(Vendedor(rca=1, nome="VENDEDOR 1"))
+        db.session.commit()
+
+        with db.engine.begin() as conexao:
+            conexao.execute(text("DROP TABLE dados_vendas"))
+            conexao.execute(text(
+                "CREATE TABLE dados_vendas (id INTEGER PRIMARY KEY, mes INTEGER NOT NULL, ano INTEGER NOT NULL, "
+                "seller_code INTEGER NOT NULL, seller_name VARCHAR(150) NOT NULL, product_code VARCHAR(50) NOT NULL, "
+                "product_desc VARCHAR(255) NOT NULL, revenue FLOAT, valor_ret_merc FLOAT, valor_titulo_aberto FLOAT, "
+                "valor_acresc_titulo_pago_mes_ant FLOAT, data_importacao DATETIME)"
+            ))
+            conexao.execute(text(
+                "CREATE INDEX idx_mes_ano_vendedor_produto ON dados_vendas (mes, ano, seller_code, product_code)"
+            ))
+            for mes, produto, revenue in ((1, '10', 100.0), (1, '20', 50.0), (2, '10', 80.0)):
+                conexao.execute(text(
+                    "INSERT INTO dados_vendas (mes, ano, seller_code, seller_name, product_code, product_desc, revenue) "
+                    "VALUES (:mes, 2025, 1, 'VENDEDOR 1', :produto, :descricao, :revenue)"
+                ), {'mes': mes, 'produto': produto, 'descricao': f"PRODUTO {produto}", 'revenue': revenue})
+
+        assert migrar_dados_vendas_para_dimensoes(db.engine) is True
+        assert migrar_dados_vendas_para_dimensoes(db.engine) is False
+
+        assert DimensaoVendedor.query.count() == 1
+        assert DimensaoProduto.query.count() == 2
+        assert DadosVendas.query.count() == 3
+        relatorio, _ = process_commissions(1, 2025)
+        assert relatorio[1]['name'] == 'VENDEDOR 1'
+        assert relatorio[1]['faturamentoOracle'] == 150.0
+
+
+if __name__ == '__main__':
+    test_gravacao_e_leitura_pelas_dimensoes()
+    print("✅ Vendas gravadas e lidas pelas dimensões")
+    test_par_cadastrado_por_outra_importacao()
+    print("✅ Par já cadastrado reaproveitado pela dimensão")
+    test_conversao_do_formato_antigo()
+    print("✅ Cache no formato antigo convertido")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a exportação dos extratos em PDF por vendedor (ZIP).
+Verifica o conteúdo do ZIP gerado em linha e com o pool de processos (iniciado com
+spawn e alimentado só com tipos do Python).
+"""
+
+import io
+import zipfile
+
+import numpy as np
+
+from benchmark_extratos_pdf import gerar_relatorio_sintetico
+
+
+def montar_zip(workers):
+    from app.pdf import gerar_zip_extratos
+
+    relatorio = gerar_relatorio_sintetico(5, 2)
+    relatorio[3]['name'] = 'JOÃO D\'ÁVILA / FILIAL'
+    return b''.join(gerar_zip_extratos(relatorio, "1/2025", "01_2025", workers))
+
+
+def test_zip_com_um_pdf_por_vendedor():
+    """O ZIP tem um PDF válido por vendedor, na ordem do relatório, com ou sem pool"""
+    for workers in (1, 2):
+        with zipfile.ZipFile(io.BytesIO(montar_zip(workers))) as arquivo_zip:
+            nomes = arquivo_zip.namelist()
+            assert len(nomes) == 5
+            assert nomes[0] == 'Extrato_1_VENDEDOR_SINTETICO_1_01_2025.pdf'
+            assert nomes[2] == 'Extrato_3_JOAO_D_AVILA_FILIAL_01_2025.pdf'
+            for nome in nomes:
+                assert arquivo_zip.read(nome)[:4] == b'%PDF'
+
+
+def test_pool_spawn_com_dados_simples():
+    """O pool usa spawn e as tarefas levam só tipos nativos, mesmo com valores do numpy"""
+    from app.pdf import _obter_executor_extratos, _dados_simples
+
+    assert _obter_executor_extratos(2)._mp_context.get_start_method() == 'spawn'
+
+    vendedor = {'faturamentoOracle': np.float64(1500.5), 'details': {'produtos_detalhados': [
+        {'codigo': '101', 'quantidade': np.int64(3)},
+    ]}}
+    simples = _dados_simples({np.int64(7): vendedor})
+    assert simples == {7: {'faturamentoOracle': 1500.5, 'details': {'produtos_detalhados': [
+        {'codigo': '101', 'quantidade': 3},
+    ]}}}
+    assert type(next(iter(simples))) is int
+    assert type(simples[7]['faturamentoOracle']) is float
+    assert type(simples[7]['details']['produtos_detalhados'][0]['quantidade']) is int
+
+
+if __name__ == '__main__':
+    test_zip_com_um_pdf_por_vendedor()
+    print("✅ Extratos por vendedor gerados no ZIP")
+    test_pool_spawn_com_dados_simples()
+    print("✅ Pool de extratos com spawn e dados simples")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a gravação em blocos do cache de vendas.
+Verifica que a carga completa só apaga o mês quando o primeiro bloco chega.
+"""
+
+import pandas as pd
+
+from conftest import app_teste
+from app import db
+from app.models import DadosVendas, DimensaoVendedor, DimensaoProduto
+
+
+def vendas_oracle(linhas):
+    """DataFrame no formato da busca do Oracle: (rca, nome, produto, descrição, faturamento)"""
+    df = pd.DataFrame(linhas, columns=['sellerCode', 'sellerName', 'productCode', 'productDesc', 'revenue'])
+    for coluna in ('valorRetMerc', 'valorTituloAberto', 'valorAcrescTituloPagoMesAnt'):
+        df[coluna] = 0.0
+    return df
+
+
+def popular_mes():
+    db.session.add(DadosVendas(
+        mes=1, ano=2025, revenue=1000.0,
+        vendedor=DimensaoVendedor(codigo=1, nome="VENDEDOR 1"),
+        produto=DimensaoProduto(codigo='10', descricao='PRODUTO 10')
+    ))
+    db.session.commit()
+
+
+def test_exclusao_apos_primeiro_bloco(app):
+    """Enquanto o Oracle não devolve dados o mês antigo continua no cache"""
+    from app.services import save_sales_chunks_to_cache
+
+    popular_mes()
+    vistos = []
+
+    def blocos():
+        # Consulta em andamento no Oracle: nada foi apagado ainda
+        vistos.append(DadosVendas.query.count())
+        yield vendas_oracle([])
+        vistos.append(DadosVendas.query.count())
+        yield vendas_oracle([(1, 'VENDEDOR 1', '10', 'PRODUTO 10', 200.0)])
+        yield vendas_oracle([(1, 'VENDEDOR 1', '20', 'PRODUTO 20', 50.0)])
+
+    assert save_sales_chunks_to_cache(blocos(), 1, 2025) == (True, 2)
+    assert vistos == [1, 1]
+    assert sorted(v.revenue for v in DadosVendas.query) == [50.0, 200.0]
+
+
+def test_sem_dados_mantem_mes(app):
+    """Carga completa sem nenhuma linha não apaga o mês existente"""
+    from app.services import save_sales_chunks_to_cache
+
+    popular_mes()
+    assert save_sales_chunks_to_cache(iter([vendas_oracle([])]), 1, 2025) == (False, 0)
+    assert [v.revenue for v in DadosVendas.query] == [1000.0]
+
+
+if __name__ == '__main__':
+    with app_teste() as app:
+        test_exclusao_apos_primeiro_bloco(app)
+    print("✅ Mês apagado só após o primeiro bloco do Oracle")
+    with app_teste() as app:
+        test_sem_dados_mantem_mes(app)
+    print("✅ Carga sem dados mantém o mês no cache")
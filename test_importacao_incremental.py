@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a importação incremental pela marca d'água.
+Simula o Oracle (DATA_VENDA só com o dia) e verifica a substituição do dia da
+marca, a troca de modo e a reconciliação completa.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import func, text
+
+from conftest import app_teste
+from app import db
+from app.models import DadosVendas, ControleImportacao
+
+
+class OracleSimulado:
+    """
+    Substitui iter_sales_data_from_oracle aplicando às vendas cadastradas o mesmo
+    filtro e agrupamento das queries (inclusive o DIA_VENDA) e registrando o 'desde'
+    de cada consulta
+    """
+
+    def __init__(self):
+        self.vendas = []
+        self.consultas = []
+
+    def vender(self, rca, produto, dia, revenue):
+        self.vendas.append((rca, f"VENDEDOR {rca}", produto, f"PRODUTO {produto}", revenue, datetime(2025, 1, dia)))
+
+    def __call__(self, mes, ano, modo=None, chunk_size=None, desde=None):
+        self.consultas.append(desde)
+        df = pd.DataFrame(self.vendas, columns=['sellerCode', 'sellerName', 'productCode', 'productDesc', 'revenue', 'dataVenda'])
+        inicio = max(datetime(ano, mes, 1), desde or datetime.min)
+        df = df[(df['dataVenda'] >= inicio) & (df['dataVenda'] < datetime(ano, mes + 1, 1))].copy()
+        if df.empty:
+            return
+        if modo == 'detalhado':
+            df['diaVenda'] = df['dataVenda']
+        else:
+            df['diaVenda'] = df['dataVenda'].where(df['dataVenda'] == df['dataVenda'].max())
+            df = df.groupby(['sellerCode', 'productCode', 'diaVenda'], dropna=False, as_index=False).agg(
+                sellerName=('sellerName', 'max'), productDesc=('productDesc', 'max'),
+                revenue=('revenue', 'sum'), dataVenda=('dataVenda', 'max')
+            )
+        for coluna in ('valorRetMerc', 'valorTituloAberto', 'valorAcrescTituloPagoMesAnt'):
+            df[coluna] = 0.0
+        yield df
+
+
+@contextmanager
+def oracle_simulado():
+    from app import services
+
+    oracle = OracleSimulado()
+    original = services.iter_sales_data_from_oracle
+    services.iter_sales_data_from_oracle = oracle
+    try:
+        yield oracle
+    finally:
+        services.iter_sales_data_from_oracle = original
+
+
+def faturamento_cache():
+    return db.session.query(func.sum(DadosVendas.revenue)).filter_by(mes=1, ano=2025).scalar()
+
+
+@pytest.mark.parametrize('modo', ['agregado', 'detalhado'])
+def test_vendas_lancadas_no_dia_da_marca(app, modo):
+    """Vendas lançadas depois da importação no dia da marca entram sem duplicar o dia"""
+    from app.services import import_month_data
+
+    with oracle_simulado() as oracle:
+        oracle.vender(1, '10', 5, 100.0)
+        oracle.vender(1, '10', 10, 50.0)
+        assert import_month_data(1, 2025, modo)[0]
+        assert faturamento_cache() == 150.0
+        assert ControleImportacao.query.one().ultima_data_venda == datetime(2025, 1, 10)
+
+        # Lançadas depois da importação: uma no próprio dia da marca, outra depois
+        oracle.vender(1, '10', 10, 30.0)
+        oracle.vender(2, '20', 12, 20.0)
+        assert import_month_data(1, 2025, modo, incremental=True)[0]
+        assert oracle.consultas[-1] == datetime(2025, 1, 10)
+        assert faturamento_cache() == 200.0
+        controle = ControleImportacao.query.one()
+        assert controle.ultima_data_venda == datetime(2025, 1, 12)
+        assert controle.total_registros == DadosVendas.query.count()
+
+        # Sem vendas novas, repetir a incremental não altera o cache
+        assert import_month_data(1, 2025, modo, incremental=True)[0]
+        assert oracle.consultas[-1] == datetime(2025, 1, 12)
+        assert faturamento_cache() == 200.0
+
+
+def test_troca_de_modo_e_reconciliacao(app):
+    """Incremental sem marca, em outro modo ou com a reconciliação vencida vira carga completa"""
+    from app.services import import_month_data
+
+    with oracle_simulado() as oracle:
+        oracle.vender(1, '10', 5, 100.0)
+        assert import_month_data(1, 2025, 'agregado', incremental=True)[0]
+        assert oracle.consultas == [None]
+
+        assert import_month_data(1, 2025, 'agregado', incremental=True)[0]
+        assert oracle.consultas[-1] == datetime(2025, 1, 5)
+
+        assert import_month_data(1, 2025, 'detalhado', incremental=True)[0]
+        assert oracle.consultas[-1] is None
+        assert ControleImportacao.query.one().modo == 'detalhado'
+
+        # Venda cancelada no Oracle só sai do cache na reconciliação
+        oracle.vendas.clear()
+        oracle.vender(1, '10', 6, 40.0)
+        controle = ControleImportacao.query.one()
+        controle.ultima_importacao_completa = datetime.utcnow() - timedelta(hours=app.config['IMPORT_RECONCILIACAO_HORAS'] + 1)
+        db.session.commit()
+        assert import_month_data(1, 2025, 'detalhado', incremental=True)[0]
+        assert oracle.consultas[-1] is None
+        assert faturamento_cache() == 40.0
+
+
+def test_migracao_dia_venda(app):
+    """Cache sem a coluna dia_venda ganha a coluna e tem as marcas d'água vencidas"""
+    from app.database import adicionar_dia_venda_ao_cache
+
+    db.session.add(ControleImportacao(mes=1, ano=2025, modo='agregado', ultima_data_venda=datetime(2025, 1, 10)))
+    db.session.commit()
+    with db.engine.begin() as conexao:
+        conexao.execute(text("ALTER TABLE dados_vendas DROP COLUMN dia_venda"))
+
+    assert adicionar_dia_venda_ao_cache(db.engine) is True
+    assert adicionar_dia_venda_ao_cache(db.engine) is False
+    db.session.expire_all()
+    assert ControleImportacao.query.one().ultima_importacao_completa is None
+
+
+if __name__ == '__main__':
+    for modo in ('agregado', 'detalhado'):
+        with app_teste() as app:
+            test_vendas_lancadas_no_dia_da_marca(app, modo)
+    print("✅ Dia da marca d'água substituído na importação incremental")
+    with app_teste() as app:
+        test_troca_de_modo_e_reconciliacao(app)
+    print("✅ Troca de modo e reconciliação fazem a carga completa")
+    with app_teste() as app:
+        test_migracao_dia_venda(app)
+    print("✅ Coluna dia_venda adicionada ao cache existente")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a importação de intervalos de meses.
+Simula o Oracle com consultas lentas e verifica paralelismo e resultado por mês.
+"""
+
+import time
+
+import pandas as pd
+
+from conftest import app_teste
+from app import db
+from app.models import Vendedor, DadosVendas
+
+
+ATRASO_CONSULTA = 0.3
+
+
+def oracle_simulado(mes, ano, modo=None, chunk_size=None, desde=None):
+    """Substitui iter_sales_data_from_oracle: um bloco por mês, com falha em março"""
+    time.sleep(ATRASO_CONSULTA)
+    if mes == 3:
+        raise RuntimeError("ORA-03113: end-of-file on communication channel")
+    if mes == 4:
+        return
+    yield bloco_do_mes(mes, ano)
+
+
+def bloco_do_mes(mes, ano):
+    """Vendas de um mês no formato da busca do Oracle"""
+    return pd.DataFrame({
+        'sellerCode': [mes, 99],
+        'sellerName': [f"VENDEDOR {mes}", "VENDEDOR 99"],
+        'productCode': ['10', '20'],
+        'productDesc': ['PRODUTO 10', 'PRODUTO 20'],
+        'revenue': [100.0 * mes, 50.0],
+        'valorRetMerc': [0.0, 0.0],
+        'valorTituloAberto': [0.0, 0.0],
+        'valorAcrescTituloPagoMesAnt': [0.0, 0.0],
+        'dataVenda': pd.to_datetime([f"{ano}-{mes:02d}-05", f"{ano}-{mes:02d}-06"]),
+    })
+
+
+def test_intervalo_paralelo_com_resultado_por_mes():
+    """Meses consultados em paralelo; falhas isoladas; vendedores existentes preservados"""
+    from app import services
+
+    original = services.iter_sales_data_from_oracle
+    services.iter_sales_data_from_oracle = oracle_simulado
+    try:
+        with app_teste(IMPORT_RANGE_WORKERS=4):
+            db.session.add(Vendedor(rca=99, nome="VENDEDOR 99", is_cooperativa=True))
+            db.session.commit()
+
+            inicio = time.perf_counter()
+            sucesso, mensagem, resultados = services.import_month_range(1, 2025, 4, 2025)
+            duracao = time.perf_counter() - inicio
+
+            # 4 meses com 4 consultas simultâneas: perto do tempo de um mês, não da soma
+            assert duracao < ATRASO_CONSULTA * 3
+            assert sucesso
+            assert [(r['mes'], r['sucesso']) for r in resultados] == [(1, True), (2, True), (3, False), (4, False)]
+            assert 'ORA-03113' in resultados[2]['mensagem']
+            assert resultados[0]['registros'] == 2
+
+            assert DadosVendas.query.filter_by(ano=2025).count() == 4
+            assert Vendedor.query.count() == 3
+            assert db.session.get(Vendedor, 99).is_cooperativa
+
+            sucesso, _, resultados = services.import_month_range(5, 2025, 1, 2025)
+            assert not sucesso and resultados == []
+    finally:
+        services.iter_sales_data_from_oracle = original
+
+
+def test_meses_em_memoria_limitados():
+    """Com o escritor mais lento que as consultas, no máximo IMPORT_RANGE_WORKERS meses ficam pendentes"""
+    from app import services
+
+    consultados, gravados, pendentes = [], [], []
+
+    def oracle_rapido(mes, ano, modo=None, chunk_size=None, desde=None):
+        consultados.append(mes)
+        pendentes.append(len(consultados) - len(gravados))
+        yield bloco_do_mes(mes, ano)
+
+    def gravacao_lenta(chunks, mes, ano, *args, **kwargs):
+        time.sleep(0.05)
+        resultado = original_gravacao(chunks, mes, ano, *args, **kwargs)
+        gravados.append(mes)
+        return resultado
+
+    original_oracle = services.iter_sales_data_from_oracle
+    original_gravacao = services.save_sales_chunks_to_cache
+    services.iter_sales_data_from_oracle = oracle_rapido
+    services.save_sales_chunks_to_cache = gravacao_lenta
+    try:
+        with app_teste(IMPORT_RANGE_WORKERS=2):
+            sucesso, _, resultados = services.import_month_range(5, 2025, 12, 2025)
+            assert sucesso and all(r['sucesso'] for r in resultados)
+            assert max(pendentes) <= 2
+            assert sorted(gravados) == list(range(5, 13))
+    finally:
+        services.iter_sales_data_from_oracle = original_oracle
+        services.save_sales_chunks_to_cache = original_gravacao
+
+
+if __name__ == '__main__':
+    test_intervalo_paralelo_com_resultado_por_mes()
+    print("✅ Importação de intervalo paralela com resultado por mês")
+    test_meses_em_memoria_limitados()
+    print("✅ Meses em memória limitados pelas consultas simultâneas")
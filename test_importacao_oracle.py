@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a importação de vendas do Oracle para o cache e o relatório
+de comissões gerado a partir dele. Usa a conexão Oracle simulada do conftest, que responde às queries de faturamento
+a partir das linhas de DADOS_FATURAMENTO cadastradas no teste.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import event, select
+
+from conftest import app_teste, oracle_falso
+from app import db
+from app.models import Vendedor, DadosVendas, DimensaoVendedor, DimensaoProduto, ProdutoEspecial, RegraComissao
+
+COLUNAS_FATURAMENTO = [
+    'CODIGO_VENDEDOR', 'NOME_VENDEDOR', 'CODIGO_PRODUTO', 'DESCRICAO_PRODUTO', 'FATURAMENTO_LIQUIDO',
+    'DEVOLUCAO', 'CUSTO_FIN_FAT', 'CUSTO_FIN_DEV', 'DATA_VENDA',
+]
+
+
+class FaturamentoOracle:
+    """
+    Tabela DADOS_FATURAMENTO simulada: responde às queries de faturamento aplicando
+    o intervalo [data_inicio, data_fim) das variáveis de ligação e, na query
+    agregada, o GROUP BY por vendedor, produto e DIA_VENDA
+    """
+
+    def __init__(self):
+        self.linhas = []
+
+    def vender(self, rca, produto, data, faturamento, devolucao=0.0):
+        self.linhas.append((
+            rca, f"VENDEDOR {rca}", produto, f"PRODUTO {produto}", faturamento, devolucao, 1.0, 0.5, data
+        ))
+
+    def __call__(self, sql, binds):
+        linhas = [linha for linha in self.linhas if binds['data_inicio'] <= linha[8] < binds['data_fim']]
+        dia = lambda data: datetime(data.year, data.month, data.day)
+        if 'GROUP BY' not in sql:
+            return COLUNAS_FATURAMENTO + ['DIA_VENDA'], [linha + (dia(linha[8]),) for linha in linhas]
+
+        # Vendas do último dia do período ficam em linhas à parte (DIA_VENDA)
+        ultimo_dia = max((dia(linha[8]) for linha in linhas), default=None)
+        grupos = {}
+        for linha in linhas:
+            dia_venda = dia(linha[8]) if dia(linha[8]) == ultimo_dia else None
+            chave = (linha[0], linha[2], dia_venda)
+            atual = grupos.get(chave)
+            if atual is None:
+                grupos[chave] = list(linha) + [dia_venda]
+            else:
+                atual[1], atual[3] = max(atual[1], linha[1]), max(atual[3], linha[3])
+                for posicao in range(4, 8):
+                    atual[posicao] += linha[posicao]
+                atual[8] = max(atual[8], linha[8])
+        return COLUNAS_FATURAMENTO + ['DIA_VENDA'], [tuple(grupo) for grupo in grupos.values()]
+
+
+def faturamento_janeiro():
+    oracle = FaturamentoOracle()
+    for dia, rca, produto, faturamento in (
+        (3, 1, '10', 100.0), (3, 1, '20', 40.0), (7, 1, '10', 60.0), (8, 2, '10', 25.0),
+        (15, 2, '30', 80.0), (15, 3, '20', 15.0), (31, 3, '20', 35.0),
+    ):
+        oracle.vender(rca, produto, datetime(2025, 1, dia, 10), faturamento)
+    return oracle
+
+
+def vendas_cache():
+    """(vendedor, produto, faturamento, devolução, custos, dia) de cada linha do cache, ordenadas"""
+    return sorted(db.session.execute(
+        select(
+            DimensaoVendedor.codigo, DimensaoProduto.codigo, DadosVendas.revenue, DadosVendas.valor_ret_merc,
+            DadosVendas.valor_titulo_aberto, DadosVendas.valor_acresc_titulo_pago_mes_ant, DadosVendas.dia_venda
+        ).join(DadosVendas.vendedor).join(DadosVendas.produto).where(DadosVendas.mes == 1, DadosVendas.ano == 2025)
+    ).all())
+
+
+def test_insercao_em_lotes():
+    """O cache gravado em lotes pequenos é igual ao gravado em um único INSERT"""
+    from app.services import import_month_data
+
+    oracle = faturamento_janeiro()
+    resultados = {}
+    for batch_size in (2, 5000):
+        with app_teste(CACHE_INSERT_BATCH_SIZE=batch_size):
+            comandos = []
+            event.listen(db.engine, 'before_cursor_execute',
+                         lambda conn, cursor, sql, *args: comandos.append(sql))
+            with oracle_falso(oracle):
+                assert import_month_data(1, 2025, 'detalhado')[0]
+            inserts = [sql for sql in comandos if sql.startswith('INSERT INTO dados_vendas')]
+            resultados[batch_size] = (len(inserts), vendas_cache())
+
+    assert resultados[2][0] == 4
+    assert resultados[5000][0] == 1
+    assert resultados[2][1] == resultados[5000][1]
+    esperado = sorted(
+        (rca, produto, faturamento, devolucao, custo_fat, custo_dev, data.date())
+        for rca, _, produto, _, faturamento, devolucao, custo_fat, custo_dev, data in oracle.linhas
+    )
+    assert resultados[2][1] == esperado
+
+
+def test_leitura_tipada_do_cache():
+    """O cache importado é lido com os tipos explícitos, em uma consulta por tabela"""
+    from app.services import import_month_data, get_sales_data_from_cache, get_sales_data_for_periods
+
+    with app_teste():
+        with oracle_falso(faturamento_janeiro()):
+            assert import_month_data(1, 2025, 'detalhado')[0]
+
+        comandos = []
+        event.listen(db.engine, 'before_cursor_execute', lambda conn, cursor, sql, *args: comandos.append(sql))
+        df = get_sales_data_from_cache(1, 2025)
+        # Fatos e as duas dimensões
+        assert len(comandos) == 3
+
+        assert df['sellerCode'].dtype == 'int64'
+        for coluna in ('sellerName', 'productCode', 'productDesc'):
+            assert isinstance(df[coluna].dtype, pd.CategoricalDtype)
+        for coluna in ('revenue', 'valorRetMerc', 'valorTituloAberto', 'valorAcrescTituloPagoMesAnt'):
+            assert df[coluna].dtype == 'float64'
+        assert df.groupby('sellerCode')['revenue'].sum().to_dict() == {1: 200.0, 2: 105.0, 3: 50.0}
+        assert df['valorTituloAberto'].sum() == 7.0
+
+        periodos = get_sales_data_for_periods([(1, 2025), (2, 2025)])
+        assert periodos['mes'].dtype == 'int64' and periodos['ano'].dtype == 'int64'
+        assert len(periodos) == len(df)
+
+        assert get_sales_data_from_cache(2, 2025).empty
+
+
+def resumo_relatorio(relatorio):
+    """Totais e detalhamento de cada vendedor do relatório, arredondados"""
+    def valor(numero):
+        return round(numero, 6)
+
+    return {
+        rca: (
+            dados['name'], valor(dados['faturamentoOracle']), valor(dados['comissaoBaseOracle']),
+            valor(dados['details']['outros_produtos']['revenue']), valor(dados['details']['outros_produtos']['commission']),
+            [(p['codigo_produto'], valor(p['faturamento_total']), valor(p['comissao_total']))
+             for p in dados['details']['produtos_detalhados']],
+        )
+        for rca, dados in relatorio.items()
+    }
+
+
+def test_modo_agregado_igual_ao_detalhado():
+    """O modo agregado grava menos linhas e gera o mesmo relatório do modo detalhado"""
+    from app.services import import_month_data, process_commissions
+
+    oracle = faturamento_janeiro()
+    # Mais vendas dos mesmos vendedor/produto, inclusive no último dia do mês
+    oracle.vender(1, '10', datetime(2025, 1, 20), 10.0, devolucao=2.0)
+    oracle.vender(3, '20', datetime(2025, 1, 31, 18), 5.0)
+
+    resultados = {}
+    for modo in ('detalhado', 'agregado'):
+        with app_teste():
+            db.session.add(ProdutoEspecial(codigo_produto='20', nome_produto='PRODUTO 20', taxa_comissao=0.03))
+            db.session.add(RegraComissao(vendedor_rca=None, codigo_produto='30', taxa_comissao=0.05))
+            db.session.commit()
+            with oracle_falso(oracle):
+                assert import_month_data(1, 2025, modo)[0]
+            relatorio, _ = process_commissions(1, 2025)
+            resultados[modo] = (DadosVendas.query.count(), resumo_relatorio(relatorio), vendas_cache())
+
+    assert resultados['detalhado'][0] == 9
+    # (1, 10) somado em uma linha; (3, 20) separado entre os dias 15 e 31
+    assert resultados['agregado'][0] == 6
+    assert resultados['agregado'][1] == resultados['detalhado'][1]
+    assert resultados['agregado'][1][1][5] == [('20', 40.0, 1.2)]
+    assert [linha[6] for linha in resultados['agregado'][2] if linha[6]] == [datetime(2025, 1, 31).date()]
+
+
+def test_limites_do_mes_por_variaveis_de_ligacao():
+    """O mês é filtrado por [início, início do mês seguinte) em binds, inclusive na virada do ano"""
+    from app.services import import_month_data
+
+    oracle = FaturamentoOracle()
+    oracle.vender(1, '10', datetime(2024, 11, 30, 23, 59, 59), 1.0)
+    oracle.vender(1, '10', datetime(2024, 12, 1), 10.0)
+    oracle.vender(1, '20', datetime(2024, 12, 31, 23, 59, 59), 20.0)
+    oracle.vender(1, '10', datetime(2025, 1, 1), 100.0)
+
+    with app_teste():
+        with oracle_falso(oracle) as conexao:
+            assert import_month_data(11, 2024, 'detalhado')[0]
+            assert import_month_data(12, 2024, 'detalhado')[0]
+            assert import_month_data(1, 2025, 'detalhado')[0]
+
+        (sql_novembro, novembro), (sql_dezembro, dezembro), (sql_janeiro, janeiro) = conexao.execucoes
+        assert dezembro == {'data_inicio': datetime(2024, 12, 1), 'data_fim': datetime(2025, 1, 1)}
+        assert novembro == {'data_inicio': datetime(2024, 11, 1), 'data_fim': datetime(2024, 12, 1)}
+        assert janeiro == {'data_inicio': datetime(2025, 1, 1), 'data_fim': datetime(2025, 2, 1)}
+        # Mesmo texto para todos os períodos, sem datas literais
+        assert sql_novembro == sql_dezembro == sql_janeiro
+        assert ':data_inicio' in sql_dezembro and '2024' not in sql_dezembro
+
+        for mes, ano, total in ((11, 2024, 1.0), (12, 2024, 30.0), (1, 2025, 100.0)):
+            faturamento = db.session.query(db.func.sum(DadosVendas.revenue)).filter_by(mes=mes, ano=ano).scalar()
+            assert faturamento == total
+
+
+def test_leitura_em_blocos():
+    """A busca lê ORACLE_FETCH_CHUNK_SIZE linhas por vez e grava cada bloco antes de ler o próximo"""
+    from app.services import import_month_data, iter_sales_data_from_oracle
+
+    with app_teste(ORACLE_FETCH_CHUNK_SIZE=3):
+        with oracle_falso(faturamento_janeiro()) as conexao:
+            blocos = list(iter_sales_data_from_oracle(1, 2025, 'detalhado'))
+            cursor = conexao.cursores[0]
+            assert (cursor.arraysize, cursor.prefetchrows) == (3, 3)
+            assert cursor.blocos == [3, 3, 1, 0]
+            assert [len(bloco) for bloco in blocos] == [3, 3, 1]
+            assert all(bloco['revenue'].dtype == 'float64' for bloco in blocos)
+
+            # Blocos já lidos do Oracle no momento de cada INSERT no cache
+            gravacoes = []
+
+            def registrar(conn, cursor, sql, *args):
+                if sql.startswith('INSERT INTO dados_vendas'):
+                    gravacoes.append(list(conexao.cursores[-1].blocos))
+
+            event.listen(db.engine, 'before_cursor_execute', registrar)
+            assert import_month_data(1, 2025, 'detalhado')[0]
+
+        assert gravacoes == [[3], [3, 3], [3, 3, 1]]
+        assert DadosVendas.query.count() == 7
+
+
+def relatorio_por_vendedor(sales_df, produtos_modificados):
+    """Totais e detalhamento calculados vendedor a vendedor, como antes das agregações globais"""
+    relatorio = {}
+    for seller_code, group in sales_df.groupby('sellerCode'):
+        modificados = group[group['productCode'].isin(produtos_modificados)]
+        outros = group[~group['productCode'].isin(produtos_modificados)]
+        produtos = []
+        for (product_code, product_desc), produto in modificados.groupby(['productCode', 'productDesc'], observed=True):
+            produtos.append({
+                'codigo_produto': product_code,
+                'faturamento_total': produto['revenue'].sum(),
+                'comissao_total': produto['commission'].sum(),
+            })
+        relatorio[seller_code] = {
+            'name': group['sellerName'].iloc[0],
+            'faturamentoOracle': group['revenue'].sum(),
+            'comissaoBaseOracle': group['commission'].sum(),
+            'details': {
+                'produtos_detalhados': produtos,
+                'outros_produtos': {'revenue': outros['revenue'].sum(), 'commission': outros['commission'].sum()},
+            },
+        }
+    return relatorio
+
+
+def test_relatorio_igual_ao_calculo_por_vendedor():
+    """As agregações globais do relatório dão o mesmo resultado do cálculo vendedor a vendedor"""
+    from app.services import import_month_data, process_commissions, get_sales_data_from_cache, resolve_commission_rates
+
+    oracle = faturamento_janeiro()
+    oracle.vender(4, '30', datetime(2025, 1, 9), 12.5)
+    oracle.vender(4, '30', datetime(2025, 1, 21), 7.5)
+    oracle.vender(5, '10', datetime(2025, 1, 22), 90.0)
+
+    with app_teste():
+        db.session.add(ProdutoEspecial(codigo_produto='20', nome_produto='PRODUTO 20', taxa_comissao=0.03))
+        db.session.add(RegraComissao(vendedor_rca=None, codigo_produto='30', taxa_comissao=0.05))
+        db.session.commit()
+        with oracle_falso(oracle):
+            assert import_month_data(1, 2025, 'detalhado')[0]
+        Vendedor.query.filter_by(rca=5).one().ignorar_no_relatorio = True
+        db.session.commit()
+
+        relatorio, _ = process_commissions(1, 2025)
+
+        sales_df = get_sales_data_from_cache(1, 2025)
+        sales_df = sales_df[sales_df['sellerCode'] != 5]
+        sales_df['commissionRate'] = resolve_commission_rates(sales_df)
+        sales_df['commission'] = sales_df['revenue'] * sales_df['commissionRate']
+        esperado = relatorio_por_vendedor(sales_df, ['20', '30'])
+
+    assert set(relatorio) == set(esperado) == {1, 2, 3, 4}
+    # Vendedor 3 só com produto especial e vendedor 4 só com produto de regra
+    assert relatorio[3]['details']['outros_produtos'] == {'revenue': 0, 'commission': 0}
+    assert [p['codigo_produto'] for p in relatorio[4]['details']['produtos_detalhados']] == ['30']
+    assert relatorio[1]['details']['produtos_detalhados'][0]['nome_produto'] == 'PRODUTO 20'
+
+    obtido = resumo_relatorio(relatorio)
+    for rca, dados in esperado.items():
+        nome, faturamento, comissao, outros_faturamento, outros_comissao, produtos = obtido[rca]
+        assert nome == dados['name']
+        assert (faturamento, comissao) == (round(dados['faturamentoOracle'], 6), round(dados['comissaoBaseOracle'], 6))
+        assert (outros_faturamento, outros_comissao) == (
+            round(dados['details']['outros_produtos']['revenue'], 6),
+            round(dados['details']['outros_produtos']['commission'], 6),
+        )
+        assert produtos == [
+            (p['codigo_produto'], round(p['faturamento_total'], 6), round(p['comissao_total'], 6))
+            for p in dados['details']['produtos_detalhados']
+        ]
+
+
+if __name__ == '__main__':
+    test_insercao_em_lotes()
+    print("✅ Inserção em lotes grava o mesmo cache que um único INSERT")
+    test_leitura_tipada_do_cache()
+    print("✅ Cache lido com tipos explícitos")
+    test_modo_agregado_igual_ao_detalhado()
+    print("✅ Modo agregado gera o mesmo relatório do detalhado")
+    test_limites_do_mes_por_variaveis_de_ligacao()
+    print("✅ Limites do mês em variáveis de ligação, inclusive na virada do ano")
+    test_leitura_em_blocos()
+    print("✅ Busca do Oracle em blocos gravados à medida que chegam")
+    test_relatorio_igual_ao_calculo_por_vendedor()
+    print("✅ Relatório igual ao cálculo vendedor a vendedor")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a inicialização da aplicação.
+create_app() não deve carregar pandas, ReportLab nem oracledb, e o modo do
+cliente Oracle é escolhido pela configuração no primeiro uso.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from conftest import criar_app_teste
+
+INSTANT_CLIENT_INEXISTENTE = '/caminho/inexistente/instantclient'
+
+
+def test_inicializacao_sem_modulos_pesados():
+    """Módulos pesados ficam fora do create_app (verificado em um processo novo)"""
+    script = (
+        "import sys\n"
+        "from app import create_app\n"
+        "create_app()\n"
+        "print(','.join(m for m in ('pandas', 'reportlab', 'oracledb') if m in sys.modules))\n"
+    )
+    saida = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    assert saida.strip().splitlines()[-1:] in ([], [''])
+
+
+def test_modo_cliente_oracle():
+    """'auto' sem Instant Client usa thin; modo inválido é rejeitado"""
+    from app import oracle
+
+    for modo, esperado in (('auto', 'thin'), ('thin', 'thin')):
+        oracle._modo_cliente = None
+        with criar_app_teste(ORACLE_CLIENT_MODE=modo, ORACLE_CLIENT_LIB_DIR=INSTANT_CLIENT_INEXISTENTE).app_context():
+            assert oracle.init_oracle_client() == esperado
+
+    oracle._modo_cliente = None
+    with criar_app_teste(ORACLE_CLIENT_MODE='outro', ORACLE_CLIENT_LIB_DIR=INSTANT_CLIENT_INEXISTENTE).app_context():
+        with pytest.raises(ValueError):
+            oracle.init_oracle_client()
+
+
+if __name__ == '__main__':
+    test_inicializacao_sem_modulos_pesados()
+    print("✅ create_app() não carrega pandas, ReportLab nem oracledb")
+    test_modo_cliente_oracle()
+    print("✅ Modo do cliente Oracle escolhido pela configuração")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Script de teste para as métricas de desempenho.
+Verifica as fases do relatório, a latência por rota em /metrics e o log estruturado.
+"""
+
+import json
+import logging
+
+from flask import jsonify
+
+from conftest import criar_app_teste, app_teste
+from app import db
+from app.models import Vendedor, DadosVendas, DimensaoVendedor, DimensaoProduto
+
+
+class ListaHandler(logging.Handler):
+    """Guarda as mensagens emitidas pelo logger de métricas"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.mensagens = []
+
+    def emit(self, record):
+        self.mensagens.append(json.loads(record.getMessage()))
+
+
+def test_fases_do_relatorio():
+    """process_commissions registra cada fase no histograma"""
+    from app.metrics import gerar_metricas_prometheus, limpar_metricas
+    from app.services import process_commissions
+
+    with app_teste():
+        db.session.add(Vendedor(rca=1, nome="VENDEDOR 1"))
+        db.session.add(DadosVendas(
+            mes=1, ano=2025, revenue=1000.0,
+            vendedor=DimensaoVendedor(codigo=1, nome="VENDEDOR 1"),
+            produto=DimensaoProduto(codigo='10', descricao='PRODUTO 10')
+        ))
+        db.session.commit()
+
+        limpar_metricas()
+        relatorio, _ = process_commissions(1, 2025)
+        assert relatorio
+
+        texto = gerar_metricas_prometheus()
+        for fase in ('leitura_cache', 'carga_regras', 'resolucao_taxas', 'agregacao', 'montagem'):
+            assert f'comissoes_fase_duracao_segundos_count{{fase="{fase}",operacao="process_commissions"}} 1' in texto
+
+
+def test_latencia_por_rota_e_log():
+    """Requisições entram no histograma pela regra da rota e geram uma linha JSON com as fases"""
+    from app.metrics import configurar_metricas, gerar_metricas_prometheus, limpar_metricas, logger, medir_fase
+
+    app = criar_app_teste()
+    configurar_metricas(app)
+
+    @app.route('/item/<int:item_id>')
+    def item(item_id):
+        with medir_fase('teste', 'consulta'):
+            return jsonify({'id': item_id})
+
+    handler = ListaHandler()
+    logger.addHandler(handler)
+    nivel_anterior = logger.level
+    logger.setLevel(logging.INFO)
+    try:
+        with app.app_context():
+            limpar_metricas()
+            cliente = app.test_client()
+            assert cliente.get('/item/1').status_code == 200
+            assert cliente.get('/item/2').status_code == 200
+            texto = gerar_metricas_prometheus()
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(nivel_anterior)
+
+    assert 'comissoes_requisicao_duracao_segundos_count{metodo="GET",rota="/item/<int:item_id>",status="200"} 2' in texto
+    assert 'comissoes_requisicao_duracao_segundos_bucket{metodo="GET",rota="/item/<int:item_id>",status="200",le="+Inf"} 2' in texto
+
+    requisicoes = [m for m in handler.mensagens if m['evento'] == 'requisicao']
+    assert [m['caminho'] for m in requisicoes] == ['/item/1', '/item/2']
+    assert 'teste.consulta' in requisicoes[0]['fases']
+
+
+if __name__ == '__main__':
+    test_fases_do_relatorio()
+    print("✅ Fases do relatório registradas")
+    test_latencia_por_rota_e_log()
+    print("✅ Latência por rota e log estruturado")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o pool de sessões Oracle do processo.
+Usa um módulo oracledb simulado para verificar a criação única do pool, a
+devolução das sessões e o fechamento do pool ao final do processo.
+"""
+
+import subprocess
+import sys
+import threading
+import types
+from contextlib import contextmanager
+
+from conftest import criar_app_teste
+
+
+class PoolFalso:
+    """Pool do oracledb simulado: conta as sessões ocupadas"""
+
+    def __init__(self, **parametros):
+        self.parametros = parametros
+        self.min = parametros['min']
+        self.max = parametros['max']
+        self.increment = parametros['increment']
+        self.wait_timeout = parametros['wait_timeout']
+        self.ping_interval = parametros['ping_interval']
+        self.opened = self.min
+        self.busy = 0
+        self.fechado = False
+
+    def acquire(self):
+        self.busy += 1
+        self.opened = max(self.opened, self.busy)
+        return ConexaoPoolFalsa(self)
+
+    def release(self, conexao):
+        self.busy -= 1
+
+    def close(self, force=False):
+        self.fechado = True
+        print("pool fechado")
+
+
+class ConexaoPoolFalsa:
+    """Conexão do pool: ao sair do 'with' a sessão volta ao pool, como no oracledb"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.release(self)
+
+
+def instalar_oracledb_falso():
+    """Substitui o módulo oracledb pelo simulado e zera o pool do processo"""
+    from app import oracle
+
+    modulo = types.ModuleType('oracledb')
+    modulo.POOL_GETMODE_TIMEDWAIT = 3
+    modulo.pools = []
+
+    def create_pool(**parametros):
+        pool = PoolFalso(**parametros)
+        modulo.pools.append(pool)
+        return pool
+
+    modulo.create_pool = create_pool
+    sys.modules['oracledb'] = modulo
+    oracle._pool = None
+    oracle._modo_cliente = None
+    return modulo
+
+
+@contextmanager
+def oracledb_falso():
+    """Usa o oracledb simulado no bloco e restaura o módulo e o pool do processo ao sair"""
+    from app import oracle
+
+    original = sys.modules.get('oracledb')
+    try:
+        yield instalar_oracledb_falso()
+    finally:
+        oracle._pool = None
+        oracle._modo_cliente = None
+        if original is None:
+            sys.modules.pop('oracledb', None)
+        else:
+            sys.modules['oracledb'] = original
+
+
+def test_pool_unico_e_sessoes_devolvidas():
+    """Um único pool por processo; cada 'with' devolve a sessão ao pool, mesmo com erro"""
+    from app.oracle import acquire_oracle_connection, get_oracle_pool, obter_estatisticas_pool
+
+    app = criar_app_teste(ORACLE_CLIENT_MODE='thin', ORACLE_POOL_MIN=1, ORACLE_POOL_MAX=3)
+    with oracledb_falso() as oracledb, app.app_context():
+        # Vários threads pedindo o pool ao mesmo tempo criam um só
+        def usar_pool():
+            with app.app_context():
+                get_oracle_pool()
+
+        threads = [threading.Thread(target=usar_pool) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(oracledb.pools) == 1
+        pool = oracledb.pools[0]
+        assert get_oracle_pool() is pool
+        assert (pool.min, pool.max) == (1, 3)
+        assert pool.parametros['getmode'] == oracledb.POOL_GETMODE_TIMEDWAIT
+
+        aquisicoes = obter_estatisticas_pool()['aquisicoes']
+        with acquire_oracle_connection():
+            with acquire_oracle_connection():
+                assert pool.busy == 2
+            assert pool.busy == 1
+        assert pool.busy == 0
+
+        try:
+            with acquire_oracle_connection():
+                raise RuntimeError("falha na consulta")
+        except RuntimeError:
+            pass
+        assert pool.busy == 0
+
+        estatisticas = obter_estatisticas_pool()
+        assert estatisticas['aquisicoes'] == aquisicoes + 3
+        assert (estatisticas['abertas'], estatisticas['ocupadas'], estatisticas['livres']) == (2, 0, 2)
+
+
+def test_pool_fechado_ao_encerrar_processo():
+    """O pool criado no processo é fechado pelo atexit"""
+    script = (
+        "from test_pool_oracle import instalar_oracledb_falso\n"
+        "from conftest import criar_app_teste\n"
+        "from app.oracle import get_oracle_pool\n"
+        "instalar_oracledb_falso()\n"
+        "with criar_app_teste(ORACLE_CLIENT_MODE='thin').app_context():\n"
+        "    get_oracle_pool()\n"
+        "print('processo encerrando')\n"
+    )
+    saida = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    linhas = saida.strip().splitlines()
+    assert linhas[-2:] == ['processo encerrando', 'pool fechado']
+
+
+if __name__ == '__main__':
+    test_pool_unico_e_sessoes_devolvidas()
+    print("✅ Pool único e sessões devolvidas ao pool")
+    test_pool_fechado_ao_encerrar_processo()
+    print("✅ Pool Oracle fechado ao encerrar o processo")
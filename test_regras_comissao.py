@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a resolução vetorizada de taxas de comissão.
+Compara resolve_commission_rates com get_commission_rate em um banco SQLite em memória.
+"""
+
+import pandas as pd
+
+from conftest import app_teste
+from app import db
+from app.models import Vendedor, RegraComissao, ComissaoPadrao, ProdutoEspecial
+
+
+def popular_regras():
+    """Popula um cenário que exercita todos os níveis da hierarquia"""
+    for rca in (1, 2, 3):
+        db.session.add(Vendedor(rca=rca, nome=f"VENDEDOR {rca}"))
+    db.session.add(ComissaoPadrao(vendedor_rca=1, taxa_comissao=0.02))
+    db.session.add(ComissaoPadrao(vendedor_rca=2, taxa_comissao=0.01))
+    db.session.add(RegraComissao(vendedor_rca=1, codigo_produto='100', taxa_comissao=0.05))
+    db.session.add(RegraComissao(vendedor_rca=None, codigo_produto='200', taxa_comissao=0.03))
+    db.session.add(RegraComissao(vendedor_rca=None, codigo_produto='300', taxa_comissao=0.04))
+    db.session.add(ProdutoEspecial(codigo_produto='300', nome_produto='PRODUTO 300', taxa_comissao=0.007))
+    db.session.add(ProdutoEspecial(codigo_produto='100', nome_produto='PRODUTO 100', taxa_comissao=0.009))
+    db.session.commit()
+
+
+def test_taxas_iguais_a_get_commission_rate():
+    """A resolução vetorizada deve produzir as mesmas taxas da busca linha a linha"""
+    from app.services import get_commission_rate, resolve_commission_rates
+
+    with app_teste():
+        popular_regras()
+
+        sales_df = pd.DataFrame({
+            'sellerCode': [1, 1, 1, 2, 2, 3, 3, 4],
+            'productCode': ['100', '200', '300', '100', '999', '200', '999', '999'],
+        })
+
+        esperado = [get_commission_rate(r.sellerCode, r.productCode) for r in sales_df.itertuples()]
+        obtido = resolve_commission_rates(sales_df).tolist()
+
+        assert obtido == esperado
+        # Vendedor sem regra nem comissão padrão cai no fallback
+        assert obtido[-1] == 0.015
+
+
+def test_sem_regras_usa_fallback():
+    """Sem nenhuma regra cadastrada todas as linhas recebem a taxa fallback"""
+    from app.services import resolve_commission_rates
+
+    with app_teste():
+        sales_df = pd.DataFrame({'sellerCode': [1, 2], 'productCode': ['1', '2']})
+        assert resolve_commission_rates(sales_df).tolist() == [0.015, 0.015]
+
+
+if __name__ == '__main__':
+    test_taxas_iguais_a_get_commission_rate()
+    print("✅ Taxas vetorizadas iguais a get_commission_rate")
+    test_sem_regras_usa_fallback()
+    print("✅ Fallback de 0.015 aplicado")
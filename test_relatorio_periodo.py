@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o relatório de comissões de um intervalo de meses.
+O relatório do trimestre deve ser igual à soma dos relatórios mensais, com os
+ajustes de cada mês aplicados ao próprio mês.
+"""
+
+import pytest
+
+from conftest import app_teste
+from app import db
+from app.models import (
+    Vendedor, ComissaoPadrao, RegraComissao, ProdutoEspecial, DadosVendas,
+    DimensaoVendedor, DimensaoProduto, AjusteFinanceiro, AjusteFaturamento
+)
+
+
+def popular_trimestre():
+    """Três vendedores com vendas em jan-mar/2025 e ajustes diferentes em cada mês"""
+    db.session.add(ProdutoEspecial(codigo_produto='1', nome_produto='PRODUTO 1', taxa_comissao=0.02))
+    db.session.add(RegraComissao(vendedor_rca=2, codigo_produto='2', taxa_comissao=0.05))
+    vendedores = {rca: DimensaoVendedor(codigo=rca, nome=f"VENDEDOR {rca}") for rca in (1, 2, 3)}
+    produtos = {codigo: DimensaoProduto(codigo=codigo, descricao=f"PRODUTO {codigo}") for codigo in ('1', '2', '3')}
+    for rca in (1, 2, 3):
+        db.session.add(Vendedor(rca=rca, nome=f"VENDEDOR {rca}"))
+        db.session.add(ComissaoPadrao(vendedor_rca=rca, taxa_comissao=0.01))
+        for mes in (1, 2, 3):
+            # O vendedor 3 não vende em fevereiro: o ajuste desse mês não entra no relatório
+            if rca == 3 and mes == 2:
+                continue
+            for produto in ('1', '2', '3'):
+                db.session.add(DadosVendas(
+                    mes=mes, ano=2025, vendedor=vendedores[rca], produto=produtos[produto],
+                    revenue=100.0 * rca * mes + int(produto)
+                ))
+    # Venda fora do intervalo
+    db.session.add(DadosVendas(mes=4, ano=2025, vendedor=vendedores[1], produto=produtos['3'], revenue=9999.0))
+    db.session.add(AjusteFinanceiro(vendedor_rca=1, mes=1, ano=2025, valor_ret_merc=3.0))
+    db.session.add(AjusteFinanceiro(vendedor_rca=1, mes=3, ano=2025, valor_acresc_titulo_pago_mes_ant=7.0))
+    db.session.add(AjusteFinanceiro(vendedor_rca=3, mes=2, ano=2025, valor_titulo_aberto=50.0))
+    db.session.add(AjusteFaturamento(vendedor_rca=1, mes=1, ano=2025, valor_ajuste=100.0, taxa_comissao_ajuste=0.01, motivo='Bonificação'))
+    db.session.add(AjusteFaturamento(vendedor_rca=1, mes=2, ano=2025, valor_ajuste=200.0, taxa_comissao_ajuste=0.03))
+    db.session.commit()
+
+
+def test_trimestre_igual_soma_dos_meses():
+    """Totais do trimestre e detalhamento mensal batem com os relatórios de cada mês"""
+    from app.services import process_commissions, process_commissions_periodo, meses_do_trimestre
+
+    with app_teste():
+        popular_trimestre()
+
+        relatorio, mensagem = process_commissions_periodo(*meses_do_trimestre(1, 2025))
+        assert '3 meses' in mensagem
+        mensais = [process_commissions(mes, 2025)[0] for mes in (1, 2, 3)]
+
+        assert set(relatorio) == {1, 2, 3}
+        for rca, vendedor in relatorio.items():
+            meses_vendedor = [m[rca] for m in mensais if rca in m]
+            for campo in ('faturamentoOracle', 'faturamentoFinal', 'comissaoBaseOracle',
+                          'comissaoDoAjuste', 'totalCommission', 'comissaoFinal'):
+                assert vendedor[campo] == pytest.approx(sum(m[campo] for m in meses_vendedor))
+            assert [m['comissaoFinal'] for m in vendedor['porMes']] == pytest.approx(
+                [m['comissaoFinal'] for m in meses_vendedor]
+            )
+
+        # Cada mês usa a taxa do próprio ajuste: 100 * 1% + 200 * 3%
+        ajuste = relatorio[1]['ajusteFaturamento']
+        assert ajuste['valorAjuste'] == 300.0
+        assert relatorio[1]['comissaoDoAjuste'] == pytest.approx(7.0)
+        assert ajuste['motivo'] == '01/2025: Bonificação'
+        # Ajuste de fevereiro do vendedor 3 ignorado (sem vendas no mês)
+        assert relatorio[3]['ajustesFinanceiros']['valorTituloAberto'] == 0.0
+
+        # Regra específica do vendedor 2 resolvida uma vez e aplicada a todos os meses
+        faturamento_produto_2 = sum(200.0 * mes + 2 for mes in (1, 2, 3))
+        faturamento_produto_3 = sum(200.0 * mes + 3 for mes in (1, 2, 3))
+        assert relatorio[2]['details']['outros_produtos']['commission'] == pytest.approx(
+            faturamento_produto_2 * 0.05 + faturamento_produto_3 * 0.01
+        )
+
+
+def test_um_mes_igual_relatorio_mensal():
+    """Um intervalo de um único mês reproduz o relatório mensal"""
+    from app.services import process_commissions, process_commissions_periodo
+
+    with app_teste():
+        popular_trimestre()
+
+        periodo, _ = process_commissions_periodo(1, 2025, 1, 2025)
+        mensal, _ = process_commissions(1, 2025)
+        assert list(periodo) == list(mensal)
+        for rca, vendedor in mensal.items():
+            for campo in ('faturamentoFinal', 'totalCommission', 'comissaoFinal'):
+                assert periodo[rca][campo] == pytest.approx(vendedor[campo])
+            assert periodo[rca]['details'] == vendedor['details']
+            assert periodo[rca]['ajustesFinanceiros'] == vendedor['ajustesFinanceiros']
+
+
+if __name__ == '__main__':
+    test_trimestre_igual_soma_dos_meses()
+    print("✅ Relatório do trimestre igual à soma dos relatórios mensais")
+    test_um_mes_igual_relatorio_mensal()
+    print("✅ Relatório de um mês igual ao relatório mensal")
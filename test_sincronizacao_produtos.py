@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Script de teste para a sincronização do catálogo de produtos com o Oracle.
+Verifica que só as diferenças são gravadas (no cache e no índice FTS), que as
+sincronizações seguintes leem só os produtos vendidos desde a marca d'água e que o
+horário da sincronização fica na linha de controle.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+from conftest import app_teste, oracle_falso
+from app import db
+from app.models import ProdutoOracleCache, ControleSincronizacaoProdutos
+
+
+def catalogo(produtos, data_venda=datetime(2025, 3, 10, 15, 30)):
+    """
+    Responde à QUERY_CATALOGO_PRODUTOS com a lista de (código, descrição) ou de
+    (código, descrição, última venda), aplicando o filtro :desde quando informado
+    """
+    linhas = [produto if len(produto) == 3 else (*produto, data_venda) for produto in produtos]
+
+    def responder(sql, binds):
+        desde = binds.get('desde')
+        return (
+            ['CODIGO_PRODUTO', 'DESCRICAO_PRODUTO', 'DATA_VENDA'],
+            [linha for linha in linhas if desde is None or linha[2] >= desde],
+        )
+    return responder
+
+
+def gravacoes_produtos(consultas):
+    """Comandos de escrita executados na tabela de produtos e no índice FTS"""
+    return [
+        sql for sql in consultas
+        if sql.lstrip().split(' ', 1)[0] in ('INSERT', 'UPDATE', 'DELETE')
+        and ('produto_oracle_cache' in sql or 'produto_oracle_fts' in sql)
+    ]
+
+
+def indice_fts():
+    return sorted(db.session.execute(text("SELECT codigo, nome FROM produto_oracle_fts")).all())
+
+
+def test_sincronizacao_aplica_so_diferencas(app):
+    """Sem mudanças no Oracle nada é regravado; alterações e exclusões chegam ao cache e ao FTS"""
+    from app.services import sincronizar_produtos_oracle, buscar_produtos_cache
+    from app.metrics import gerar_metricas_prometheus, limpar_metricas
+
+    produtos = [('101', 'PÃO DE AÇÚCAR'), ('202', 'AÇÚCAR REFINADO'), ('303', 'CAFÉ TORRADO')]
+    limpar_metricas()
+    with oracle_falso(catalogo(produtos)):
+        assert sincronizar_produtos_oracle()[0]
+    texto = gerar_metricas_prometheus()
+    for fase in ('leitura', 'indice_fts', 'autocompletar'):
+        assert f'comissoes_fase_duracao_segundos_count{{fase="{fase}",operacao="sincronizar_produtos_oracle"}} 1' in texto
+    assert ProdutoOracleCache.query.count() == 3
+    assert len(indice_fts()) == 3
+    primeira = db.session.get(ControleSincronizacaoProdutos, 1).ultima_sincronizacao
+    datas = {p.codigo_produto: p.data_sincronizacao for p in ProdutoOracleCache.query}
+
+    # Catálogo sem mudanças: só a linha de controle é atualizada
+    consultas = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: consultas.append(args[2]))
+    with oracle_falso(catalogo(produtos)):
+        sucesso, mensagem = sincronizar_produtos_oracle(completa=True)
+    assert sucesso and '0 novos, 0 alterados, 0 removidos' in mensagem
+    assert gravacoes_produtos(consultas) == []
+    db.session.expire_all()
+    assert {p.codigo_produto: p.data_sincronizacao for p in ProdutoOracleCache.query} == datas
+    assert db.session.get(ControleSincronizacaoProdutos, 1).ultima_sincronizacao > primeira
+
+    # Um produto alterado, um removido e um novo
+    produtos = [('101', 'PÃO DE AÇÚCAR'), ('202', 'AÇÚCAR CRISTAL'), ('404', 'CAFÉ SOLÚVEL')]
+    consultas.clear()
+    with oracle_falso(catalogo(produtos)):
+        sucesso, mensagem = sincronizar_produtos_oracle(completa=True)
+    assert sucesso and '1 novos, 1 alterados, 1 removidos' in mensagem
+    assert not any('DELETE FROM produto_oracle_fts' in sql and 'WHERE' not in sql for sql in consultas)
+
+    db.session.expire_all()
+    atuais = {p.codigo_produto: p for p in ProdutoOracleCache.query}
+    assert {codigo: p.nome_produto for codigo, p in atuais.items()} == dict(produtos)
+    assert atuais['101'].data_sincronizacao == datas['101']
+    assert atuais['202'].data_sincronizacao > datas['202']
+    assert indice_fts() == [('101', 'pao de acucar'), ('202', 'acucar cristal'), ('404', 'cafe soluvel')]
+    assert [p['codigo'] for p in buscar_produtos_cache('cafe')] == ['404']
+    assert sorted(p['codigo'] for p in buscar_produtos_cache('acucar')) == ['101', '202']
+
+
+def test_sincronizacao_incremental_pela_marca_dagua(app):
+    """Com marca d'água, só os produtos vendidos desde o dia dela são lidos, e nada é removido"""
+    from app.services import sincronizar_produtos_oracle, buscar_produtos_cache
+
+    produtos = [
+        ('101', 'PÃO DE AÇÚCAR', datetime(2025, 1, 20, 9, 0)),
+        ('202', 'AÇÚCAR REFINADO', datetime(2025, 3, 10, 15, 30)),
+    ]
+    with oracle_falso(catalogo(produtos)) as conexao:
+        assert sincronizar_produtos_oracle()[0]
+    assert conexao.execucoes[0][1] == {}
+    assert db.session.get(ControleSincronizacaoProdutos, 1).ultima_data_venda == datetime(2025, 3, 10, 15, 30)
+
+    # Vendas novas desde a marca: um produto alterado, um novo; o 101 não é lido nem removido
+    produtos = [
+        ('101', 'PÃO DE AÇÚCAR', datetime(2025, 1, 20, 9, 0)),
+        ('202', 'AÇÚCAR CRISTAL', datetime(2025, 3, 10, 18, 0)),
+        ('303', 'CAFÉ TORRADO', datetime(2025, 3, 12, 8, 0)),
+    ]
+    with oracle_falso(catalogo(produtos)) as conexao:
+        sucesso, mensagem = sincronizar_produtos_oracle()
+    assert sucesso and 'desde 10/03/2025 (1 novos, 1 alterados)' in mensagem
+    sql, binds = conexao.execucoes[0]
+    assert ':desde' in sql and binds == {'desde': datetime(2025, 3, 10)}
+
+    db.session.expire_all()
+    assert {p.codigo_produto: p.nome_produto for p in ProdutoOracleCache.query} == {
+        '101': 'PÃO DE AÇÚCAR', '202': 'AÇÚCAR CRISTAL', '303': 'CAFÉ TORRADO',
+    }
+    assert [p['codigo'] for p in buscar_produtos_cache('cafe')] == ['303']
+    assert db.session.get(ControleSincronizacaoProdutos, 1).ultima_data_venda == datetime(2025, 3, 12, 8, 0)
+
+    # Sem vendas novas a marca d'água não recua
+    with oracle_falso(catalogo([])):
+        assert sincronizar_produtos_oracle()[0]
+    db.session.expire_all()
+    assert ProdutoOracleCache.query.count() == 3
+    assert db.session.get(ControleSincronizacaoProdutos, 1).ultima_data_venda == datetime(2025, 3, 12, 8, 0)
+
+
+def test_estatisticas_pela_linha_de_controle(app):
+    """A última sincronização vem da linha de controle, ou das datas dos produtos em bancos antigos"""
+    from app.services import obter_estatisticas_cache
+
+    db.session.add(ProdutoOracleCache(codigo_produto='101', nome_produto='PÃO', data_sincronizacao=datetime(2025, 1, 5)))
+    db.session.commit()
+    assert obter_estatisticas_cache() == {'total_produtos': 1, 'ultima_sincronizacao': datetime(2025, 1, 5)}
+
+    db.session.add(ControleSincronizacaoProdutos(id=1, ultima_sincronizacao=datetime(2025, 2, 1)))
+    db.session.commit()
+    assert obter_estatisticas_cache()['ultima_sincronizacao'] == datetime(2025, 2, 1)
+
+
+if __name__ == '__main__':
+    with app_teste() as app:
+        test_sincronizacao_aplica_so_diferencas(app)
+    print("✅ Sincronização grava só as diferenças no cache e no índice FTS")
+    with app_teste() as app:
+        test_sincronizacao_incremental_pela_marca_dagua(app)
+    print("✅ Sincronização incremental lê só os produtos vendidos desde a marca d'água")
+    with app_teste() as app:
+        test_estatisticas_pela_linha_de_controle(app)
+    print("✅ Horário da sincronização lido da linha de controle")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Script de teste para o perfil SQLite (WAL e pragmas aplicados em cada conexão).
+Verifica os pragmas das conexões e que um relatório em andamento não bloqueia
+nem é afetado por uma importação gravando ao mesmo tempo.
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import text
+
+from conftest import criar_app_teste
+from app import db
+from app.models import DadosVendas, DimensaoVendedor, DimensaoProduto
+
+
+def criar_app_sqlite(caminho_banco, **config):
+    """Aplicação de teste com banco em arquivo temporário e o perfil SQLite"""
+    from app.database import configurar_sqlite
+
+    # WAL precisa de um banco em arquivo (bancos em memória ficam em journal_mode=memory)
+    app = criar_app_teste(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{caminho_banco}', SQLALCHEMY_BINDS={},
+        SQLITE_BUSY_TIMEOUT_MS=2000, SQLITE_CACHE_SIZE_KB=8192, **config
+    )
+    configurar_sqlite(app, db)
+    return app
+
+
+def _venda(mes, revenue):
+    return DadosVendas(
+        mes=mes, ano=2025, revenue=revenue,
+        vendedor=DimensaoVendedor(codigo=1, nome="VENDEDOR 1"),
+        produto=DimensaoProduto(codigo='10', descricao='PRODUTO 10')
+    )
+
+
+def test_pragmas_aplicados():
+    """Cada conexão do pool recebe o perfil configurado"""
+    with tempfile.TemporaryDirectory() as pasta:
+        app = criar_app_sqlite(os.path.join(pasta, 'perfil.db'))
+        with app.app_context():
+            conexao = db.session.connection()
+            assert conexao.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+            assert conexao.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conexao.execute(text("PRAGMA busy_timeout")).scalar() == 2000
+            assert conexao.execute(text("PRAGMA cache_size")).scalar() == -8192
+            assert conexao.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+            db.session.remove()
+            db.engine.dispose()
+
+
+def test_perfil_desativado():
+    """Com SQLITE_PRAGMAS_ENABLED=False as conexões ficam no padrão do SQLite"""
+    with tempfile.TemporaryDirectory() as pasta:
+        app = criar_app_sqlite(os.path.join(pasta, 'padrao.db'), SQLITE_PRAGMAS_ENABLED=False)
+        with app.app_context():
+            conexao = db.session.connection()
+            assert conexao.execute(text("PRAGMA journal_mode")).scalar() == 'delete'
+            db.session.remove()
+            db.engine.dispose()
+
+
+def test_leitura_durante_gravacao():
+    """Um relatório com a transação aberta não bloqueia a importação e mantém sua foto dos dados"""
+    with tempfile.TemporaryDirectory() as pasta:
+        app = criar_app_sqlite(os.path.join(pasta, 'concorrencia.db'))
+        with app.app_context():
+            db.create_all(bind_key=None)
+            db.session.add(_venda(1, 1000.0))
+            db.session.commit()
+
+            consulta_total = text("SELECT SUM(revenue) FROM dados_vendas")
+            with db.engine.connect() as leitor:
+                with leitor.begin():
+                    # Transação de leitura longa (o pysqlite só abre transação em DML)
+                    leitor.exec_driver_sql("BEGIN")
+                    assert leitor.execute(consulta_total).scalar() == 1000.0
+
+                    # Importação (DELETE + INSERT do mês) em outra conexão, com o leitor aberto:
+                    # sem WAL o commit esperaria o leitor até o busy_timeout
+                    with db.engine.begin() as escritor:
+                        escritor.execute(text("DELETE FROM dados_vendas WHERE mes = 1 AND ano = 2025"))
+                        escritor.execute(text(
+                            "INSERT INTO dados_vendas (mes, ano, vendedor_id, produto_id, revenue) "
+                            "VALUES (1, 2025, 1, 1, 2500.0)"
+                        ))
+
+                    # O leitor continua vendo os dados do início da sua transação
+                    assert leitor.execute(consulta_total).scalar() == 1000.0
+
+                # Uma nova leitura enxerga a importação confirmada
+                assert leitor.execute(consulta_total).scalar() == 2500.0
+
+            db.session.remove()
+            db.drop_all(bind_key=None)
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    test_pragmas_aplicados()
+    print("✅ Pragmas aplicados às conexões")
+    test_perfil_desativado()
+    print("✅ Perfil desativado mantém o padrão do SQLite")
+    test_leitura_durante_gravacao()
+    print("✅ Relatório lido durante a gravação de uma importação")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Script de teste para as tarefas em segundo plano.
+Verifica execução com progresso, rejeição de duplicadas e liberação de tarefas abandonadas.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from conftest import app_teste
+from app import db
+from app.models import TarefaSegundoPlano
+
+
+def banco_tarefas_temporario():
+    """
+    Bind de tarefas em um arquivo temporário: em memória todas as threads dividiriam a
+    mesma conexão, e o rollback de uma leitura poderia desfazer a gravação de estado de
+    uma tarefa
+    """
+    caminho = os.path.join(tempfile.mkdtemp(prefix='teste_tarefas_'), 'tarefas.db')
+    return {'tarefas': f"sqlite:///{caminho}"}
+
+
+def aguardar_fim(tarefa_id, timeout=5.0):
+    from app.jobs import obter_tarefa
+
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        tarefa = obter_tarefa(tarefa_id)
+        if tarefa['status'] in ('concluida', 'erro'):
+            return tarefa
+        time.sleep(0.02)
+    raise AssertionError(f"Tarefa {tarefa_id} não terminou")
+
+
+def test_tarefa_com_progresso_e_duplicada():
+    """Tarefa ativa bloqueia outra com a mesma chave; o progresso fica visível durante a execução"""
+    from app import jobs
+
+    liberar = threading.Event()
+    em_execucao = threading.Event()
+
+    def tarefa_teste(valor, progresso=None):
+        progresso(50, f"processando {valor}")
+        em_execucao.set()
+        liberar.wait(5)
+        return True, f"valor {valor} processado"
+
+    jobs.TIPOS_TAREFA['teste'] = tarefa_teste
+    try:
+        with app_teste(SQLALCHEMY_BINDS=banco_tarefas_temporario()):
+            tarefa = jobs.enfileirar_tarefa('teste', 'teste:1', valor=1)
+            assert tarefa['status'] in ('pendente', 'executando')
+            assert tarefa['parametros'] == {'valor': 1}
+
+            assert em_execucao.wait(5)
+            andamento = jobs.obter_tarefa(tarefa['id'])
+            assert andamento['status'] == 'executando'
+            assert andamento['progresso'] == 50
+            assert andamento['mensagem'] == 'processando 1'
+
+            try:
+                jobs.enfileirar_tarefa('teste', 'teste:1', valor=2)
+                assert False, "tarefa duplicada deveria ser rejeitada"
+            except jobs.TarefaDuplicadaError as e:
+                assert e.tarefa['id'] == tarefa['id']
+
+            liberar.set()
+            final = aguardar_fim(tarefa['id'])
+            assert final['status'] == 'concluida' and final['sucesso']
+            assert final['progresso'] == 100
+            assert final['mensagem'] == 'valor 1 processado'
+
+            # Com a anterior concluída, a mesma chave pode ser enfileirada de novo
+            nova = jobs.enfileirar_tarefa('teste', 'teste:1', valor=3)
+            assert aguardar_fim(nova['id'])['sucesso']
+            assert [t['id'] for t in jobs.listar_tarefas()] == [nova['id'], tarefa['id']]
+    finally:
+        jobs.TIPOS_TAREFA.pop('teste')
+
+
+def test_erro_e_tarefa_abandonada():
+    """Exceções viram status 'erro'; tarefas sem sinal de vida não bloqueiam a chave"""
+    from app import jobs
+
+    def tarefa_com_falha(progresso=None):
+        raise RuntimeError("falhou")
+
+    jobs.TIPOS_TAREFA['falha'] = tarefa_com_falha
+    try:
+        with app_teste(SQLALCHEMY_BINDS=banco_tarefas_temporario()):
+            final = aguardar_fim(jobs.enfileirar_tarefa('falha', 'falha')['id'])
+            assert final['status'] == 'erro' and final['sucesso'] is False
+            assert 'falhou' in final['mensagem']
+
+            # Tarefa "executando" de um processo que morreu há muito tempo
+            antigo = datetime.utcnow() - timedelta(hours=2)
+            with db.engines['tarefas'].begin() as connection:
+                abandonada_id = connection.execute(insert(TarefaSegundoPlano.__table__).values(
+                    tipo='falha', chave='abandonada', status='executando',
+                    data_criacao=antigo, data_atualizacao=antigo
+                )).inserted_primary_key[0]
+
+            nova = jobs.enfileirar_tarefa('falha', 'abandonada')
+            assert nova['id'] != abandonada_id
+            assert jobs.obter_tarefa(abandonada_id)['status'] == 'erro'
+            aguardar_fim(nova['id'])
+    finally:
+        jobs.TIPOS_TAREFA.pop('falha')
+
+
+def test_importacoes_sobrepostas():
+    """Intervalos e meses avulsos com algum mês em comum não rodam ao mesmo tempo"""
+    from app import jobs
+
+    liberar = threading.Event()
+    originais = dict(jobs.TIPOS_TAREFA)
+
+    def importacao_bloqueada(*args, progresso=None, **kwargs):
+        liberar.wait(5)
+        return True, "importado"
+
+    jobs.TIPOS_TAREFA['importacao'] = importacao_bloqueada
+    jobs.TIPOS_TAREFA['importacao_intervalo'] = importacao_bloqueada
+    try:
+        with app_teste(SQLALCHEMY_BINDS=banco_tarefas_temporario()):
+            intervalo = jobs.enfileirar_importacao_intervalo(11, 2024, 2, 2025)
+
+            for enfileirar in (
+                lambda: jobs.enfileirar_importacao(1, 2025),
+                lambda: jobs.enfileirar_importacao_intervalo(2, 2025, 4, 2025),
+                lambda: jobs.enfileirar_importacao_intervalo(1, 2024, 12, 2024),
+            ):
+                try:
+                    enfileirar()
+                    assert False, "importação sobreposta deveria ser rejeitada"
+                except jobs.TarefaDuplicadaError as e:
+                    assert e.tarefa['id'] == intervalo['id']
+
+            # Meses fora do intervalo podem ser importados em paralelo
+            avulsa = jobs.enfileirar_importacao(3, 2025)
+            liberar.set()
+            assert aguardar_fim(intervalo['id'])['sucesso']
+            assert aguardar_fim(avulsa['id'])['sucesso']
+
+            # Com o intervalo concluído, os meses ficam livres
+            assert aguardar_fim(jobs.enfileirar_importacao(1, 2025)['id'])['sucesso']
+    finally:
+        liberar.set()
+        jobs.TIPOS_TAREFA.update(originais)
+
+
+if __name__ == '__main__':
+    test_tarefa_com_progresso_e_duplicada()
+    print("✅ Tarefas executadas com progresso e duplicadas rejeitadas")
+    test_erro_e_tarefa_abandonada()
+    print("✅ Falhas registradas e tarefas abandonadas liberadas")
+    test_importacoes_sobrepostas()
+    print("✅ Importações com meses em comum rejeitadas")
@@ -1,26 +1,23 @@
 #!/usr/bin/env python3
 """
-Script para atualizar o banco de dados com a nova tabela AjusteFaturamento
+Script para atualizar o banco de dados com as novas tabelas
+(AjusteFaturamento, ControleImportacao, VersaoDados, TarefaSegundoPlano,
+DimensaoVendedor, DimensaoProduto, ControleSincronizacaoProdutos) e converter o cache de vendas para as dimensões
 """
 
 import os
 import sys
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
 
 # Adiciona o diretório atual ao path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Configuração do Flask
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///instance/business_rules.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Usa a mesma configuração e instância do banco da aplicação, para que
+# create_all enxergue todos os modelos registrados
+from app import create_app, db
+from app.models import AjusteFaturamento, ControleImportacao, VersaoDados, TarefaSegundoPlano, ControleSincronizacaoProdutos
+from app.database import adicionar_dia_venda_ao_cache, adicionar_marca_catalogo_produtos, migrar_dados_vendas_para_dimensoes
 
-# Inicializa o banco de dados
-db = SQLAlchemy(app)
-
-# Importa os modelos
-from app.models import AjusteFaturamento
+app = create_app()
 
 def update_database():
     """Atualiza o banco de dados criando a nova tabela"""
@@ -28,10 +25,22 @@ def update_database():
         with app.app_context():
             print("🔄 Atualizando banco de dados...")
             
-            # Cria a nova tabela AjusteFaturamento
+            # Cria as tabelas que ainda não existem (inclusive no banco de tarefas, bind 'tarefas')
             db.create_all()
             
-            print("✅ Tabela AjusteFaturamento criada com sucesso!")
+            print("✅ Tabelas AjusteFaturamento, ControleImportacao, VersaoDados, TarefaSegundoPlano, ControleSincronizacaoProdutos e dimensões de vendas criadas com sucesso!")
+
+            # Cache de vendas sem o dia das vendas (usado pela importação incremental)
+            if adicionar_dia_venda_ao_cache(db.engine):
+                print("✅ Coluna dia_venda adicionada ao cache de vendas (marcas d'água reiniciadas)")
+
+            # Controle da sincronização de produtos sem a marca d'água do catálogo
+            if adicionar_marca_catalogo_produtos(db.engine):
+                print("✅ Marca d'água adicionada à sincronização de produtos (próxima sincronização completa)")
+
+            # Cache de vendas no formato antigo (nomes repetidos em cada linha)
+            if migrar_dados_vendas_para_dimensoes(db.engine):
+                print("✅ Cache de vendas convertido para as dimensões de vendedores e produtos")
             print("📊 Banco de dados atualizado.")
             
     except Exception as e:
@@ -44,7 +53,7 @@ if __name__ == '__main__':
     success = update_database()
     if success:
         print("\n🎉 Atualização concluída com sucesso!")
-        print("💡 A nova funcionalidade de ajuste de faturamento está disponível.")
+        print("💡 Ajuste de faturamento e importação incremental disponíveis.")
     else:
         print("\n💥 Falha na atualização do banco de dados.")
         sys.exit(1)